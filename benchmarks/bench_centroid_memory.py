@@ -0,0 +1,88 @@
+"""
+Show that the streaming selected_vertices_center keeps a flat
+tracemalloc peak as the selection grows on MemoryScene, compared to
+the old loop that stored every point before averaging
+
+Only the work on top of the mesh points is measured. MemoryScene hands
+out its own point array and the point cache is filled before the
+measured run. In Maya MayaScene.mesh_points copies the whole mesh once,
+so there the peak is that copy plus one chunk
+
+Run from the repo root:
+    python benchmarks/bench_centroid_memory.py
+    python benchmarks/bench_centroid_memory.py --chunk-size 4096
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_selected_vertices_center import per_vertex_center  # noqa: E402
+from mcRiggingToolkit.core import point_cache  # noqa: E402
+from mcRiggingToolkit.core.centroid_joint_creation import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE,
+    selected_vertices_center,
+)
+from mcRiggingToolkit.shared import scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 500_000, 1_000_000]
+
+
+def peak_memory(func, *args) -> tuple:
+    """
+    Run func under tracemalloc
+
+    Returns:
+        result, peak (tuple): the return value and the peak bytes allocated
+    """
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scene = MemoryScene()
+    scene_backend.set_scene(scene)
+    peaks = []
+
+    print(f"{'vertices':>10} {'per vertex (MB)':>16} {'streaming (MB)':>15}")
+    for size in args.sizes:
+        scene.new_scene()
+        mesh = scene.add_mesh("benchMesh", rng.random((size, 3)))
+        scene.select_vertices(mesh, np.arange(size))
+
+        slow, slow_peak = peak_memory(per_vertex_center)
+        # large meshes are hashed and written to the point cache first
+        selected_vertices_center(args.chunk_size)
+        fast, fast_peak = peak_memory(selected_vertices_center, args.chunk_size)
+        peaks.append(fast_peak)
+
+        assert np.allclose(slow, fast)
+        print(f"{size:>10} {slow_peak / 1e6:>16.2f} {fast_peak / 1e6:>15.2f}")
+
+    point_cache.POINT_CACHE.clear(remove_files=True)
+
+    # the streaming peak is bound by the chunk size, not the selection
+    chunk_bytes = args.chunk_size * 8 * 8
+    assert max(peaks) < chunk_bytes + 1_000_000, "streaming peak grew with the selection"
+    print("streaming peak memory is flat on MemoryScene")
+
+
+if __name__ == "__main__":
+    main()
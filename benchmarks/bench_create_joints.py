@@ -0,0 +1,67 @@
+"""
+Compare looping create_joint against the batched create_joints
+
+The in-memory scene only measures the toolkit side of the work, inside
+Maya every joint made by the loop is its own modifier and undo step
+while create_joints stays one modifier and one undo step
+
+Run from the repo root:
+    python benchmarks/bench_create_joints.py
+    python benchmarks/bench_create_joints.py --counts 100 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.core.centroid_joint_creation import (  # noqa: E402
+    create_joint,
+    create_joints,
+)
+from mcRiggingToolkit.shared import scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+DEFAULT_COUNTS = [100, 1_000, 10_000]
+
+
+def loop_create_joint(positions: np.ndarray, names: list) -> list:
+    """
+    One create_joint call per joint
+    """
+    return [create_joint(name, "jnt", position) for name, position in zip(names, positions.tolist())]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scene = MemoryScene()
+    scene_backend.set_scene(scene)
+
+    print(f"{'joints':>8} {'create_joint loop (s)':>22} {'create_joints (s)':>18}")
+    for count in args.counts:
+        positions = rng.random((count, 3))
+        names = [f"bench_{index:05d}" for index in range(count)]
+
+        scene.new_scene()
+        start = time.perf_counter()
+        loop_create_joint(positions, names)
+        loop_time = time.perf_counter() - start
+
+        scene.new_scene()
+        start = time.perf_counter()
+        joints = create_joints(positions, names)
+        batch_time = time.perf_counter() - start
+
+        assert len(joints) == count
+        print(f"{count:>8} {loop_time:>22.4f} {batch_time:>18.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Guard the toolkit startup cost with python -X importtime
+
+Every target is imported in a fresh interpreter and the importtime
+report is parsed. A target fails when it pulls in a module it should
+only load on first use, or when its cumulative import time goes over
+its budget. Targets whose own dependencies are missing (PySide6 or
+maya outside of mayapy) are skipped.
+
+Run from the repo root, with mayapy to include the UI:
+    python benchmarks/bench_import_time.py
+    mayapy benchmarks/bench_import_time.py --scale 2
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# module -> (budget in ms, modules that must not be imported with it)
+TARGETS = {
+    "mcRiggingToolkit.launcher": (
+        5.0,
+        ("numpy", "PySide6", "maya", "mcRiggingToolkit.ui", "mcRiggingToolkit.core"),
+    ),
+    # the empty core package itself is fine, lazy_module looks the tools up in it
+    "mcRiggingToolkit.ui.ui_main": (
+        250.0,
+        (
+            "numpy",
+            "mcRiggingToolkit.core.controller_creation",
+            "mcRiggingToolkit.core.controller_shapes",
+            "mcRiggingToolkit.core.match_space",
+            "mcRiggingToolkit.core.rig_template",
+            "mcRiggingToolkit.shared.chunked_job",
+            "mcRiggingToolkit.shared.scene_backend",
+            "mcRiggingToolkit.shared.selection_cache",
+        ),
+    ),
+}
+
+# missing host application packages skip a target instead of failing it
+HOST_PACKAGES = ("maya", "PySide6", "shiboken6")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+MISSING_MODULE = re.compile(r"No module named '([^']+)'")
+
+
+def import_times(module: str = None) -> tuple:
+    """
+    Import module in a fresh interpreter with -X importtime, no module
+    gives the imports of the interpreter startup
+
+    Returns:
+        times, error (tuple): {module: (self us, cumulative us)} and the
+                              import error text, None when it imported
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+    times = {}
+    errors = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+        elif not line.startswith("import time:"):
+            errors.append(line)
+
+    return times, ("\n".join(errors) if result.returncode else None)
+
+
+def is_under(module: str, package: str) -> bool:
+    return module == package or module.startswith(package + ".")
+
+
+def check(module: str, budget_ms: float, forbidden: tuple, startup: set, top: int) -> bool:
+    """
+    Print the import cost of module and check it
+
+    Args:
+        startup (set): modules the interpreter imports anyway, left out
+                       of the slowest imports
+
+    Returns:
+        passed (bool): False when module is over budget, imports a
+                       forbidden module or fails to import, True when it
+                       passes or is skipped for a missing host package
+    """
+    times, error = import_times(module)
+    if error is not None:
+        last_line = error.splitlines()[-1] if error else "no output"
+        missing = MISSING_MODULE.search(last_line)
+        if missing and missing.group(1).split(".")[0] in HOST_PACKAGES:
+            print(f"{module}: skipped, {last_line}")
+            return True
+        print(f"{module}: FAIL can not be imported\n    {last_line}")
+        return False
+
+    total_ms = times[module][1] / 1e3
+    eager = sorted({name for name in times for package in forbidden if is_under(name, package)})
+
+    print(f"{module}: {total_ms:.1f} ms (budget {budget_ms:.1f} ms)")
+    own = [(name, self_us) for name, (self_us, _cumulative_us) in times.items() if name not in startup]
+    for name, self_us in sorted(own, key=lambda item: -item[1])[:top]:
+        print(f"    {self_us / 1e3:>8.2f} ms  {name}")
+
+    passed = True
+    if total_ms > budget_ms:
+        print(f"    FAIL over budget by {total_ms - budget_ms:.1f} ms")
+        passed = False
+    if eager:
+        print(f"    FAIL imported eagerly: {', '.join(eager)}")
+        passed = False
+    return passed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, for slow machines")
+    parser.add_argument("--top", type=int, default=5, help="how many of the slowest imports to list")
+    args = parser.parse_args()
+
+    startup = set(import_times()[0])
+    results = [
+        check(module, budget_ms * args.scale, forbidden, startup, args.top)
+        for module, (budget_ms, forbidden) in TARGETS.items()
+    ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Time k-means joint placement over a large vertex selection
+
+Every run selects all vertices of a random blob mesh and makes one
+joint per cluster with create_cluster_joints, inertia (the mean squared
+distance of a vertex to its center) shows what mini-batch gives up
+
+Run from the repo root:
+    python benchmarks/bench_kmeans.py
+    python benchmarks/bench_kmeans.py --vertices 1000000 --clusters 50 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.core import centroid_joint_creation, point_clustering  # noqa: E402
+from mcRiggingToolkit.shared import scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+DEFAULT_CLUSTERS = [10, 100, 500]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vertices", type=int, default=1_000_000)
+    parser.add_argument("--clusters", type=int, nargs="+", default=DEFAULT_CLUSTERS)
+    parser.add_argument("--full", action="store_true", help="also time plain Lloyd on every point")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    blobs = rng.normal(scale=10.0, size=(64, 3))
+    points = blobs[rng.integers(len(blobs), size=args.vertices)] + rng.normal(size=(args.vertices, 3))
+
+    scene = MemoryScene()
+    scene_backend.set_scene(scene)
+    mesh = scene.add_mesh("bench_geo", points)
+    scene.select_vertices(mesh, np.arange(args.vertices))
+
+    modes = [True, False] if args.full else [True]
+    print(f"{args.vertices} vertices")
+    print(f"{'clusters':>8} {'mode':>10} {'seconds':>8} {'inertia':>9}")
+    for count in args.clusters:
+        for mini_batch in modes:
+            scene.new_scene()
+            mesh = scene.add_mesh("bench_geo", points)
+            scene.select_vertices(mesh, np.arange(args.vertices))
+
+            start = time.perf_counter()
+            joints = centroid_joint_creation.create_cluster_joints(count, mini_batch=mini_batch)
+            seconds = time.perf_counter() - start
+            assert len(joints) == count
+
+            centers = np.stack(
+                [scene.get_attributes(joints, f"translate{axis}") for axis in "XYZ"], axis=1
+            )
+            _labels, distances = point_clustering.assign_clusters(points, centers)
+            mode = "mini-batch" if mini_batch else "lloyd"
+            print(f"{count:>8} {mode:>10} {seconds:>8.2f} {distances.mean():>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
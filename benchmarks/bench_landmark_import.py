@@ -0,0 +1,87 @@
+"""
+Time landmark imports and their peak python memory for every layout
+
+Each file is written with the given number of landmarks, a few names
+repeat so numbering up is exercised
+
+Run from the repo root:
+    python benchmarks/bench_landmark_import.py
+    python benchmarks/bench_landmark_import.py --landmarks 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.core import landmark_import  # noqa: E402
+from mcRiggingToolkit.shared import name_registry, scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+
+def write_files(folder: str, count: int) -> dict:
+    """
+    Returns:
+        paths (dict): layout name -> file path
+    """
+    rng = np.random.default_rng(0)
+    positions = rng.normal(size=(count, 3)).tolist()
+    names = [f"landmark_{index % (count - 100) if count > 100 else index}" for index in range(count)]
+
+    paths = {
+        "csv": os.path.join(folder, "landmarks.csv"),
+        "jsonl": os.path.join(folder, "landmarks.jsonl"),
+        "json": os.path.join(folder, "landmarks.json"),
+    }
+    with open(paths["csv"], "w") as f:
+        f.write("name,x,y,z,confidence\n")
+        for name, (x, y, z) in zip(names, positions):
+            f.write(f"{name},{x},{y},{z},1.0\n")
+    with open(paths["jsonl"], "w") as f:
+        for name, position in zip(names, positions):
+            f.write(json.dumps({"name": name, "position": position}) + "\n")
+    with open(paths["json"], "w") as f:
+        json.dump([{"name": name, "x": x, "y": y, "z": z} for name, (x, y, z) in zip(names, positions)], f)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--landmarks", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=landmark_import.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    scene = MemoryScene(capacity=args.landmarks + 16)
+    scene_backend.set_scene(scene)
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_files(folder, args.landmarks)
+
+        print(f"{'layout':>6} {'file MiB':>9} {'seconds':>8} {'peak MiB':>9} {'joints':>8}")
+        for layout, path in paths.items():
+            scene.new_scene()
+            name_registry.get_registry().snapshot()
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            joints = landmark_import.create_landmark_joints(path, batch_size=args.batch_size)
+            seconds = time.perf_counter() - start
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            assert len(joints) == args.landmarks
+            assert len(set(joints)) == len(joints)
+            print(
+                f"{layout:>6} {os.path.getsize(path) / 2**20:>9.1f} {seconds:>8.3f} "
+                f"{peak / 2**20:>9.1f} {len(joints):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Time the memory mapped point cache on a large mesh
+
+The in-memory scene hands out its point buffer without a copy, the
+"extract" column copies it to stand in for MFnMesh.getPoints, which
+is what every query pays without the cache
+
+Run from the repo root:
+    python benchmarks/bench_point_cache.py
+    python benchmarks/bench_point_cache.py --vertices 20000000 --dtype float32
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.core import point_cache  # noqa: E402
+from mcRiggingToolkit.shared import scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+
+def timed(label: str, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    print(f"{label:<34} {(time.perf_counter() - start) * 1000.0:>10.2f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vertices", type=int, default=5_000_000)
+    parser.add_argument("--queries", type=int, default=16)
+    parser.add_argument("--dtype", choices=point_cache.DTYPES, default="float64")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scene = MemoryScene()
+    scene_backend.set_scene(scene)
+    mesh = scene.add_mesh("bench_geo", rng.normal(size=(args.vertices, 3)))
+    queries = rng.normal(size=(args.queries, 3))
+
+    with tempfile.TemporaryDirectory() as folder:
+        cache = point_cache.PointCache(folder, dtype=args.dtype)
+
+        print(f"{args.vertices} vertices, {args.dtype} cache")
+        extracted = timed("extract (copy the point buffer)", lambda: scene.mesh_points(mesh).copy())
+        timed("first get (write the cache)", cache.get, mesh)
+        points = timed("cached get (unchanged mesh)", cache.get, mesh)
+
+        center = timed("centroid on the map", point_cache.points_centroid, points)
+        low, high = timed("bounding box on the map", point_cache.points_bounding_box, points)
+        ids, _distances = timed(
+            f"nearest of {args.queries} on the map", point_cache.nearest_points, points, queries
+        )
+
+        tolerance = 1e-6 if args.dtype == "float32" else 1e-9
+        assert np.allclose(center, extracted.mean(axis=0), atol=tolerance)
+        assert np.allclose(low, extracted.min(axis=0), atol=tolerance)
+        assert np.allclose(high, extracted.max(axis=0), atol=tolerance)
+        expected = ((extracted[None] - queries[:, None]) ** 2).sum(axis=2).argmin(axis=1)
+        if args.dtype == "float64":
+            assert (ids == expected).all()
+
+        # a local edit the change callback has to catch
+        extracted[1:250] += 100.0
+        scene.set_mesh_points(mesh, extracted.copy())
+        points = timed("get after a local edit (rewrite)", cache.get, mesh)
+        assert np.allclose(point_cache.points_centroid(points), extracted.mean(axis=0), atol=tolerance)
+        assert len(os.listdir(folder)) == 1
+
+        cache.clear(remove_files=True)
+
+
+if __name__ == "__main__":
+    main()
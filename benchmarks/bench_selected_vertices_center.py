@@ -0,0 +1,85 @@
+"""
+Compare the old one point per vertex loop against the bulk path
+of selected_vertices_center
+
+Both paths run on the in-memory scene backend, so this times the backend
+neutral numpy work only, the OpenMaya calls MayaScene makes are not
+counted or timed here
+
+Run from the repo root:
+    python benchmarks/bench_selected_vertices_center.py
+    python benchmarks/bench_selected_vertices_center.py --sizes 10000 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.core.centroid_joint_creation import selected_vertices_center  # noqa: E402
+from mcRiggingToolkit.shared import scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+
+
+def per_vertex_center() -> np.ndarray:
+    """
+    The original approach, one point read and one python add per vertex id
+    """
+    scene = scene_backend.get_scene()
+    points = []
+
+    for mesh, vtx_ids, _weights in scene.selected_vertex_components():
+        mesh_points = scene.mesh_points(mesh)
+        for vtx_id in vtx_ids.tolist():
+            points.append(tuple(mesh_points[vtx_id]))
+
+    center = [0.0, 0.0, 0.0]
+    for x, y, z in points:
+        center[0] += x
+        center[1] += y
+        center[2] += z
+
+    return np.array(center) / len(points)
+
+
+def time_it(func) -> tuple:
+    """
+    Time a single call of func
+
+    Returns:
+        result, seconds (tuple): the return value and the wall time
+    """
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scene = MemoryScene()
+    scene_backend.set_scene(scene)
+
+    print(f"{'vertices':>10} {'per vertex (s)':>15} {'bulk (s)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        scene.new_scene()
+        mesh = scene.add_mesh("benchMesh", rng.random((size, 3)))
+        scene.select_vertices(mesh, np.arange(size))
+
+        slow, slow_time = time_it(per_vertex_center)
+        fast, fast_time = time_it(selected_vertices_center)
+
+        assert np.allclose(slow, fast)
+        print(f"{size:>10} {slow_time:>15.4f} {fast_time:>10.4f} {slow_time / fast_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
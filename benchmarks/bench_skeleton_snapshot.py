@@ -0,0 +1,162 @@
+"""
+Time saving and loading skeletons with skeleton_snapshot against a
+JSON file with one record per joint
+
+The skeleton is built, exported, loaded back mapped and fully read,
+then built again in a new scene and its world matrices are checked
+against the original. A chain captured without its moved, rotated and
+scaled parent group is rebuilt the same way first
+
+Run from the repo root:
+    python benchmarks/bench_skeleton_snapshot.py
+    python benchmarks/bench_skeleton_snapshot.py --counts 2000 50000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.core import skeleton_snapshot  # noqa: E402
+from mcRiggingToolkit.shared import scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+DEFAULT_COUNTS = [200, 2_000, 20_000]
+CHAIN_LENGTH = 20
+
+
+def random_skeleton(count: int, rng: np.random.Generator) -> skeleton_snapshot.Skeleton:
+    """
+    Chains of CHAIN_LENGTH joints under one root
+    """
+    indices = np.arange(count)
+    parents = np.where(indices % CHAIN_LENGTH == 1, 0, indices - 1).astype(np.int32)
+    parents[0] = -1
+    return skeleton_snapshot.Skeleton(
+        names=[f"bench_{index:06d}_jnt" for index in range(count)],
+        parents=parents,
+        world_matrices=np.tile(np.eye(4), (count, 1, 1)),
+        translate=rng.random((count, 3)),
+        rotate=rng.uniform(-np.pi, np.pi, (count, 3)),
+        joint_orient=rng.uniform(-np.pi, np.pi, (count, 3)),
+        rotate_order=rng.integers(0, 6, count).astype(np.int8),
+    )
+
+
+def write_json(path: str, skeleton: skeleton_snapshot.Skeleton) -> None:
+    records = [
+        {
+            "name": name,
+            "parent": int(skeleton.parents[index]),
+            "world_matrix": skeleton.world_matrices[index].ravel().tolist(),
+            "translate": skeleton.translate[index].tolist(),
+            "rotate": skeleton.rotate[index].tolist(),
+            "joint_orient": skeleton.joint_orient[index].tolist(),
+            "rotate_order": int(skeleton.rotate_order[index]),
+        }
+        for index, name in enumerate(skeleton.names)
+    ]
+    with open(path, "w") as f:
+        json.dump(records, f)
+
+
+def read_json(path: str) -> skeleton_snapshot.Skeleton:
+    with open(path) as f:
+        records = json.load(f)
+    return skeleton_snapshot.Skeleton(
+        names=[record["name"] for record in records],
+        parents=np.array([record["parent"] for record in records], dtype=np.int32),
+        world_matrices=np.array([record["world_matrix"] for record in records]).reshape(-1, 4, 4),
+        translate=np.array([record["translate"] for record in records]),
+        rotate=np.array([record["rotate"] for record in records]),
+        joint_orient=np.array([record["joint_orient"] for record in records]),
+        rotate_order=np.array([record["rotate_order"] for record in records], dtype=np.int8),
+    )
+
+
+def check_parented_root(scene: MemoryScene, folder: str) -> None:
+    """
+    Capture a chain under a group but not the group, its root has to
+    land at its old world position and not at its local values
+    """
+    scene.new_scene()
+    nodes = scene.create_nodes(
+        (("bench_grp", "transform", -1),)
+        + tuple((f"bench_chain_{index}_jnt", "joint", index) for index in range(4))
+    )
+    scene.set_attributes(
+        [
+            (nodes[0], "translateX", 10.0),
+            (nodes[0], "rotateY", 0.5),
+            (nodes[0], "scaleX", 2.0),
+            (nodes[0], "scaleY", 2.0),
+            (nodes[0], "scaleZ", 2.0),
+            (nodes[1], "translateY", 1.0),
+            (nodes[1], "rotateZ", 0.3),
+            (nodes[1], "rotateOrder", 4),
+        ]
+        + [(node, "translateX", 1.0) for node in nodes[2:]]
+    )
+    joints = nodes[1:]
+
+    path = os.path.join(folder, "parented_root.mcskel")
+    original = skeleton_snapshot.export_skeleton(path, joints)
+
+    scene.new_scene()
+    rebuilt = skeleton_snapshot.build_skeleton(skeleton_snapshot.read_skeleton(path))
+    assert np.allclose(scene.world_matrices(rebuilt), original.world_matrices)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scene = MemoryScene()
+    scene_backend.set_scene(scene)
+
+    print(
+        f"{'joints':>8} {'export':>9} {'load mmap':>10} {'load read':>10} "
+        f"{'json save':>10} {'json load':>10} {'build':>9} {'size KiB':>9}   (ms)"
+    )
+    with tempfile.TemporaryDirectory() as folder:
+        check_parented_root(scene, folder)
+        for count in args.counts:
+            path = os.path.join(folder, f"skeleton_{count}.mcskel")
+            json_path = os.path.join(folder, f"skeleton_{count}.json")
+
+            scene.new_scene()
+            joints = skeleton_snapshot.build_skeleton(random_skeleton(count, rng))
+
+            original, export_ms = timed(skeleton_snapshot.export_skeleton, path, joints)
+            _, mmap_ms = timed(skeleton_snapshot.read_skeleton, path, True)
+            loaded, read_ms = timed(skeleton_snapshot.read_skeleton, path, False)
+            _, json_save_ms = timed(write_json, json_path, original)
+            _, json_load_ms = timed(read_json, json_path)
+
+            scene.new_scene()
+            rebuilt, build_ms = timed(skeleton_snapshot.build_skeleton, loaded)
+            assert np.allclose(scene.world_matrices(rebuilt), original.world_matrices)
+            assert list(loaded.names) == list(original.names)
+
+            print(
+                f"{count:>8} {export_ms:>9.2f} {mmap_ms:>10.2f} {read_ms:>10.2f} "
+                f"{json_save_ms:>10.2f} {json_load_ms:>10.2f} {build_ms:>9.2f} "
+                f"{os.path.getsize(path) / 1024:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
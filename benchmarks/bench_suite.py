@@ -0,0 +1,380 @@
+"""
+Benchmark every toolkit operation against the in-memory scene and
+compare the timings with stored baselines
+
+Each case is run for every one of its parameters, the scene is rebuilt
+before each repeat and only the operation itself is timed, the best of
+the repeats is kept. Baselines are plain JSON of seconds per case and
+belong to the machine they were saved on.
+
+Run from the repo root:
+    python benchmarks/bench_suite.py --save
+    python benchmarks/bench_suite.py --threshold 0.25
+    python benchmarks/bench_suite.py --filter center --quick
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.core import (  # noqa: E402
+    centroid_joint_creation,
+    controller_creation,
+    rig_template,
+)
+from mcRiggingToolkit.shared import name_registry, scene_backend, selection_cache  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+DEFAULT_BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEATS = 5
+
+BENCHMARKS = {}
+SCENE = MemoryScene()
+
+
+def benchmark(*params, quick: tuple = None):
+    """
+    Register a benchmark case
+
+    The decorated function gets one parameter, builds its scene and
+    returns the operation to time as a callable without arguments
+
+    Args:
+        params: the parameters to run the case with
+        quick (tuple): smaller parameters used with --quick
+    """
+    def decorator(func):
+        BENCHMARKS[func.__name__] = (func, params, quick or params[:1])
+        return func
+
+    return decorator
+
+
+def new_scene() -> MemoryScene:
+    """
+    Returns:
+        scene (MemoryScene): the benchmark scene emptied and set as the active one
+    """
+    scene_backend.set_scene(SCENE)
+    SCENE.new_scene()
+    return SCENE
+
+
+def grid_mesh(scene: MemoryScene, name: str, rows: int, cols: int, offset: float = 0.0) -> str:
+    """
+    Add a flat quad grid of rows x cols vertices to the scene, moved
+    offset along x
+
+    Returns:
+        mesh (str): the name of the mesh
+    """
+    x, z = np.meshgrid(np.arange(cols, dtype=np.float64), np.arange(rows, dtype=np.float64))
+    points = np.stack([x.ravel() + offset, np.zeros(rows * cols), z.ravel()], axis=1)
+
+    corners = (np.arange(rows - 1)[:, None] * cols + np.arange(cols - 1)[None]).ravel()
+    connects = np.stack([corners, corners + 1, corners + cols + 1, corners + cols], axis=1)
+    counts = np.full(len(corners), 4)
+    return scene.add_mesh(name, points, counts, connects.ravel())
+
+
+def torus_mesh(scene: MemoryScene, name: str, rows: int, cols: int) -> str:
+    """
+    Add a closed quad torus of rows x cols vertices to the scene
+
+    Returns:
+        mesh (str): the name of the mesh
+    """
+    u, v = np.meshgrid(
+        np.linspace(0.0, 2.0 * np.pi, cols, endpoint=False),
+        np.linspace(0.0, 2.0 * np.pi, rows, endpoint=False),
+    )
+    radius = 3.0 + np.cos(v.ravel())
+    points = np.stack([radius * np.cos(u.ravel()), np.sin(v.ravel()), radius * np.sin(u.ravel())], axis=1)
+
+    row, col = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    row, col = row.ravel(), col.ravel()
+    next_row, next_col = (row + 1) % rows, (col + 1) % cols
+    connects = np.stack(
+        [row * cols + col, row * cols + next_col, next_row * cols + next_col, next_row * cols + col],
+        axis=1,
+    )
+    return scene.add_mesh(name, points, np.full(rows * cols, 4), connects.ravel())
+
+
+def add_transforms(scene: MemoryScene, count: int, base_name: str) -> list:
+    """
+    Fill the scene with count transforms named base_name_ctrl, base_name_01_ctrl, ...
+
+    Returns:
+        nodes (list): the names of the transforms
+    """
+    names = [f"{base_name}_ctrl"] + [f"{base_name}_{index:02d}_ctrl" for index in range(1, count)]
+    return scene.create_nodes(tuple((name, "transform", -1) for name in names))
+
+
+#######################################
+## Cases
+#######################################
+@benchmark(10_000, 100_000, 1_000_000, quick=(10_000,))
+def selected_vertices_center(size: int):
+    """
+    Vertex average of a selection of size vertices on a 1M vertex mesh
+    """
+    scene = new_scene()
+    mesh = scene.add_mesh("benchMesh", np.random.default_rng(0).random((1_000_000, 3)))
+    scene.select_vertices(mesh, np.arange(size))
+    return centroid_joint_creation.selected_vertices_center
+
+
+@benchmark(100, 300, 1_000, quick=(100,))
+def selected_island_centers(side: int):
+    """
+    Island centers of two grid meshes of side x side vertices
+    """
+    scene = new_scene()
+    for name in ("gridA", "gridB"):
+        mesh = grid_mesh(scene, name, side, side)
+        scene.select_vertices(mesh, np.arange(side * side))
+
+    return centroid_joint_creation.selected_island_centers
+
+
+@benchmark(100, 300, 1_000, quick=(100,))
+def selected_area_center(side: int):
+    """
+    Area weighted center of every face of two side x side vertex grids
+    """
+    scene = new_scene()
+    for name, offset in (("gridA", 0.0), ("gridB", 2.0 * side)):
+        mesh = grid_mesh(scene, name, side, side, offset)
+        scene.select_vertices(mesh, np.arange(side * side))
+
+    # both grids reduce to one center halfway between them
+    expected = np.array([1.5 * side - 0.5, 0.0, 0.5 * (side - 1)])
+    if not np.allclose(centroid_joint_creation.selected_area_center(), expected):
+        raise AssertionError("selected_area_center missed the second grid.")
+    return centroid_joint_creation.selected_area_center
+
+
+@benchmark(100, 300, 1_000, quick=(100,))
+def selected_face_islands(side: int):
+    """
+    Area weighted island centers of every other face column of a grid
+    of side x side vertices, the columns only meet through unselected faces
+    """
+    scene = new_scene()
+    mesh = grid_mesh(scene, "grid", side, side)
+    columns = np.arange(0, side - 1, 2)
+    rows = np.arange(side - 1)
+    scene.select_faces(mesh, (rows[:, None] * (side - 1) + columns[None]).ravel())
+
+    def run():
+        points, triangles, labels = centroid_joint_creation.selected_surface()
+        return centroid_joint_creation.triangle_centers(points, triangles, labels, "area")
+
+    centers = run()
+    if not np.allclose(np.sort(centers[:, 0]), columns + 0.5):
+        raise AssertionError("selected_surface joined face columns that do not touch.")
+    return run
+
+
+@benchmark(100, 300, 1_000, quick=(100,))
+def selected_volume_center(side: int):
+    """
+    Center of volume of a closed torus of side x side vertices
+    """
+    scene = new_scene()
+    mesh = torus_mesh(scene, "torus", side, side)
+    scene.select_vertices(mesh, np.arange(side))
+    return centroid_joint_creation.selected_volume_center
+
+
+@benchmark(100, 1_000, 10_000, quick=(100,))
+def create_joint(count: int):
+    """
+    count joints made one create_joint call at a time
+    """
+    new_scene()
+    positions = np.random.default_rng(0).random((count, 3)).tolist()
+
+    def run():
+        for position in positions:
+            centroid_joint_creation.create_joint("bench", "jnt", position)
+
+    return run
+
+
+@benchmark(100, 1_000, 10_000, quick=(100,))
+def create_joints(count: int):
+    """
+    count joints made in one batch
+    """
+    new_scene()
+    positions = np.random.default_rng(0).random((count, 3))
+    names = ["bench"] * count
+    return lambda: centroid_joint_creation.create_joints(positions, names)
+
+
+@benchmark(1_000, 10_000, 100_000, quick=(1_000,))
+def unique_ctrl_name(count: int):
+    """
+    100 new names for a base name that already has count controllers
+    """
+    scene = new_scene()
+    add_transforms(scene, count, "arm")
+    name_registry.get_registry()
+
+    def run():
+        for _ in range(100):
+            controller_creation.unique_ctrl_name("arm")
+
+    return run
+
+
+@benchmark(10, 100, 1_000, quick=(10,))
+def create_blank_controller(count: int):
+    """
+    Controllers matched and colored by side for count selected joints
+    """
+    scene = new_scene()
+    rng = np.random.default_rng(0)
+    names = [f"{('L', 'R', 'C')[index % 3]}_bench_{index:04d}" for index in range(count)]
+    joints = centroid_joint_creation.create_joints(rng.random((count, 3)), names)
+    scene.select(joints)
+
+    return lambda: controller_creation.create_blank_controllers(
+        list(selection_cache.selected_handles()), "circle", by_side=True
+    )
+
+
+@benchmark(100, 1_000, 10_000, quick=(100,))
+def selected_handles(count: int):
+    """
+    100 tool presses reading a selection of count nodes
+    """
+    scene = new_scene()
+    scene.select(add_transforms(scene, count, "sel"))
+
+    def run():
+        for _ in range(100):
+            selection_cache.selected_handles()
+
+    return run
+
+
+@benchmark(1, 10, 100, quick=(1,))
+def create_rig_template(count: int):
+    """
+    count rig templates built from the default template
+    """
+    new_scene()
+    rig_template.load_template()
+
+    def run():
+        for index in range(count):
+            rig_template.build_rig_template(f"bench{index:03d}")
+
+    return run
+
+
+#######################################
+## Runner
+#######################################
+def time_case(setup, param, repeats: int) -> float:
+    """
+    Returns:
+        seconds (float): the best wall time of repeats runs
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        operation = setup(param)
+        start = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_suite(names: list, repeats: int, quick: bool) -> dict:
+    """
+    Returns:
+        results (dict): seconds keyed by case[param]
+    """
+    results = {}
+    for name in names:
+        setup, params, quick_params = BENCHMARKS[name]
+        for param in quick_params if quick else params:
+            results[f"{name}[{param}]"] = time_case(setup, param, repeats)
+    return results
+
+
+def compare(results: dict, baselines: dict, threshold: float) -> list:
+    """
+    Print the results next to the baselines
+
+    Returns:
+        regressions (list): the cases slower than baseline * (1 + threshold)
+    """
+    regressions = []
+    print(f"{'case':<40} {'baseline (s)':>13} {'current (s)':>12} {'ratio':>7}")
+    for key, seconds in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            print(f"{key:<40} {'-':>13} {seconds:>12.5f} {'-':>7}")
+            continue
+
+        ratio = seconds / baseline
+        flag = ""
+        if ratio > 1.0 + threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:<40} {baseline:>13.5f} {seconds:>12.5f} {ratio:>6.2f}x{flag}")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--baselines", default=DEFAULT_BASELINES)
+    parser.add_argument("--save", action="store_true", help="store the results as the new baselines")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slow down before failing, 0.25 is 25%% slower",
+    )
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--filter", default="", help="only run cases with this in their name")
+    parser.add_argument("--quick", action="store_true", help="only the smallest parameters")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_suite(names, args.repeats, args.quick)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    regressions = compare(results, baselines, args.threshold)
+
+    if args.save:
+        baselines.update(results)
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"saved {len(results)} baselines to {args.baselines}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed past {args.threshold:.0%}: {regressions}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
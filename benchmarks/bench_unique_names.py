@@ -0,0 +1,83 @@
+"""
+Compare objExists probing against the shared name registry when
+creating thousands of nodes with the same base name
+
+Run from the repo root:
+    python benchmarks/bench_unique_names.py
+    python benchmarks/bench_unique_names.py --counts 1000 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcRiggingToolkit.shared import name_registry, scene_backend  # noqa: E402
+from mcRiggingToolkit.shared.memory_scene import MemoryScene  # noqa: E402
+
+DEFAULT_COUNTS = [500, 1_000, 5_000]
+
+
+def probe_unique_name(base_name: str) -> str:
+    """
+    The original objExists loop from RiggingToolsUI.unique_ctrl_name
+    """
+    scene = scene_backend.get_scene()
+    name = f"{base_name}_ctrl"
+    if not scene.exists(name):
+        return name
+
+    i = 1
+    while True:
+        name = f"{base_name}_{i:02d}_ctrl"
+        if not scene.exists(name):
+            return name
+        i += 1
+
+
+def create_nodes(count: int, unique_name) -> float:
+    """
+    Create count same named nodes
+
+    Returns:
+        seconds (float): the wall time taken
+    """
+    scene = scene_backend.get_scene()
+    start = time.perf_counter()
+    for _ in range(count):
+        scene.create_nodes(((unique_name("arm"), "transform", -1),))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    args = parser.parse_args()
+
+    scene = MemoryScene()
+    scene_backend.set_scene(scene)
+
+    print(f"{'nodes':>8} {'objExists (s)':>14} {'registry (s)':>13}")
+    for count in args.counts:
+        scene.new_scene()
+        probe_time = create_nodes(count, probe_unique_name)
+        probed = set(scene.node_names())
+
+        scene.new_scene()
+        registry = name_registry.NameRegistry(scene)
+        registry.snapshot()
+        registry.install_callbacks()
+        registry_time = create_nodes(
+            count, lambda base: registry.unique_name(base, "ctrl", padding=2)
+        )
+        registry.remove_callbacks()
+
+        # both schemes must hand out the same names, none renamed by the scene
+        assert set(scene.node_names()) == probed
+        assert len(probed) == count
+        print(f"{count:>8} {probe_time:>14.4f} {registry_time:>13.4f}")
+
+
+if __name__ == "__main__":
+    main()
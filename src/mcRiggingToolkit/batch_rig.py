@@ -0,0 +1,471 @@
+"""
+Build base rigs for many scene files without the UI
+
+A manifest lists the scene files and the operations to run on each of
+them. Scenes are spread over a pool of worker processes, each worker
+opens a scene, runs the operations in order and saves the result.
+
+Every finished scene is appended to a results file as one JSON line
+with its status and timings. The results file is also the checkpoint,
+running again with --resume skips the scenes already rigged.
+
+Run with mayapy so the workers can start Maya standalone:
+    mayapy -m mcRiggingToolkit.batch_rig manifest.json --workers 8
+    mayapy -m mcRiggingToolkit.batch_rig manifest.json --resume
+
+Manifest:
+    {
+        "output_dir": "rigs",
+        "operations": [
+            {"op": "rig_template", "rig_name": "{scene}"},
+            {"op": "joints_at_centroids", "meshes": ["body_geo"], "per_island": true},
+            {"op": "landmark_joints", "path": "landmarks/{scene}.csv"},
+            {"op": "controllers", "targets": "joints", "shape": "circle", "by_side": true}
+        ],
+        "scenes": ["chars/hero.ma", {"path": "chars/villain.ma", "operations": []}]
+    }
+
+Scenes given as an object may have their own operations, the others
+use the top level ones. {scene} in a string parameter is the scene
+file name without its extension.
+"""
+import argparse
+import concurrent.futures
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_RESULTS = "batch_results.jsonl"
+BACKENDS = ("maya", "memory")
+
+
+#######################################
+## Operations
+#######################################
+def op_rig_template(context: dict, rig_name: str = "{scene}", template: str = None) -> list:
+    """
+    Build the rig template groups
+
+    Args:
+        context (dict): what earlier operations on the scene made
+        rig_name (str): the name of the rig
+        template (str): the template file, the default template when None
+
+    Returns:
+        created (list): the nodes created
+    """
+    from mcRiggingToolkit.core import rig_template
+
+    if template is None:
+        return rig_template.build_rig_template(rig_name)
+    return rig_template.build_rig_template(rig_name, template)
+
+
+def op_joints_at_centroids(
+    context: dict,
+    meshes: list,
+    per_island: bool = True,
+    orient: bool = False,
+    aim_axis: str = "x",
+    up_axis: str = "y",
+    name: str = "{scene}",
+    sufix: str = "jnt",
+) -> list:
+    """
+    Create a joint at the center of every island of the meshes, or one
+    for all of them, the joints are kept in context["joints"]
+
+    Args:
+        context (dict): what earlier operations on the scene made
+        meshes (list): the meshes to use every vertex of
+
+    Returns:
+        created (list): the joints created
+    """
+    import numpy as np
+
+    from mcRiggingToolkit.core import centroid_joint_creation
+
+    points, labels = centroid_joint_creation.mesh_island_points(meshes)
+    if not per_island:
+        labels = np.zeros(len(points), dtype=np.int64)
+
+    joints = centroid_joint_creation.create_centroid_joints(
+        points, labels, orient, aim_axis, up_axis, name, sufix
+    )
+    context.setdefault("joints", []).extend(joints)
+    return joints
+
+
+def op_landmark_joints(
+    context: dict, path: str, sufix: str = "jnt", skip_invalid: bool = False
+) -> list:
+    """
+    Create a joint at every landmark in a landmark file, the joints are
+    kept in context["joints"]
+
+    Args:
+        context (dict): what earlier operations on the scene made
+        path (str): the landmark CSV or JSON file like landmarks/{scene}.csv,
+                    relative to the working directory
+
+    Returns:
+        created (list): the joints created
+    """
+    from mcRiggingToolkit.core import landmark_import
+
+    joints = landmark_import.create_landmark_joints(path, sufix, skip_invalid=skip_invalid)
+    context.setdefault("joints", []).extend(joints)
+    return joints
+
+
+def op_controllers(
+    context: dict,
+    targets: object = "joints",
+    shape: str = "circle",
+    color: list = None,
+    by_side: bool = False,
+    match: bool = True,
+) -> list:
+    """
+    Create a controller with an offset group on every target
+
+    Args:
+        context (dict): what earlier operations on the scene made
+        targets (object): a list of node names, or the name of a context
+                          entry like joints
+
+    Returns:
+        created (list): the controllers created
+    """
+    from mcRiggingToolkit.core import controller_creation
+
+    if isinstance(targets, str):
+        targets = context.get(targets, [])
+
+    if color is not None:
+        color = tuple(color)
+
+    controllers = controller_creation.create_blank_controllers(
+        list(targets), shape, color=color, by_side=by_side, match=match
+    )
+    context.setdefault("controllers", []).extend(controllers)
+    return controllers
+
+
+OPERATIONS = {
+    "rig_template": op_rig_template,
+    "joints_at_centroids": op_joints_at_centroids,
+    "landmark_joints": op_landmark_joints,
+    "controllers": op_controllers,
+}
+
+
+#######################################
+## Manifest and checkpoint
+#######################################
+def load_manifest(path: str) -> list:
+    """
+    Read a manifest into one job per scene
+
+    Args:
+        path (str): the manifest JSON file
+
+    Returns:
+        jobs (list): (scene path, operations, output path) for each scene,
+                     relative paths are relative to the manifest
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+
+    root = os.path.dirname(os.path.abspath(path))
+    output_dir = os.path.join(root, manifest.get("output_dir", "rigged"))
+    default_operations = manifest.get("operations", [])
+
+    jobs = []
+    for entry in manifest["scenes"]:
+        if isinstance(entry, str):
+            entry = {"path": entry}
+
+        scene_path = os.path.join(root, entry["path"])
+        operations = entry.get("operations", default_operations)
+        for operation in operations:
+            if operation.get("op") not in OPERATIONS:
+                raise ValueError(
+                    f"Unknown operation {operation.get('op')!r} for {scene_path}, "
+                    f"pick one of {sorted(OPERATIONS)}."
+                )
+
+        if "output" in entry:
+            output_path = os.path.join(root, entry["output"])
+        else:
+            output_path = os.path.join(output_dir, os.path.basename(scene_path))
+        jobs.append((scene_path, operations, output_path))
+
+    return jobs
+
+
+def read_checkpoint(path: str) -> set:
+    """
+    Args:
+        path (str): the results file of an earlier run
+
+    Returns:
+        done (set): the scene paths that finished without errors
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by the interruption
+            if result.get("status") == "ok":
+                done.add(result["scene"])
+    return done
+
+
+#######################################
+## Workers
+#######################################
+def init_worker(backend: str) -> None:
+    """
+    Start the scene backend once per worker process
+
+    Args:
+        backend (str): maya or memory
+    """
+    from mcRiggingToolkit.shared import scene_backend
+
+    if backend == "memory":
+        from mcRiggingToolkit.shared.memory_scene import MemoryScene
+
+        scene_backend.set_scene(MemoryScene())
+        return
+
+    import maya.standalone
+
+    maya.standalone.initialize(name="python")
+
+
+def format_params(params: dict, scene_name: str) -> dict:
+    """
+    Put the scene name in for {scene} in the string parameters
+    """
+    return {
+        key: value.format(scene=scene_name) if isinstance(value, str) else value
+        for key, value in params.items()
+    }
+
+
+def operation_params(operation, params: dict, scene_name: str) -> dict:
+    """
+    Bind the manifest parameters to an operation and fill in its
+    defaults, so a {scene} default is formatted like a given parameter
+
+    Args:
+        operation (callable): a function from OPERATIONS
+        params (dict): the parameters the manifest gives
+        scene_name (str): the scene file name without its extension
+
+    Returns:
+        params (dict): every parameter of the operation but context
+    """
+    bound = inspect.signature(operation).bind_partial(None, **params)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    arguments.pop(next(iter(arguments)))  # the context
+    return format_params(arguments, scene_name)
+
+
+def rig_scene(scene_path: str, operations: list, output_path: str) -> dict:
+    """
+    Open a scene, run the operations on it and save it, in a worker
+
+    Args:
+        scene_path (str): the scene file to rig
+        operations (list): {"op": name, ...params} for each operation
+        output_path (str): where to save the rigged scene
+
+    Returns:
+        result (dict): status, timings and what each operation made
+    """
+    from mcRiggingToolkit.shared import scene_backend
+
+    scene_name = os.path.splitext(os.path.basename(scene_path))[0]
+    result = {
+        "scene": scene_path,
+        "output": output_path,
+        "status": "ok",
+        "worker": os.getpid(),
+        "operations": [],
+    }
+    start = time.perf_counter()
+
+    try:
+        scene = scene_backend.get_scene()
+        scene.open_scene(scene_path)
+        result["open_seconds"] = time.perf_counter() - start
+
+        context = {}
+        for operation in operations:
+            op = OPERATIONS[operation["op"]]
+            params = operation_params(
+                op, {k: v for k, v in operation.items() if k != "op"}, scene_name
+            )
+            op_start = time.perf_counter()
+            created = op(context, **params)
+            result["operations"].append(
+                {
+                    "op": operation["op"],
+                    "seconds": time.perf_counter() - op_start,
+                    "created": len(created),
+                }
+            )
+
+        save_start = time.perf_counter()
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        scene.save_scene(output_path)
+        result["save_seconds"] = time.perf_counter() - save_start
+    except Exception as error:
+        result["status"] = "failed"
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["traceback"] = traceback.format_exc()
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+#######################################
+## Runner
+#######################################
+def run_batch(
+    jobs: list,
+    results_path: str,
+    workers: int = None,
+    backend: str = "maya",
+    resume: bool = False,
+    max_tasks_per_child: int = None,
+) -> list:
+    """
+    Rig every scene over a pool of worker processes
+
+    Args:
+        jobs (list): (scene path, operations, output path) from load_manifest
+        results_path (str): the JSON lines file results are appended to
+        workers (int): how many worker processes, one per CPU by default
+        backend (str): maya or memory
+        resume (bool): skip the scenes the results file has as ok
+        max_tasks_per_child (int): restart a worker after this many scenes
+                                   to keep Maya's memory in check
+
+    Returns:
+        results (list): the result of every scene run this time
+    """
+    if resume:
+        done = read_checkpoint(results_path)
+        skipped = [job for job in jobs if job[0] in done]
+        jobs = [job for job in jobs if job[0] not in done]
+        if skipped:
+            LOG.info(f"Resuming, {len(skipped)} scenes already rigged.")
+    elif os.path.exists(results_path):
+        os.remove(results_path)
+
+    if not jobs:
+        LOG.info("Nothing to rig.")
+        return []
+
+    pool_args = {"max_workers": workers, "initializer": init_worker, "initargs": (backend,)}
+    if max_tasks_per_child:
+        pool_args["max_tasks_per_child"] = max_tasks_per_child
+
+    os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(**pool_args) as pool, open(results_path, "a") as f:
+        futures = {pool.submit(rig_scene, *job): job for job in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            scene_path = futures[future][0]
+            try:
+                result = future.result()
+            except Exception as error:  # the worker itself died
+                result = {"scene": scene_path, "status": "failed", "error": repr(error)}
+
+            # one line per scene, flushed so an interruption keeps it
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            results.append(result)
+
+            LOG.info(
+                f"[{len(results)}/{len(jobs)}] {result['status']} {scene_path}"
+                + (f" in {result['seconds']:.2f}s" if "seconds" in result else "")
+            )
+
+    return results
+
+
+def summarize(results: list) -> str:
+    """
+    Args:
+        results (list): the results of run_batch
+
+    Returns:
+        summary (str): counts and timings of the run
+    """
+    ok = [result for result in results if result["status"] == "ok"]
+    failed = [result for result in results if result["status"] != "ok"]
+    lines = [f"{len(ok)} rigged, {len(failed)} failed"]
+
+    op_times = {}
+    for result in ok:
+        for operation in result["operations"]:
+            op_times.setdefault(operation["op"], []).append(operation["seconds"])
+    for op, seconds in op_times.items():
+        lines.append(f"  {op:<24} mean {sum(seconds) / len(seconds):.3f}s  max {max(seconds):.3f}s")
+
+    for result in failed:
+        lines.append(f"  FAILED {result['scene']}: {result.get('error')}")
+    return "\n".join(lines)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("manifest", help="the manifest JSON file")
+    parser.add_argument(
+        "--results",
+        help=f"results and checkpoint file, {DEFAULT_RESULTS} next to the manifest by default",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per CPU by default")
+    parser.add_argument("--resume", action="store_true", help="skip the scenes already rigged")
+    parser.add_argument("--backend", choices=BACKENDS, default="maya")
+    parser.add_argument("--max-tasks-per-child", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    jobs = load_manifest(args.manifest)
+    results_path = args.results or os.path.join(
+        os.path.dirname(os.path.abspath(args.manifest)), DEFAULT_RESULTS
+    )
+    results = run_batch(
+        jobs,
+        results_path,
+        workers=args.workers,
+        backend=args.backend,
+        resume=args.resume,
+        max_tasks_per_child=args.max_tasks_per_child,
+    )
+    print(summarize(results))
+    return 1 if any(result["status"] != "ok" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
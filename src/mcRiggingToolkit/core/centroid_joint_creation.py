@@ -1,47 +1,467 @@
-import maya.api.OpenMaya as om
-from maya import cmds
+import numpy as np
 
+from mcRiggingToolkit.core import (
+    joint_orientation,
+    mesh_topology,
+    point_cache,
+    point_clustering,
+    topology_cache,
+)
+from mcRiggingToolkit.shared import name_registry, profiler, scene_backend
 
-def selected_vertices_center() -> None:
+DEFAULT_CHUNK_SIZE = 65536
+# selections bigger than this are clustered with mini-batch k-means
+MINI_BATCH_THRESHOLD = 100_000
+MINI_BATCH_SIZE = 4096
+
+CENTROID_MODES = ("vertex", "area", "volume")
+
+
+class CentroidAccumulator:
+    """
+    Running compensated (Kahan) sum of points so a centroid can be
+    built from chunks without ever holding the whole selection
+    """
+
+    def __init__(self) -> None:
+        self.total = np.zeros(3, dtype=np.float64)
+        self.count = 0
+        self._compensation = np.zeros(3, dtype=np.float64)
+
+    def add(self, points: np.ndarray) -> None:
+        """
+        Add a chunk of points to the running sum
+
+        Args:
+            points (np.ndarray): (N, 3) array of points
+        """
+        if not len(points):
+            return
+
+        value = points.sum(axis=0) - self._compensation
+        total = self.total + value
+        self._compensation = (total - self.total) - value
+        self.total = total
+        self.count += len(points)
+
+    def center(self) -> np.ndarray:
+        """
+        Returns:
+            center (np.ndarray): the average of every point added so far
+        """
+        if not self.count:
+            raise RuntimeError("No points have been added to the accumulator.")
+        return self.total / self.count
+
+
+def iter_selected_vertex_chunks(components: list, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Lazily walk selected mesh vertices and yield their world
+    positions a chunk at a time
+
+    Args:
+        components (list): (mesh, vertex ids, weights) from
+                           SceneBackend.selected_vertex_components
+        chunk_size (int): the most vertices to gather per chunk
+
+    Yields:
+        mesh, points (tuple): the mesh name and an (N, 3) array
+                              of at most chunk_size points
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    for mesh, vtx_ids, _weights in components:
+        if vtx_ids.size == 0:
+            continue
+
+        points = point_cache.get_mesh_points(mesh)
+        for start in range(0, vtx_ids.size, chunk_size):
+            yield mesh, np.asarray(points[vtx_ids[start:start + chunk_size]], dtype=np.float64)
+
+
+@profiler.profiled
+def selected_vertices_center(chunk_size: int = DEFAULT_CHUNK_SIZE) -> object:
     """
     This will get the center point of vertex
     that you have selected
+
+    The selected points are gathered and summed by a
+    CentroidAccumulator a chunk at a time, so on top of the mesh points
+    the scene hands out only one chunk is held. MemoryScene and the
+    point cache give out their own buffers, in Maya
+    MayaScene.mesh_points copies each mesh below the cache size once
+
+    Args:
+        chunk_size (int): the most vertices to hold in memory at once
+
+    Returns:
+        center (om.MPoint): the average world position of the selection,
+                            a numpy array outside Maya
+    """
+    scene = scene_backend.get_scene()
+    return scene.point(vertices_center(chunk_size))
+
+
+def vertices_center(chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Args:
+        chunk_size (int): the most vertices to hold in memory at once
+
+    Returns:
+        center (np.ndarray): the average world position of the selection
     """
-    sel = om.MGlobal.getActiveSelectionList()
+    components = scene_backend.get_scene().selected_vertex_components()
+
+    accumulator = CentroidAccumulator()
+    for _mesh, points in iter_selected_vertex_chunks(components, chunk_size):
+        accumulator.add(points)
+
+    if not accumulator.count:
+        raise RuntimeError("No mesh vertices selected currently.")
+
+    # Average all points
+    return accumulator.center()
+
+
+@profiler.profiled
+def selected_points() -> np.ndarray:
+    """
+    This will get the world positions of every selected vertex
+
+    Returns:
+        points (np.ndarray): (N, 3) array of the selected points
+    """
+    components = scene_backend.get_scene().selected_vertex_components()
+
+    chunks = [points for _mesh, points in iter_selected_vertex_chunks(components)]
+    if not chunks:
+        raise RuntimeError("No mesh vertices selected currently.")
+
+    return np.concatenate(chunks)
+
 
-    if sel.length() == 0:
-        raise RuntimeError("We did not find anything selected.")
+def island_points(components) -> tuple:
+    """
+    This will split vertices of each mesh into the connected islands
+    they form
 
-    points = []
+    Topology and points come from the shared topology and point
+    caches, the islands are found with a vectorized union-find
+    so thousands of islands cost no extra scene queries
 
-    for i in range(sel.length()):
-        dag_path, component = sel.getComponent(i)
+    Args:
+        components (iterable): (mesh, vertex ids) for each mesh
 
-        # We only care about mesh vertices
-        if component.apiType() != om.MFn.kMeshVertComponent:
+    Returns:
+        points, labels (tuple): (N, 3) array of the points and the island
+                                number 0..K-1 of each point, None when
+                                there were no vertices
+    """
+    all_points = []
+    all_labels = []
+    island_count = 0
+    for mesh, vtx_ids in components:
+        if vtx_ids.size == 0:
             continue
 
-        mesh_fn = om.MFnMesh(dag_path)
-        comp_fn = om.MFnSingleIndexedComponent(component)
+        topology = topology_cache.get_mesh_topology(mesh)
+        vtx_ids, labels = mesh_topology.connected_components(
+            topology.vertex_offsets, topology.vertex_indices, vtx_ids
+        )
+
+        all_points.append(np.asarray(point_cache.get_mesh_points(mesh)[vtx_ids], dtype=np.float64))
+        all_labels.append(labels + island_count)
+        island_count += labels.max() + 1
+
+    if not all_points:
+        return None
 
-        for vtx_id in comp_fn.getElements():
-            pt = mesh_fn.getPoint(vtx_id, om.MSpace.kWorld)
-            points.append(pt)
+    return np.concatenate(all_points), np.concatenate(all_labels)
+
+
+@profiler.profiled
+def selected_island_points() -> tuple:
+    """
+    This will split the selected vertices of each mesh into the
+    connected islands they form
 
-    if not points:
+    Returns:
+        points, labels (tuple): (N, 3) array of the selected points and
+                                the island number 0..K-1 of each point
+    """
+    components = scene_backend.get_scene().selected_vertex_components()
+    islands = island_points((mesh, vtx_ids) for mesh, vtx_ids, _weights in components)
+    if islands is None:
         raise RuntimeError("No mesh vertices selected currently.")
 
-    # Average all points
-    center = om.MPoint()
-    for p in points:
-        center += p
+    return islands
+
+
+@profiler.profiled
+def mesh_island_points(meshes: list) -> tuple:
+    """
+    This will split every vertex of the meshes into their islands,
+    no selection needed
+
+    Args:
+        meshes (list): the names of the meshes
+
+    Returns:
+        points, labels (tuple): (N, 3) array of the points and the island
+                                number 0..K-1 of each point
+    """
+    scene = scene_backend.get_scene()
+    islands = island_points(
+        (mesh, np.arange(scene.mesh_vertex_count(mesh), dtype=np.int64)) for mesh in meshes
+    )
+    if islands is None:
+        raise RuntimeError(f"No vertices found on {meshes}.")
 
-    center /= len(points)
+    return islands
 
-    return center
 
+def label_centers(points: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    This will get the center of every labelled group of points
+
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        labels (np.ndarray): (N,) group number 0..K-1 of each point
+
+    Returns:
+        centers (np.ndarray): (K, 3) array with one center per group
+    """
+    count = labels.max() + 1
+    sizes = np.bincount(labels, minlength=count)
+    sums = np.stack(
+        [np.bincount(labels, points[:, axis], count) for axis in range(3)],
+        axis=1,
+    )
+    return sums / sizes[:, None]
 
-def create_joint(name: str = "new", sufix: str = "jnt", position: list = []) -> str:
+
+@profiler.profiled
+def selected_island_centers() -> np.ndarray:
+    """
+    This will get the center of every connected island of the
+    selected vertices
+
+    Returns:
+        centers (np.ndarray): (K, 3) array with one center per island
+    """
+    points, labels = selected_island_points()
+    return label_centers(points, labels)
+
+
+@profiler.profiled
+def selected_vertices_weighted_center() -> object:
+    """
+    This will get the center point of the soft selection, each
+    vertex pulls on the center by its falloff weight
+
+    Falls back to the plain active selection when soft select is off
+
+    Returns:
+        center (om.MPoint): the weighted world position of the selection,
+                            a numpy array outside Maya
+    """
+    scene = scene_backend.get_scene()
+    return scene.point(vertices_weighted_center())
+
+
+def vertices_weighted_center() -> np.ndarray:
+    """
+    Returns:
+        center (np.ndarray): the weighted world position of the selection
+    """
+    scene = scene_backend.get_scene()
+
+    weighted_sum = np.zeros(3, dtype=np.float64)
+    total_weight = 0.0
+
+    for mesh, vtx_ids, weights in scene.selected_vertex_components(soft=True):
+        if vtx_ids.size == 0:
+            continue
+
+        points = np.asarray(point_cache.get_mesh_points(mesh)[vtx_ids], dtype=np.float64)
+        weighted_sum += weights @ points
+        total_weight += weights.sum()
+
+    if total_weight <= 0.0:
+        raise RuntimeError("No weighted mesh vertices selected currently.")
+
+    return weighted_sum / total_weight
+
+
+def selected_surface(whole_shells: bool = False, islands: bool = True) -> tuple:
+    """
+    This will gather the selected faces as triangles
+
+    Selected faces are used when there are any, otherwise the faces
+    with every vertex selected
+
+    Args:
+        whole_shells (bool): use every face of the shells the selected
+                             faces or vertices are on instead
+        islands (bool): split the points into islands, when False every
+                        point of every mesh gets label 0 and no islands
+                        are searched
+
+    Returns:
+        points, triangles, labels (tuple): (V, 3) array of the points the
+                                           triangles use, (T, 3) array of
+                                           point ids and the island number
+                                           0..K-1 of each point
+    """
+    scene = scene_backend.get_scene()
+
+    components = scene.selected_face_components()
+    from_vertices = not components
+    if from_vertices:
+        components = [(mesh, vtx_ids) for mesh, vtx_ids, _weights in scene.selected_vertex_components()]
+
+    all_points = []
+    all_triangles = []
+    all_labels = []
+    point_count = 0
+    island_count = 0
+    for mesh, ids in components:
+        topology = topology_cache.get_mesh_topology(mesh)
+        counts, connects = topology.counts, topology.connects
+        if whole_shells:
+            _vtx_ids, shells = mesh_topology.connected_components(
+                topology.vertex_offsets,
+                topology.vertex_indices,
+                np.arange(topology.num_vertices, dtype=np.int64),
+            )
+            if from_vertices:
+                touched = shells[ids]
+            else:
+                touched = shells[mesh_topology.polygon_triangles(counts, connects, ids).ravel()]
+            faces = np.flatnonzero(np.isin(shells[connects[np.cumsum(counts) - counts]], touched))
+        elif from_vertices:
+            faces = mesh_topology.faces_within(counts, connects, ids)
+        else:
+            faces = np.unique(ids)
+
+        triangles = mesh_topology.polygon_triangles(counts, connects, faces)
+        if not len(triangles):
+            continue
+        if whole_shells and not mesh_topology.is_closed(triangles):
+            raise RuntimeError(f"{mesh} has open shells, a volume needs closed shells.")
+
+        used = np.zeros(topology.num_vertices, dtype=bool)
+        used[triangles.ravel()] = True
+        if not islands:
+            vtx_ids = np.flatnonzero(used)
+            labels = np.zeros(vtx_ids.size, dtype=np.int64)
+        elif whole_shells:
+            # the shells already are the islands
+            vtx_ids = np.flatnonzero(used)
+            _shells, labels = np.unique(shells[vtx_ids], return_inverse=True)
+        else:
+            # only the edges of the chosen faces join islands, faces that
+            # meet through unselected faces stay apart
+            offsets, indices = mesh_topology.csr_adjacency(
+                triangles[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), topology.num_vertices
+            )
+            vtx_ids, labels = mesh_topology.connected_components(
+                offsets, indices, np.flatnonzero(used)
+            )
+        all_points.append(np.asarray(point_cache.get_mesh_points(mesh)[vtx_ids], dtype=np.float64))
+        local = np.cumsum(used) - 1 + point_count
+        all_triangles.append(local[triangles])
+        all_labels.append(labels + island_count)
+        point_count += vtx_ids.size
+        if islands:
+            island_count += labels.max() + 1
+
+    if not all_triangles:
+        raise RuntimeError("No mesh faces selected currently.")
+
+    return np.concatenate(all_points), np.concatenate(all_triangles), np.concatenate(all_labels)
+
+
+def triangle_centers(
+    points: np.ndarray, triangles: np.ndarray, labels: np.ndarray, mode: str = "area"
+) -> np.ndarray:
+    """
+    This will get the center of every labelled group of triangles
+
+    area weighs the center of each triangle by its area, so dense
+    tessellation does not pull the center. volume is the center of
+    mass of the solid a closed group bounds, every triangle adds the
+    signed tetrahedron it makes with a point of its group
+
+    Args:
+        points (np.ndarray): (V, 3) array of points
+        triangles (np.ndarray): (T, 3) array of point ids
+        labels (np.ndarray): (V,) group number 0..K-1 of each point,
+                             the triangles of a group share its label
+        mode (str): area or volume
+
+    Returns:
+        centers (np.ndarray): (K, 3) array with one center per group
+    """
+    count = labels.max() + 1
+    groups = labels[triangles[:, 0]]
+    a, b, c = (points[triangles[:, corner]] for corner in range(3))
+
+    if mode == "area":
+        weights = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+        centroids = (a + b + c) / 3.0
+    elif mode == "volume":
+        # measure from a point of each group so far away shells keep precision
+        origins = np.zeros((count, 3), dtype=np.float64)
+        origins[labels[::-1]] = points[::-1]
+        origin = origins[groups]
+        a, b, c = a - origin, b - origin, c - origin
+        weights = np.einsum("ij,ij->i", a, np.cross(b, c)) / 6.0
+        centroids = (a + b + c) / 4.0 + origin
+    else:
+        raise ValueError(f"mode must be area or volume, got {mode!r}.")
+
+    totals = np.bincount(groups, weights, count)
+    if (np.abs(totals) <= np.finfo(np.float64).tiny).any():
+        raise RuntimeError(f"A selected group of faces has no {mode}.")
+
+    sums = np.stack(
+        [np.bincount(groups, weights * centroids[:, axis], count) for axis in range(3)],
+        axis=1,
+    )
+    return sums / totals[:, None]
+
+
+@profiler.profiled
+def selected_area_center() -> np.ndarray:
+    """
+    This will get the surface area weighted center of the selected faces
+
+    Returns:
+        center (np.ndarray): the area weighted world position of the faces
+    """
+    points, triangles, labels = selected_surface(islands=False)
+    return triangle_centers(points, triangles, labels, "area")[0]
+
+
+@profiler.profiled
+def selected_volume_center() -> np.ndarray:
+    """
+    This will get the center of mass of the closed shells the
+    selection is on
+
+    Returns:
+        center (np.ndarray): the world position of the center of volume
+    """
+    points, triangles, labels = selected_surface(whole_shells=True, islands=False)
+    return triangle_centers(points, triangles, labels, "volume")[0]
+
+
+@profiler.profiled
+def create_joint(
+    name: str = "new", sufix: str = "jnt", position: list = [], orientation: list = []
+) -> str:
     """
     This will create a joint in maya
 
@@ -50,30 +470,192 @@ def create_joint(name: str = "new", sufix: str = "jnt", position: list = []) ->
                          it should come in a list [x,y,z] format
         name (str): this is the name of the joint
         sufix (str): this ist he suffix to use for the joint default is 'jnt'
+        orientation (list): optional joint orient in degrees as [x,y,z]
 
     Returns:
         joint_created (str): this is the name of the joint that is created
     """
-    # look for duplicate joint names and auto
-    # number them up so all joint names are unique
-    find_dup_joints = cmds.ls(name, type="joint")
-    if find_dup_joints:
-        joint_name = name.split(sufix)[0]
-        joint_name = f"{name}{value:03d}_{sufix}"
-    else:
-        joint_name = name + "_" + sufix
+    positions = [list(position)[:3]] if len(position) else [[0.0, 0.0, 0.0]]
+    orientations = [list(orientation)] if len(orientation) else None
+    return create_joints(positions, [name], sufix, orientations)[0]
 
-    joint_created = cmds.joint(name=joint_name)
 
-    if position:
-        cmds.move(position[0], position[1], position[2], joint_created)
+@profiler.profiled
+def create_joints(
+    positions: np.ndarray, names: list, sufix: str = "jnt", orientations: np.ndarray = None
+) -> list:
+    """
+    This will create many joints at once
 
-    return joint_created
+    Every joint is built in a single scene transaction so the whole
+    batch is one undo step, there is no command or redraw per joint
 
+    Args:
+        positions (np.ndarray): (N, 3) array of world positions
+        names (list): N names for the joints, the suffix gets added and
+                      repeated names are numbered up
+        sufix (str): this ist he suffix to use for the joints default is 'jnt'
+        orientations (np.ndarray): optional (N, 3) joint orients in degrees
 
-def create_joint_at_cetered() -> None:
+    Returns:
+        joints_created (list): the names of the joints that are created
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    if len(names) != len(positions):
+        raise ValueError("There must be one name for every position.")
+
+    if orientations is None:
+        orientations = np.zeros_like(positions)
+    orientations = np.asarray(orientations, dtype=np.float64).reshape(-1, 3)
+
+    # number duplicate joint names up so all joint names are unique
+    registry = name_registry.get_registry()
+    joint_names = [registry.unique_name(name, sufix, padding=3) for name in names]
+
+    return scene_backend.get_scene().create_joints(joint_names, positions, orientations)
+
+
+@profiler.profiled
+def create_joint_at_cetered(
+    per_island: bool = False,
+    soft_selection: bool = False,
+    orient: bool = False,
+    aim_axis: str = "x",
+    up_axis: str = "y",
+    mode: str = "vertex",
+) -> list:
     """
     This will create a joint at the centroid of multiple vertex
+
+    Args:
+        per_island (bool): create one joint for every connected island
+                           of the selection instead of one for all of it
+        soft_selection (bool): weight the vertices by their soft selection
+                               falloff, only used for a single joint
+        orient (bool): orient the joints along the principal axes of
+                       their vertices
+        aim_axis (str): the joint axis to aim down the major axis
+        up_axis (str): the joint axis to point along the second axis
+        mode (str): vertex averages the selected vertices, area weighs
+                    the selected faces by their area and volume takes the
+                    center of mass of the closed shells they are on
+
+    Returns:
+        joints (list): the names of the joints created
     """
-    center_point = selected_vertices_center()
-    create_joint('test','jnt',list(center_point))
\ No newline at end of file
+    if mode not in CENTROID_MODES:
+        raise ValueError(f"mode must be one of {CENTROID_MODES}, got {mode!r}.")
+
+    if mode != "vertex":
+        if soft_selection:
+            raise ValueError("soft_selection only works with the vertex mode.")
+
+        points, triangles, labels = selected_surface(mode == "volume", islands=per_island)
+        centers = triangle_centers(points, triangles, labels, mode)
+        return create_centroid_joints(points, labels, orient, aim_axis, up_axis, centers=centers)
+
+    if not per_island and not orient:
+        if soft_selection:
+            center_point = vertices_weighted_center()
+        else:
+            center_point = vertices_center()
+        return [create_joint('test','jnt',list(center_point))]
+
+    if per_island:
+        points, labels = selected_island_points()
+    else:
+        points = selected_points()
+        labels = np.zeros(len(points), dtype=np.int64)
+
+    centers = None
+    if soft_selection and not per_island:
+        centers = vertices_weighted_center()[None]
+
+    return create_centroid_joints(points, labels, orient, aim_axis, up_axis, centers=centers)
+
+
+@profiler.profiled
+def create_centroid_joints(
+    points: np.ndarray,
+    labels: np.ndarray,
+    orient: bool = False,
+    aim_axis: str = "x",
+    up_axis: str = "y",
+    name: str = "test",
+    sufix: str = "jnt",
+    centers: np.ndarray = None,
+) -> list:
+    """
+    This will create a joint at the center of every labelled group of points
+
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        labels (np.ndarray): (N,) group number 0..K-1 of each point
+        orient (bool): orient the joints along the principal axes of
+                       their points
+        aim_axis (str): the joint axis to aim down the major axis
+        up_axis (str): the joint axis to point along the second axis
+        name (str): the base name of the joints
+        sufix (str): the suffix of the joints
+        centers (np.ndarray): optional (K, 3) positions to use instead
+                              of the group centers
+
+    Returns:
+        joints (list): the names of the joints created
+    """
+    if orient:
+        group_centers, matrices = joint_orientation.principal_frames(
+            points, labels, aim_axis, up_axis
+        )
+        orientations = joint_orientation.matrices_to_euler(matrices)
+    else:
+        group_centers = label_centers(points, labels)
+        orientations = None
+
+    if centers is None:
+        centers = group_centers
+
+    return create_joints(centers, [name] * len(centers), sufix, orientations)
+
+
+@profiler.profiled
+def create_cluster_joints(
+    count: int,
+    orient: bool = False,
+    aim_axis: str = "x",
+    up_axis: str = "y",
+    mini_batch: bool = None,
+    seed: int = 0,
+    name: str = "test",
+    sufix: str = "jnt",
+) -> list:
+    """
+    This will spread count joints over the selected vertices, the
+    vertices are split into count clusters with k-means and a joint
+    is made at the center of each one
+
+    Args:
+        count (int): how many joints to make
+        orient (bool): orient the joints along the principal axes of
+                       their cluster
+        aim_axis (str): the joint axis to aim down the major axis
+        up_axis (str): the joint axis to point along the second axis
+        mini_batch (bool): cluster with mini-batch k-means, by default
+                           only for selections over MINI_BATCH_THRESHOLD
+        seed (int): the random seed, the same seed places the same joints
+        name (str): the base name of the joints
+        sufix (str): the suffix of the joints
+
+    Returns:
+        joints (list): the names of the joints created
+    """
+    points = selected_points()
+    if mini_batch is None:
+        mini_batch = len(points) > MINI_BATCH_THRESHOLD
+
+    batch_size = max(MINI_BATCH_SIZE, 10 * count) if mini_batch else None
+    centers, labels = point_clustering.kmeans(points, count, batch_size=batch_size, seed=seed)
+
+    return create_centroid_joints(
+        points, labels, orient, aim_axis, up_axis, name, sufix, centers=centers
+    )
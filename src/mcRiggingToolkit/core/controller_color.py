@@ -0,0 +1,99 @@
+"""
+Apply drawing override colors to many controllers at once
+
+All the shape attributes are written in one scene transaction (one
+om.MDGModifier in Maya) so a whole rig is recolored in a single
+undo step
+"""
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+# the usual rigging colors for each side prefix
+SIDE_COLORS = {
+    "L": (0.0, 0.0, 1.0),
+    "R": (1.0, 0.0, 0.0),
+    "C": (1.0, 1.0, 0.0),
+}
+
+
+def color_override_values(shape: str, color: tuple) -> list:
+    """
+    The attribute writes that give a shape an RGB override color
+
+    Args:
+        shape (str): the curve shape to color
+        color (tuple): the (r, g, b) color from 0 to 1
+
+    Returns:
+        values (list): (node, attr, value) writes for set_attributes
+    """
+    return [
+        (shape, "overrideEnabled", True),
+        (shape, "overrideRGBColors", True),
+        (shape, "overrideColorR", float(color[0])),
+        (shape, "overrideColorG", float(color[1])),
+        (shape, "overrideColorB", float(color[2])),
+    ]
+
+
+@profiler.profiled
+def set_controllers_color(controllers: list, color: tuple) -> None:
+    """
+    This will color every curve shape of the controllers
+
+    Args:
+        controllers (list): the names of the controller transforms
+        color (tuple): the (r, g, b) color from 0 to 1
+    """
+    scene = scene_backend.get_scene()
+
+    values = []
+    for controller in controllers:
+        for shape in scene.curve_shapes(controller):
+            values.extend(color_override_values(shape, color))
+
+    scene.set_attributes(values)
+
+
+def controller_side(controller: str) -> str:
+    """
+    This will read the side prefix of a controller name,
+    L_arm_ctrl is L and so is l_arm_ctrl
+
+    Args:
+        controller (str): the name of the controller, long names are fine
+
+    Returns:
+        side (str): L, R, C or an empty string when there is no prefix
+    """
+    prefix = controller.split("|")[-1].split("_")[0].upper()
+    return prefix if prefix in SIDE_COLORS else ""
+
+
+@profiler.profiled
+def color_controllers_by_side(controllers: list, side_colors: dict = None) -> list:
+    """
+    This will color every controller by its side prefix in one pass
+
+    Args:
+        controllers (list): the names of the controller transforms
+        side_colors (dict): (r, g, b) color per side, defaults to SIDE_COLORS
+
+    Returns:
+        skipped (list): the controllers without a side prefix
+    """
+    side_colors = SIDE_COLORS if side_colors is None else side_colors
+    scene = scene_backend.get_scene()
+
+    values = []
+    skipped = []
+    for controller in controllers:
+        color = side_colors.get(controller_side(controller))
+        if color is None:
+            skipped.append(controller)
+            continue
+
+        for shape in scene.curve_shapes(controller):
+            values.extend(color_override_values(shape, color))
+
+    scene.set_attributes(values)
+    return skipped
@@ -0,0 +1,136 @@
+"""
+Build animation controllers with an offset group on top
+
+This is the scene work behind the Create Animation Control button,
+kept out of the UI so it can run headless and be benchmarked
+"""
+import logging
+
+from mcRiggingToolkit.core import controller_color, controller_shapes, match_space
+from mcRiggingToolkit.shared import name_registry, profiler, scene_backend
+
+LOG = logging.getLogger(__name__)
+
+
+@profiler.profiled
+def unique_ctrl_name(base_name: str) -> str:
+    """
+    Return a unique controller name based on a base_name.
+    Adds _01, _02, ... if the base_name already exists.
+
+    Args:
+        base_name (str): this is the base name
+
+    Returns:
+        name (str): new name created
+    """
+    # 2-digit suffix like _01, _02
+    return name_registry.get_registry().unique_name(base_name, "ctrl", padding=2)
+
+
+@profiler.profiled
+def create_curve_offset_group(controller_name: object, shape: str, match: bool = True) -> str:
+    """
+    Build the curve and offset group for the controller
+
+    Args:
+        controller_name (object): the name of the controller, when match is
+                                  on this is also the object to match and
+                                  can be its scene handle
+        shape (str): the name of the shape in controller_shapes.SHAPES
+        match (bool): move the offset group onto controller_name
+
+    Returns:
+        controller (str): the name of the controller curve
+    """
+    return create_curve_offset_groups([controller_name], shape, match)[0]
+
+
+@profiler.profiled
+def create_curve_offset_groups(controller_names: list, shape: str, match: bool = True) -> list:
+    """
+    Build the curves and offset groups for many controllers, the offset
+    groups are one transaction and the curves under them another
+
+    Args:
+        controller_names (list): the names of the controllers, when match
+                                 is on these are also the objects to match
+                                 and can be scene handles
+        shape (str): the name of the shape in controller_shapes.SHAPES
+        match (bool): move each offset group onto its controller_name
+
+    Returns:
+        controllers (list): the names of the controller curves
+    """
+    scene = scene_backend.get_scene()
+    short_controller_names = [
+        unique_ctrl_name(scene.node_name(controller_name)) for controller_name in controller_names
+    ]
+    offset_groups = scene.create_nodes(
+        tuple((f"{name}_offset", "transform", -1) for name in short_controller_names)
+    )
+    controllers = controller_shapes.create_controllers(
+        shape, short_controller_names, parents=offset_groups
+    )
+
+    if match:
+        match_space.match_objects_space(list(zip(controller_names, offset_groups)))
+
+    return controllers
+
+
+@profiler.profiled
+def color_controllers(controllers: list, color: tuple = None, by_side: bool = False) -> None:
+    """
+    Set the controller color on every controller in one go
+
+    Args:
+        controllers (list): the names of the controllers
+        color (tuple): the (r, g, b) color from 0 to 1, None keeps the default
+        by_side (bool): color by the L/R/C side prefix instead of color
+    """
+    if by_side:
+        skipped = controller_color.color_controllers_by_side(controllers)
+        if skipped:
+            LOG.warning(f"No L/R/C side prefix found on: {skipped}")
+        return
+
+    if color is None:
+        LOG.debug("No controller color picked, leaving the default color.")
+        return
+
+    controller_color.set_controllers_color(controllers, color)
+
+
+@profiler.profiled
+def create_blank_controllers(
+    targets: list,
+    shape: str,
+    color: tuple = None,
+    by_side: bool = False,
+    match: bool = True,
+) -> list:
+    """
+    This will create a colored controller for every target and leave the
+    selection as it was
+
+    Args:
+        targets (list): the objects to build controllers for as names or
+                        scene handles, or the custom controller names when
+                        match is off
+        shape (str): the name of the shape in controller_shapes.SHAPES
+        color (tuple): the (r, g, b) color from 0 to 1
+        by_side (bool): color by the L/R/C side prefix instead of color
+        match (bool): move each offset group onto its target
+
+    Returns:
+        controllers (list): the names of the controller curves
+    """
+    scene = scene_backend.get_scene()
+    orig_sel = scene.selection_snapshot()  # get origional selection
+
+    controllers = create_curve_offset_groups(targets, shape, match)
+    color_controllers(controllers, color, by_side)
+
+    scene.restore_selection(orig_sel)  # restore selection
+    return controllers
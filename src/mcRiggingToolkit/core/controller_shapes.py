@@ -0,0 +1,150 @@
+"""
+Library of controller shapes built straight from cached CV arrays
+
+Every shape is described once as numpy CV and knot arrays and the
+curve data made from them is cached per shape and size. Curves are
+created directly from that data (om.MFnNurbsCurve.create in Maya) so
+no makeNurbCircle or other construction history ends up in the rig
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+# a periodic cubic through a regular octagon at this radius passes
+# through radius 1 the same way makeNurbCircle does
+_CIRCLE_CV_RADIUS = 6.0 / (4.0 + 2.0 * np.cos(np.pi / 4.0))
+
+
+def _circle(plane: str = "xy") -> tuple:
+    """
+    Periodic cubic circle of radius 1
+
+    Args:
+        plane (str): the two axes the circle lies in
+
+    Returns:
+        curve (tuple): cvs, knots, degree, form
+    """
+    angles = np.linspace(0.0, 2.0 * np.pi, 8, endpoint=False)
+    ring = np.stack([np.cos(angles), np.sin(angles)], axis=1) * _CIRCLE_CV_RADIUS
+
+    cvs = np.zeros((8, 3))
+    cvs[:, ["xyz".index(plane[0]), "xyz".index(plane[1])]] = ring
+
+    # periodic curves repeat the first degree cvs at the end
+    cvs = np.concatenate([cvs, cvs[:3]])
+    knots = np.arange(-2.0, 11.0)
+    return cvs, knots, 3, "periodic"
+
+
+def _linear(points: list, closed: bool = False) -> tuple:
+    """
+    Degree 1 curve through points
+
+    Args:
+        points (list): the [x, y, z] points of the curve
+        closed (bool): join the last point back to the first
+
+    Returns:
+        curve (tuple): cvs, knots, degree, form
+    """
+    cvs = np.array(points, dtype=np.float64)
+    if closed:
+        cvs = np.concatenate([cvs, cvs[:1]])
+    knots = np.arange(float(len(cvs)))
+    form = "closed" if closed else "open"
+    return cvs, knots, 1, form
+
+
+SHAPES = {
+    "circle": lambda: [_circle("xy")],
+    "square": lambda: [_linear([[-1, 1, 0], [1, 1, 0], [1, -1, 0], [-1, -1, 0]], closed=True)],
+    "cube": lambda: [
+        _linear(
+            [
+                [-1, 1, 1], [1, 1, 1], [1, 1, -1], [-1, 1, -1], [-1, 1, 1],
+                [-1, -1, 1], [1, -1, 1], [1, 1, 1], [1, -1, 1], [1, -1, -1],
+                [1, 1, -1], [1, -1, -1], [-1, -1, -1], [-1, 1, -1], [-1, -1, -1],
+                [-1, -1, 1],
+            ]
+        )
+    ],
+    "arrow": lambda: [
+        _linear(
+            [
+                [0, 0, -2], [1, 0, -1], [0.5, 0, -1], [0.5, 0, 2],
+                [-0.5, 0, 2], [-0.5, 0, -1], [-1, 0, -1],
+            ],
+            closed=True,
+        )
+    ],
+    "diamond": lambda: [_linear([[0, 1, 0], [1, 0, 0], [0, -1, 0], [-1, 0, 0]], closed=True)],
+    "sphere": lambda: [_circle("xy"), _circle("yz"), _circle("xz")],
+}
+
+SHAPE_NAMES = list(SHAPES)
+
+
+@lru_cache(maxsize=None)
+def shape_arrays(shape: str, size: float = 1.0) -> tuple:
+    """
+    This will build the curve data for a shape once and
+    hand back the cached copy after that
+
+    Args:
+        shape (str): the name of the shape in SHAPES
+        size (float): uniform scale of the shape
+
+    Returns:
+        curves (tuple): (cvs, knots, degree, form) for each curve of the
+                        shape, cvs and knots as tuples so they can be
+                        cached again by the scene
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown controller shape '{shape}', pick one of {SHAPE_NAMES}.")
+
+    curves = []
+    for cvs, knots, degree, form in SHAPES[shape]():
+        cvs = tuple(tuple(cv) for cv in (cvs * size).tolist())
+        curves.append((cvs, tuple(knots.tolist()), degree, form))
+    return tuple(curves)
+
+
+@profiler.profiled
+def create_controllers(shape: str, names: list, size: float = 1.0, parents: list = None) -> list:
+    """
+    This will create many controllers of the same shape
+
+    The curves come from the cached arrays of the shape and are made
+    without history, the whole batch is one undo step
+
+    Args:
+        shape (str): the name of the shape in SHAPES
+        names (list): a name for the transform of each controller
+        size (float): uniform scale of the shape
+        parents (list): a node to put each controller under, the world
+                        when None
+
+    Returns:
+        controllers (list): the names of the controller transforms
+    """
+    curves = shape_arrays(shape, float(size))
+    return scene_backend.get_scene().create_curves(names, curves, parents)
+
+
+@profiler.profiled
+def create_controller(shape: str, name: str, size: float = 1.0) -> str:
+    """
+    This will create a single controller
+
+    Args:
+        shape (str): the name of the shape in SHAPES
+        name (str): the name of the controller transform
+        size (float): uniform scale of the shape
+
+    Returns:
+        controller (str): the name of the controller transform
+    """
+    return create_controllers(shape, [name], size)[0]
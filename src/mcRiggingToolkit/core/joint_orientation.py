@@ -0,0 +1,177 @@
+import numpy as np
+
+AXES = {"x": 0, "y": 1, "z": 2}
+
+# in the same order as the rotateOrder attribute enum
+ROTATE_ORDERS = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+_EVEN_ORDERS = ("xyz", "yzx", "zxy")
+
+# the six unique entries of a symmetric 3x3 matrix
+_UPPER_ROWS = np.array([0, 0, 0, 1, 1, 2])
+_UPPER_COLS = np.array([0, 1, 2, 1, 2, 2])
+
+
+def batch_covariance(points: np.ndarray, labels: np.ndarray) -> tuple:
+    """
+    This will get the center and covariance of many point sets
+    in a single pass over the points
+
+    Each set is shifted by its first point before the sums are
+    taken so far away sets do not lose precision
+
+    Args:
+        points (np.ndarray): (N, 3) array with every set concatenated
+        labels (np.ndarray): (N,) set number 0..B-1 of each point
+
+    Returns:
+        centers, covariances (tuple): (B, 3) centers and (B, 3, 3)
+                                      covariance matrices
+    """
+    count = int(labels.max()) + 1
+    sizes = np.bincount(labels, minlength=count).astype(np.float64)
+    if not sizes.all():
+        raise ValueError("Every label from 0 to the highest must have points.")
+
+    first = np.zeros((count, 3), dtype=np.float64)
+    first[labels[::-1]] = points[::-1]
+    shifted = points - first[labels]
+
+    sums = np.stack(
+        [np.bincount(labels, shifted[:, axis], count) for axis in range(3)], axis=1
+    )
+    products = np.stack(
+        [
+            np.bincount(labels, shifted[:, row] * shifted[:, col], count)
+            for row, col in zip(_UPPER_ROWS, _UPPER_COLS)
+        ],
+        axis=1,
+    )
+
+    means = sums / sizes[:, None]
+    upper = products / sizes[:, None] - means[:, _UPPER_ROWS] * means[:, _UPPER_COLS]
+
+    covariances = np.empty((count, 3, 3), dtype=np.float64)
+    covariances[:, _UPPER_ROWS, _UPPER_COLS] = upper
+    covariances[:, _UPPER_COLS, _UPPER_ROWS] = upper
+
+    return means + first, covariances
+
+
+def principal_frames(
+    points: np.ndarray, labels: np.ndarray, aim_axis: str = "x", up_axis: str = "y"
+) -> tuple:
+    """
+    This will build an orientation for every point set from its
+    principal axes
+
+    The longest spread of the points becomes aim_axis, the second
+    longest becomes up_axis and the last axis completes a right
+    handed frame. Each principal axis is flipped so its largest
+    world component is positive to keep the result stable
+
+    Args:
+        points (np.ndarray): (N, 3) array with every set concatenated
+        labels (np.ndarray): (N,) set number 0..B-1 of each point
+        aim_axis (str): the local axis to aim down the major axis
+        up_axis (str): the local axis to point along the second axis
+
+    Returns:
+        centers, matrices (tuple): (B, 3) centers and (B, 3, 3) rotation
+                                   matrices with the local axes as rows
+    """
+    if aim_axis not in AXES or up_axis not in AXES or aim_axis == up_axis:
+        raise ValueError("aim_axis and up_axis must be two different axes of x, y, z.")
+
+    centers, covariances = batch_covariance(points, labels)
+
+    # eigh sorts smallest first, we want the major axis first
+    _values, vectors = np.linalg.eigh(covariances)
+    vectors = np.swapaxes(vectors, 1, 2)[:, ::-1]
+
+    largest = np.abs(vectors).argmax(axis=2)
+    signs = np.sign(np.take_along_axis(vectors, largest[..., None], axis=2))
+    vectors = vectors * signs
+
+    aim = AXES[aim_axis]
+    up = AXES[up_axis]
+    other = 3 - aim - up
+
+    matrices = np.empty_like(vectors)
+    matrices[:, aim] = vectors[:, 0]
+    matrices[:, up] = vectors[:, 1]
+    matrices[:, other] = np.cross(
+        matrices[:, (other + 1) % 3], matrices[:, (other + 2) % 3]
+    )
+    return centers, matrices
+
+
+def matrices_to_euler(matrices: np.ndarray, order: str = "xyz") -> np.ndarray:
+    """
+    This will turn rotation matrices into euler angles
+
+    Matrices follow Maya's row vector layout, each row is a local axis
+
+    Args:
+        matrices (np.ndarray): (B, 3, 3) rotation matrices
+        order (str): the rotate order, one of ROTATE_ORDERS
+
+    Returns:
+        rotations (np.ndarray): (B, 3) x, y, z euler angles in degrees
+    """
+    first, second, third = (AXES[axis] for axis in order)
+    sign = 1.0 if order in _EVEN_ORDERS else -1.0
+
+    rotations = np.empty((len(matrices), 3), dtype=np.float64)
+    rotations[:, first] = np.arctan2(
+        sign * matrices[:, second, third], matrices[:, third, third]
+    )
+    rotations[:, second] = np.arcsin(np.clip(-sign * matrices[:, first, third], -1.0, 1.0))
+    rotations[:, third] = np.arctan2(
+        sign * matrices[:, first, second], matrices[:, first, first]
+    )
+    return np.degrees(rotations)
+
+
+def axis_rotation_matrices(axis: int, angles: np.ndarray) -> np.ndarray:
+    """
+    This will build rotation matrices about a single axis
+
+    Args:
+        axis (int): 0, 1 or 2 for x, y or z
+        angles (np.ndarray): (B,) angles in radians
+
+    Returns:
+        matrices (np.ndarray): (B, 3, 3) rotation matrices, row vector layout
+    """
+    first, second = [other for other in range(3) if other != axis]
+    sign = -1.0 if axis == 1 else 1.0
+    cos = np.cos(angles)
+    sin = np.sin(angles) * sign
+
+    matrices = np.zeros((len(angles), 3, 3), dtype=np.float64)
+    matrices[:, axis, axis] = 1.0
+    matrices[:, first, first] = cos
+    matrices[:, first, second] = sin
+    matrices[:, second, first] = -sin
+    matrices[:, second, second] = cos
+    return matrices
+
+
+def euler_to_matrices(rotations: np.ndarray, order: str = "xyz") -> np.ndarray:
+    """
+    This will turn euler angles into rotation matrices
+
+    Matrices follow Maya's row vector layout, each row is a local axis
+
+    Args:
+        rotations (np.ndarray): (B, 3) x, y, z euler angles in degrees
+        order (str): the rotate order, one of ROTATE_ORDERS
+
+    Returns:
+        matrices (np.ndarray): (B, 3, 3) rotation matrices
+    """
+    radians = np.radians(np.asarray(rotations, dtype=np.float64).reshape(-1, 3))
+    first, second, third = (
+        axis_rotation_matrices(AXES[axis], radians[:, AXES[axis]]) for axis in order
+    )
+    return first @ second @ third
@@ -0,0 +1,331 @@
+"""
+Create joints from landmark files written by the scanning pipeline
+
+Landmarks are named 3D points in one of three layouts:
+    .csv            a header with name, x, y and z columns, other columns
+                    are ignored
+    .jsonl/.ndjson  one {"name": ..., "position": [x, y, z]} per line
+    .json           an array of those records, x, y and z keys work in
+                    place of position
+
+Files are read one record at a time, a JSON array is decoded record by
+record from a small rolling buffer, so memory only holds the current
+batch. Every batch becomes one create_joints call, the joints get the
+suffix and are numbered up like create_joint names them
+"""
+import csv
+import json
+import logging
+import math
+import os
+import re
+
+import numpy as np
+
+from mcRiggingToolkit.core import centroid_joint_creation
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10_000
+READ_SIZE = 1 << 16
+# how many bad records to list when they are skipped
+MAX_REPORTED_ERRORS = 10
+
+CSV_EXTENSIONS = (".csv",)
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+JSON_EXTENSIONS = (".json",)
+
+INVALID_NAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_]")
+WHITESPACE = re.compile(r"\s*")
+
+# what the JSON array scanner expects next
+ARRAY_START = "array start"
+AFTER_RECORD = "after record"
+AFTER_COMMA = "after comma"
+
+
+class LandmarkError(ValueError):
+    """
+    A landmark record that can not become a joint
+    """
+
+
+#######################################
+## Reading
+#######################################
+def iter_csv_records(path: str):
+    """
+    Args:
+        path (str): a CSV file with a header row
+
+    Yields:
+        line, record (tuple): the line number and the row as a dict
+                              with lower case keys
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [column.strip().lower() for column in next(reader, [])]
+        missing = {"name", "x", "y", "z"}.difference(header)
+        if missing:
+            raise LandmarkError(f"{path} has no {', '.join(sorted(missing))} column in its header.")
+
+        for row in reader:
+            if row:
+                yield reader.line_num, dict(zip(header, row))
+
+
+def iter_json_lines_records(path: str):
+    """
+    Args:
+        path (str): a file with one JSON record per line
+
+    Yields:
+        line, record (tuple): the line number and the decoded record
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as error:
+                raise LandmarkError(f"{path} line {line_number}: {error.msg}.") from None
+
+
+def iter_json_array_records(path: str, read_size: int = READ_SIZE):
+    """
+    This will decode the records of a top level JSON array one at a
+    time, the file is read read_size characters at a time. Records must
+    be split by exactly one comma, a missing or trailing comma raises
+    with the character it was found at
+
+    Args:
+        path (str): a JSON file holding an array of records
+        read_size (int): how many characters to read at once
+
+    Yields:
+        index, record (tuple): the record number from 1 and the record
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, encoding="utf-8") as f:
+        # characters dropped from the front of buffer, for error positions
+        offset = 0
+        buffer = f.read(read_size)
+        while buffer and buffer.isspace():
+            offset += len(buffer)
+            buffer = f.read(read_size)
+        position = WHITESPACE.match(buffer).end()
+        if not buffer.startswith("[", position):
+            raise LandmarkError(f"{path} does not hold a JSON array of landmarks.")
+
+        position += 1
+        index = 0
+        state = ARRAY_START
+        eof = False
+        while True:
+            position = WHITESPACE.match(buffer, position).end()
+            if position >= len(buffer):
+                if eof:
+                    raise LandmarkError(f"{path} ends before its array is closed.")
+                chunk = f.read(read_size)
+                eof = not chunk
+                offset += position
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            character = buffer[position]
+            if state == AFTER_RECORD:
+                if character == "]":
+                    return
+                if character != ",":
+                    raise LandmarkError(
+                        f"{path} character {offset + position}: expected ',' or ']' "
+                        f"after record {index}, got {character!r}."
+                    )
+                position += 1
+                state = AFTER_COMMA
+                continue
+
+            if character == "]":
+                if state == ARRAY_START:
+                    return
+                raise LandmarkError(
+                    f"{path} character {offset + position}: trailing ',' after record {index}."
+                )
+            if character == ",":
+                raise LandmarkError(
+                    f"{path} character {offset + position}: expected record {index + 1}, got ','."
+                )
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+                # a number at the end of the buffer may go on in the next read
+                truncated = end == len(buffer) and not eof
+            except json.JSONDecodeError as error:
+                if eof:
+                    raise LandmarkError(f"{path} record {index + 1}: {error.msg}.") from None
+                truncated = True
+            if truncated:
+                # the record runs past the buffer, drop what was decoded and read on
+                chunk = f.read(read_size)
+                eof = not chunk
+                offset += position
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            index += 1
+            position = end
+            state = AFTER_RECORD
+            yield index, record
+
+
+def iter_records(path: str):
+    """
+    Args:
+        path (str): a landmark file, the layout is picked by extension
+
+    Yields:
+        location, record (tuple): the line or record number and the record
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in CSV_EXTENSIONS:
+        return iter_csv_records(path)
+    if extension in JSON_LINES_EXTENSIONS:
+        return iter_json_lines_records(path)
+    if extension in JSON_EXTENSIONS:
+        return iter_json_array_records(path)
+    raise LandmarkError(
+        f"Unknown landmark file type {extension!r}, use one of "
+        f"{CSV_EXTENSIONS + JSON_LINES_EXTENSIONS + JSON_EXTENSIONS}."
+    )
+
+
+#######################################
+## Validation
+#######################################
+def parse_record(record: dict) -> tuple:
+    """
+    This will check a landmark record and make its name safe for Maya,
+    characters Maya does not allow become underscores
+
+    Args:
+        record (dict): name plus a position list or x, y and z values
+
+    Returns:
+        name, position (tuple): the joint base name and the (x, y, z) floats
+    """
+    if not isinstance(record, dict):
+        raise LandmarkError(f"expected an object, got {type(record).__name__}")
+
+    name = INVALID_NAME_CHARACTERS.sub("_", str(record.get("name") or "").strip())
+    if not name.strip("_"):
+        raise LandmarkError(f"invalid name {record.get('name')!r}")
+    if name[0].isdigit():
+        name = f"_{name}"
+
+    if "position" in record:
+        position = record["position"]
+        if not isinstance(position, (list, tuple)) or len(position) != 3:
+            raise LandmarkError(f"{name} position must be [x, y, z]")
+    else:
+        position = [record.get(axis) for axis in ("x", "y", "z")]
+
+    try:
+        position = tuple(float(value) for value in position)
+    except (TypeError, ValueError):
+        raise LandmarkError(f"{name} has a position that is not a number: {position}") from None
+    if not all(math.isfinite(value) for value in position):
+        raise LandmarkError(f"{name} has a position that is not finite: {position}")
+
+    return name, position
+
+
+def iter_landmark_batches(path: str, batch_size: int = DEFAULT_BATCH_SIZE, skip_invalid: bool = False):
+    """
+    This will stream valid landmarks out of a file a batch at a time
+
+    Args:
+        path (str): the landmark file
+        batch_size (int): the most landmarks per batch
+        skip_invalid (bool): log and leave out bad records instead of
+                             raising on the first one
+
+    Yields:
+        names, positions (tuple): the base names and an (N, 3) array
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+
+    names = []
+    positions = []
+    # only the first few messages are kept, the rest are just counted
+    num_errors = 0
+    errors = []
+    for location, record in iter_records(path):
+        try:
+            name, position = parse_record(record)
+        except LandmarkError as error:
+            message = f"{os.path.basename(path)}:{location} {error}"
+            if not skip_invalid:
+                raise LandmarkError(message) from None
+            num_errors += 1
+            if num_errors <= MAX_REPORTED_ERRORS:
+                errors.append(message)
+            continue
+
+        names.append(name)
+        positions.append(position)
+        if len(names) >= batch_size:
+            yield names, np.array(positions, dtype=np.float64)
+            names = []
+            positions = []
+
+    if names:
+        yield names, np.array(positions, dtype=np.float64)
+
+    if num_errors:
+        LOG.warning(
+            f"Skipped {num_errors} invalid landmarks in {path}:\n  "
+            + "\n  ".join(errors)
+            + ("\n  ..." if num_errors > MAX_REPORTED_ERRORS else "")
+        )
+
+
+#######################################
+## Joints
+#######################################
+@profiler.profiled
+def create_landmark_joints(
+    path: str,
+    sufix: str = "jnt",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    skip_invalid: bool = False,
+) -> list:
+    """
+    This will create a joint at every landmark in a file
+
+    Args:
+        path (str): the landmark file
+        sufix (str): the suffix of the joints default is 'jnt'
+        batch_size (int): landmarks created per scene transaction
+        skip_invalid (bool): log and leave out bad records instead of
+                             raising on the first one, the joints of
+                             earlier batches are deleted again before
+                             the error is raised
+
+    Returns:
+        joints (list): the names of the joints created, in file order
+    """
+    joints = []
+    try:
+        for names, positions in iter_landmark_batches(path, batch_size, skip_invalid):
+            joints.extend(centroid_joint_creation.create_joints(positions, names, sufix))
+    except LandmarkError:
+        if joints:
+            scene_backend.get_scene().delete_nodes(joints)
+        raise
+    return joints
@@ -0,0 +1,156 @@
+"""
+Match the world space of many objects to many targets at once
+
+World matrices are read in one pass, decomposed together with numpy
+and the local values are written back in a single scene transaction
+"""
+import numpy as np
+
+from mcRiggingToolkit.core import joint_orientation
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+TRANSLATE_ATTRS = ("translateX", "translateY", "translateZ")
+ROTATE_ATTRS = ("rotateX", "rotateY", "rotateZ")
+SCALE_ATTRS = ("scaleX", "scaleY", "scaleZ")
+SHEAR_ATTRS = ("shearXY", "shearXZ", "shearYZ")
+JOINT_ORIENT_ATTRS = ("jointOrientX", "jointOrientY", "jointOrientZ")
+
+def decompose_matrices(matrices: np.ndarray) -> dict:
+    """
+    This will split transform matrices into their parts
+
+    Follows Maya's scale, shear, rotate, translate order with row
+    vectors, rotation is returned as xyz euler angles
+
+    Args:
+        matrices (np.ndarray): (N, 4, 4) matrices
+
+    Returns:
+        parts (dict): translate, rotate (degrees), scale and shear
+                      as (N, 3) arrays
+    """
+    rows = matrices[:, :3, :3]
+    row_x, row_y, row_z = rows[:, 0], rows[:, 1], rows[:, 2]
+
+    # gram schmidt, the leftovers along earlier axes are the shear
+    scale_x = np.linalg.norm(row_x, axis=1)
+    axis_x = row_x / scale_x[:, None]
+
+    shear_xy = np.einsum("ij,ij->i", axis_x, row_y)
+    row_y = row_y - shear_xy[:, None] * axis_x
+    scale_y = np.linalg.norm(row_y, axis=1)
+    axis_y = row_y / scale_y[:, None]
+
+    shear_xz = np.einsum("ij,ij->i", axis_x, row_z)
+    shear_yz = np.einsum("ij,ij->i", axis_y, row_z)
+    row_z = row_z - shear_xz[:, None] * axis_x - shear_yz[:, None] * axis_y
+    scale_z = np.linalg.norm(row_z, axis=1)
+    axis_z = row_z / scale_z[:, None]
+
+    rotation = np.stack([axis_x, axis_y, axis_z], axis=1)
+
+    # a mirrored matrix keeps a proper rotation with a negative scale
+    flipped = np.linalg.det(rotation) < 0
+    rotation[flipped] *= -1.0
+    scale = np.stack([scale_x, scale_y, scale_z], axis=1)
+    scale[flipped] *= -1.0
+
+    return {
+        "translate": matrices[:, 3, :3].copy(),
+        "rotate": joint_orientation.matrices_to_euler(rotation),
+        "scale": scale,
+        "shear": np.stack([shear_xy / scale_y, shear_xz / scale_z, shear_yz / scale_z], axis=1),
+    }
+
+
+@profiler.profiled
+def match_objects_space(
+    pairs: list,
+    translate: bool = True,
+    rotate: bool = False,
+    scale: bool = False,
+    shear: bool = False,
+) -> None:
+    """
+    Match world space of each move_object to its target_object
+
+    Joint orient on joints and the rotate order of every mover are
+    taken into account, pivots are expected to be at the origin
+
+    Args:
+        pairs (list): (target_object, move_object) pairs of names or
+                      scene handles
+        translate (bool): match the world position
+        rotate (bool): match the world rotation
+        scale (bool): match the world scale
+        shear (bool): match the world shear
+    """
+    if not pairs:
+        return
+
+    scene = scene_backend.get_scene()
+    targets = [target_object for target_object, _move_object in pairs]
+    movers = [move_object for _target_object, move_object in pairs]
+
+    # read every matrix in one pass
+    local = scene.world_matrices(targets) @ scene.parent_inverse_matrices(movers)
+    parts = decompose_matrices(local)
+
+    attrs = []
+    if translate:
+        attrs.append((TRANSLATE_ATTRS, parts["translate"]))
+    if rotate:
+        rotations = _mover_rotations(movers, parts["rotate"])
+        attrs.append((ROTATE_ATTRS, np.radians(rotations)))
+    if scale:
+        attrs.append((SCALE_ATTRS, parts["scale"]))
+    if shear:
+        attrs.append((SHEAR_ATTRS, parts["shear"]))
+
+    values = []
+    for names, columns in attrs:
+        for mover, row in zip(movers, columns.tolist()):
+            values.extend((mover, attr, value) for attr, value in zip(names, row))
+
+    scene.set_attributes(values)
+
+
+def _mover_rotations(movers: list, rotations: np.ndarray) -> np.ndarray:
+    """
+    Take joint orient out of the matched rotations and convert them
+    to each mover's rotate order
+
+    Args:
+        movers (list): the mover names
+        rotations (np.ndarray): (N, 3) xyz euler angles in degrees
+
+    Returns:
+        rotations (np.ndarray): (N, 3) rotate values in degrees
+    """
+    scene = scene_backend.get_scene()
+    matrices = joint_orientation.euler_to_matrices(rotations)
+
+    # joints rotate inside their orient, rotate = local * orient^-1
+    joints = [index for index, mover in enumerate(movers) if scene.node_type(mover) == "joint"]
+    if joints:
+        joint_orients = np.degrees(
+            np.stack(
+                [
+                    scene.get_attributes([movers[index] for index in joints], attr)
+                    for attr in JOINT_ORIENT_ATTRS
+                ],
+                axis=1,
+            )
+        )
+        orient = joint_orientation.euler_to_matrices(joint_orients)
+        matrices[joints] = matrices[joints] @ np.swapaxes(orient, 1, 2)
+
+    orders = scene.get_attributes(movers, "rotateOrder").astype(np.int64)
+    rotations = np.empty_like(rotations)
+    for order in np.unique(orders):
+        matching = orders == order
+        rotations[matching] = joint_orientation.matrices_to_euler(
+            matrices[matching], joint_orientation.ROTATE_ORDERS[order]
+        )
+
+    return rotations
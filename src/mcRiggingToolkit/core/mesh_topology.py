@@ -0,0 +1,202 @@
+import numpy as np
+
+
+def polygon_edges(counts: np.ndarray, connects: np.ndarray) -> np.ndarray:
+    """
+    This will build the unique edge list of a mesh from its
+    polygon arrays without looping over the polygons
+
+    Args:
+        counts (np.ndarray): vertex count per polygon
+        connects (np.ndarray): flat polygon vertex ids
+
+    Returns:
+        edges (np.ndarray): (E, 2) array of vertex id pairs, low id first
+    """
+    if not connects.size:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # every face vertex links to the next one, the last wraps to the first
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    position = np.arange(connects.size) - starts
+    next_position = starts + (position + 1) % np.repeat(counts, counts)
+
+    first = connects
+    second = connects[next_position]
+    low = np.minimum(first, second)
+    high = np.maximum(first, second)
+
+    # pack each pair into one integer so the dedupe is a flat unique
+    stride = int(connects.max()) + 1
+    keys = np.unique(low * stride + high)
+    return np.stack([keys // stride, keys % stride], axis=1)
+
+
+def csr_adjacency(edges: np.ndarray, num_vertices: int) -> tuple:
+    """
+    This will turn an edge list into compressed sparse row
+    vertex to vertex adjacency
+
+    Args:
+        edges (np.ndarray): (E, 2) array of vertex id pairs
+        num_vertices (int): the number of vertices on the mesh
+
+    Returns:
+        offsets, indices (tuple): the neighbours of vertex v are
+                                  indices[offsets[v]:offsets[v + 1]]
+    """
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.argsort(rows, kind="stable")
+
+    offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_vertices), out=offsets[1:])
+    return offsets, cols[order]
+
+
+def connected_components(
+    offsets: np.ndarray, indices: np.ndarray, vertex_ids: np.ndarray
+) -> np.ndarray:
+    """
+    This will split a set of vertices into the islands they form
+    over the mesh edges
+
+    A vectorized union-find: every pass hooks each edge's higher
+    root onto the lower one and then compresses the paths with
+    pointer jumping, until every edge shares a root
+
+    Args:
+        offsets (np.ndarray): CSR offsets from csr_adjacency
+        indices (np.ndarray): CSR neighbour ids from csr_adjacency
+        vertex_ids (np.ndarray): the vertex ids to split
+
+    Returns:
+        vertex_ids, labels (tuple): the sorted unique vertex ids and an
+                                    island number 0..K-1 for each of them
+    """
+    vertex_ids = np.unique(vertex_ids)
+    num_vertices = len(offsets) - 1
+
+    local = np.full(num_vertices, -1, dtype=np.int64)
+    local[vertex_ids] = np.arange(vertex_ids.size)
+
+    # only keep edges with both ends inside the set, in local ids
+    starts = offsets[vertex_ids]
+    degree = offsets[vertex_ids + 1] - starts
+    rows = np.repeat(np.arange(vertex_ids.size), degree)
+    slots = np.arange(degree.sum()) + np.repeat(starts - (np.cumsum(degree) - degree), degree)
+    cols = local[indices[slots]]
+    keep = cols > rows
+    rows, cols = rows[keep], cols[keep]
+
+    parent = np.arange(vertex_ids.size)
+    while True:
+        root_a, root_b = parent[rows], parent[cols]
+        linked = root_a != root_b
+        if not linked.any():
+            break
+
+        low = np.minimum(root_a[linked], root_b[linked])
+        high = np.maximum(root_a[linked], root_b[linked])
+        np.minimum.at(parent, high, low)
+
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    _roots, labels = np.unique(parent, return_inverse=True)
+    return vertex_ids, labels
+
+
+def csr_vertex_faces(counts: np.ndarray, connects: np.ndarray, num_vertices: int) -> tuple:
+    """
+    This will build compressed sparse row vertex to face adjacency
+    from the polygon arrays of a mesh
+
+    Args:
+        counts (np.ndarray): vertex count per polygon
+        connects (np.ndarray): flat polygon vertex ids
+        num_vertices (int): the number of vertices on the mesh
+
+    Returns:
+        offsets, indices (tuple): the faces using vertex v are
+                                  indices[offsets[v]:offsets[v + 1]]
+    """
+    face_ids = np.repeat(np.arange(counts.size), counts)
+    order = np.argsort(connects, kind="stable")
+
+    offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(connects, minlength=num_vertices), out=offsets[1:])
+    return offsets, face_ids[order]
+
+
+def faces_within(counts: np.ndarray, connects: np.ndarray, vertex_ids: np.ndarray) -> np.ndarray:
+    """
+    This will find the faces that have every one of their vertices
+    in a set of vertices
+
+    Args:
+        counts (np.ndarray): vertex count per polygon
+        connects (np.ndarray): flat polygon vertex ids
+        vertex_ids (np.ndarray): the vertex ids in the set
+
+    Returns:
+        faces (np.ndarray): the ids of the faces inside the set
+    """
+    if not counts.size:
+        return np.empty(0, dtype=np.int64)
+
+    inside = np.zeros(int(connects.max()) + 1, dtype=bool)
+    inside[vertex_ids[vertex_ids < inside.size]] = True
+    starts = np.cumsum(counts) - counts
+    return np.flatnonzero(np.logical_and.reduceat(inside[connects], starts))
+
+
+def polygon_triangles(counts: np.ndarray, connects: np.ndarray, faces: np.ndarray = None) -> np.ndarray:
+    """
+    This will fan triangulate polygons from their first vertex, exact
+    for convex planar polygons which covers the quads and triangles
+    of a rig mesh
+
+    Args:
+        counts (np.ndarray): vertex count per polygon
+        connects (np.ndarray): flat polygon vertex ids
+        faces (np.ndarray): only triangulate these faces, all when None
+
+    Returns:
+        triangles (np.ndarray): (T, 3) array of vertex ids
+    """
+    starts = np.cumsum(counts) - counts
+    if faces is not None:
+        starts = starts[faces]
+        counts = counts[faces]
+
+    fan = np.maximum(counts - 2, 0)
+    first = np.repeat(starts, fan)
+    # 1..n-2 for every polygon, the second corner of each fan triangle
+    corner = np.arange(fan.sum()) - np.repeat(np.cumsum(fan) - fan, fan) + 1
+
+    return np.stack(
+        [connects[first], connects[first + corner], connects[first + corner + 1]], axis=1
+    )
+
+
+def is_closed(triangles: np.ndarray) -> bool:
+    """
+    Args:
+        triangles (np.ndarray): (T, 3) array of vertex ids
+
+    Returns:
+        closed (bool): True when every edge is shared by exactly two
+                       triangles, so the triangles bound a volume
+    """
+    if not len(triangles):
+        return False
+
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    edges.sort(axis=1)
+    stride = int(triangles.max()) + 1
+    _keys, uses = np.unique(edges[:, 0] * stride + edges[:, 1], return_counts=True)
+    return bool((uses == 2).all())
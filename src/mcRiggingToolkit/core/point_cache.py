@@ -0,0 +1,361 @@
+"""
+Memory mapped point caches for very large meshes
+
+The points of a mesh are pulled out of the scene once and written to a
+.npy file named after a hash of the whole point buffer, later requests
+map that file instead of copying the point buffer again. Centroid,
+bounding box and nearest point queries walk the mapped points in chunks
+so a 20M vertex scan never holds more than one chunk in memory.
+
+A cached mesh stays valid until the scene says it changed, through
+SceneBackend.add_mesh_changed_callback (dirty plugs, world matrix,
+topology, rename and delete in Maya). Only then are the points read
+and hashed again, a file with the same hash is mapped without writing
+"""
+import hashlib
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "mcRiggingToolkit", "point_cache")
+# smaller meshes are cheaper to copy than to write out
+DEFAULT_MIN_VERTICES = 1_000_000
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+DTYPES = ("float32", "float64")
+
+
+def points_fingerprint(points: np.ndarray, dtype: str) -> str:
+    """
+    This will hash every point of a point buffer
+
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        dtype (str): the dtype of the cache, part of the key
+
+    Returns:
+        digest (str): the hex digest of the points
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{len(points)}:{dtype}:".encode())
+    for start in range(0, len(points), DEFAULT_CHUNK_SIZE):
+        hasher.update(
+            np.ascontiguousarray(points[start:start + DEFAULT_CHUNK_SIZE], dtype=np.float64).tobytes()
+        )
+    return hasher.hexdigest()
+
+
+class PointCache:
+    """
+    Mesh points on disk, mapped back in on request
+
+    Args:
+        cache_dir (str): the folder the .npy files go in
+        dtype (str): float32 halves the disk and page cache use,
+                     float64 keeps the points exact
+        min_vertices (int): meshes with fewer vertices are read straight
+                            from the scene
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        dtype: str = "float64",
+        min_vertices: int = DEFAULT_MIN_VERTICES,
+    ) -> None:
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}.")
+
+        self.cache_dir = cache_dir
+        self.dtype = dtype
+        self.min_vertices = min_vertices
+
+        self._maps = {}
+        self._mesh_keys = {}
+        # meshes whose map is current, dropped by their change callback
+        self._clean = set()
+        self._callbacks = {}
+        self._scene = None
+
+    def __len__(self) -> int:
+        return len(self._maps)
+
+    def path(self, key: str) -> str:
+        """
+        Args:
+            key (str): a points fingerprint
+
+        Returns:
+            path (str): the cache file for key
+        """
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get(self, mesh: str) -> np.ndarray:
+        """
+        Get the points of a mesh, the scene is only read again after the
+        mesh changed and the file is only written for points not seen yet
+
+        Args:
+            mesh (str): the name of the mesh
+
+        Returns:
+            points (np.ndarray): (N, 3) read only world space points,
+                                 mapped from disk for large meshes
+        """
+        scene = scene_backend.get_scene()
+        if scene is not self._scene:
+            self.clear()
+            self._scene = scene
+
+        if mesh in self._clean:
+            return self._maps[self._mesh_keys[mesh]]
+
+        if scene.mesh_vertex_count(mesh) < self.min_vertices:
+            return scene.mesh_points(mesh)
+
+        # watch again before reading, the name may now be another node and
+        # a change during the read must not be missed
+        self._watch(scene, mesh)
+        points = scene.mesh_points(mesh)
+        key = points_fingerprint(points, self.dtype)
+
+        previous = self._mesh_keys.get(mesh)
+        self._mesh_keys[mesh] = key
+        if previous is not None and previous != key:
+            self._drop(previous)
+
+        if key not in self._maps:
+            path = self.path(key)
+            if not os.path.exists(path):
+                self._write(path, points)
+            self._maps[key] = np.load(path, mmap_mode="r")
+
+        if mesh in self._callbacks:
+            self._clean.add(mesh)
+        return self._maps[key]
+
+    def invalidate(self, mesh: str) -> None:
+        """
+        Read the points of a mesh again on the next request
+
+        Args:
+            mesh (str): the name of the mesh
+        """
+        self._clean.discard(mesh)
+
+    def refresh(self, mesh: str) -> np.ndarray:
+        """
+        Write the cache of a mesh again whatever its callbacks say
+
+        Args:
+            mesh (str): the name of the mesh
+
+        Returns:
+            points (np.ndarray): the fresh points of the mesh
+        """
+        self._clean.discard(mesh)
+        key = self._mesh_keys.pop(mesh, None)
+        if key is not None:
+            self._drop(key)
+        return self.get(mesh)
+
+    def clear(self, remove_files: bool = False) -> None:
+        """
+        Forget every mapped mesh and stop listening to the scene
+
+        Args:
+            remove_files (bool): delete the cache files as well
+        """
+        for handle in self._callbacks.values():
+            self._scene.remove_callbacks(handle)
+        self._callbacks.clear()
+        self._clean.clear()
+        self._mesh_keys.clear()
+
+        for key in list(self._maps):
+            self._drop(key, remove_files)
+
+    def _watch(self, scene: scene_backend.SceneBackend, mesh: str) -> None:
+        """
+        Listen to changes of a mesh, without callbacks in the backend
+        the mesh is read and hashed on every request
+        """
+        handle = self._callbacks.pop(mesh, None)
+        if handle is not None:
+            scene.remove_callbacks(handle)
+        try:
+            self._callbacks[mesh] = scene.add_mesh_changed_callback(
+                mesh, lambda: self.invalidate(mesh), lambda: self.invalidate(mesh)
+            )
+        except NotImplementedError:
+            LOG.debug(f"No change callbacks for {mesh}, it is hashed on every request.")
+
+    @profiler.profiled
+    def _write(self, path: str, points: np.ndarray) -> None:
+        """
+        Write through a temporary file so a batch worker reading the same
+        key never maps half a file
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        output = np.lib.format.open_memmap(temp_path, mode="w+", dtype=self.dtype, shape=points.shape)
+        for start in range(0, len(points), DEFAULT_CHUNK_SIZE):
+            output[start:start + DEFAULT_CHUNK_SIZE] = points[start:start + DEFAULT_CHUNK_SIZE]
+        output.flush()
+        del output
+        os.replace(temp_path, path)
+
+    def _drop(self, key: str, remove_file: bool = True) -> None:
+        if key in self._mesh_keys.values():
+            return  # another mesh has the same points
+        self._maps.pop(key, None)
+        if not remove_file:
+            return
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            # still mapped somewhere (Windows) or already gone
+            LOG.debug(f"Could not remove point cache {self.path(key)}.")
+
+
+POINT_CACHE = PointCache()
+
+
+@profiler.profiled
+def get_mesh_points(mesh: str) -> np.ndarray:
+    """
+    Get the points of a mesh from the shared toolkit point cache
+
+    Args:
+        mesh (str): the name of the mesh
+
+    Returns:
+        points (np.ndarray): (N, 3) read only world space points
+    """
+    return POINT_CACHE.get(mesh)
+
+
+#######################################
+## Queries
+#######################################
+def _chunks(points: np.ndarray, vtx_ids: np.ndarray, chunk_size: int, dtype=np.float64):
+    """
+    Yield chunks of the points, or of the points at vtx_ids, as dtype
+    or as stored when dtype is None
+    """
+    total = len(points) if vtx_ids is None else len(vtx_ids)
+    for start in range(0, total, chunk_size):
+        if vtx_ids is None:
+            chunk = points[start:start + chunk_size]
+        else:
+            chunk = points[vtx_ids[start:start + chunk_size]]
+        yield start, np.asarray(chunk, dtype=dtype)
+
+
+def points_centroid(
+    points: np.ndarray, vtx_ids: np.ndarray = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> np.ndarray:
+    """
+    Args:
+        points (np.ndarray): (N, 3) points, mapped or in memory
+        vtx_ids (np.ndarray): only use these points, all of them when None
+        chunk_size (int): the most points to read at once
+
+    Returns:
+        center (np.ndarray): the average of the points
+    """
+    total = np.zeros(3, dtype=np.float64)
+    count = 0
+    for _start, chunk in _chunks(points, vtx_ids, chunk_size, dtype=None):
+        # a column at a time, reducing (N, 3) along axis 0 is far slower
+        for axis in range(3):
+            total[axis] += chunk[:, axis].sum(dtype=np.float64)
+        count += len(chunk)
+
+    if not count:
+        raise RuntimeError("No points to get the centroid of.")
+    return total / count
+
+
+def points_bounding_box(
+    points: np.ndarray, vtx_ids: np.ndarray = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> tuple:
+    """
+    Args:
+        points (np.ndarray): (N, 3) points, mapped or in memory
+        vtx_ids (np.ndarray): only use these points, all of them when None
+        chunk_size (int): the most points to read at once
+
+    Returns:
+        minimum, maximum (tuple): the corners of the box around the points
+    """
+    minimum = np.full(3, np.inf)
+    maximum = np.full(3, -np.inf)
+    for _start, chunk in _chunks(points, vtx_ids, chunk_size, dtype=None):
+        # a column at a time, reducing (N, 3) along axis 0 is far slower
+        for axis in range(3):
+            minimum[axis] = min(minimum[axis], chunk[:, axis].min())
+            maximum[axis] = max(maximum[axis], chunk[:, axis].max())
+
+    if not np.isfinite(minimum).all():
+        raise RuntimeError("No points to get the bounding box of.")
+    return minimum, maximum
+
+
+def nearest_points(
+    points: np.ndarray,
+    queries: np.ndarray,
+    vtx_ids: np.ndarray = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> tuple:
+    """
+    This will find the closest point to every query position with one
+    pass over the points, each chunk is tested against every query at once
+
+    Args:
+        points (np.ndarray): (N, 3) points, mapped or in memory
+        queries (np.ndarray): (M, 3) positions to search from
+        vtx_ids (np.ndarray): only search these points, all of them when None
+        chunk_size (int): the most points to read at once, made smaller
+                          for many queries to keep the distance table small
+
+    Returns:
+        ids, distances (tuple): (M,) id of the closest point in points and
+                                its distance for every query
+    """
+    queries = np.asarray(queries, dtype=np.float64)
+    if not queries.size:
+        raise RuntimeError("No points to search.")
+
+    queries = np.atleast_2d(queries)
+    # keep the (chunk, M) distance table around 64 MB
+    chunk_size = max(1024, min(chunk_size, (8 << 20) // len(queries)))
+
+    best_ids = np.full(len(queries), -1, dtype=np.int64)
+    best_distances = np.full(len(queries), np.inf)
+    query_norms = np.einsum("ij,ij->i", queries, queries)
+
+    for start, chunk in _chunks(points, vtx_ids, chunk_size):
+        # (M, chunk) so every query scans a contiguous row
+        distances = queries @ chunk.T
+        distances *= -2.0
+        distances += np.einsum("ij,ij->i", chunk, chunk)
+        distances += query_norms[:, None]
+        rows = distances.argmin(axis=1)
+        chunk_best = distances[np.arange(len(queries)), rows]
+
+        closer = chunk_best < best_distances
+        best_distances[closer] = chunk_best[closer]
+        best_ids[closer] = rows[closer] + start
+
+    if (best_ids < 0).any():
+        raise RuntimeError("No points to search.")
+    if vtx_ids is not None:
+        best_ids = np.asarray(vtx_ids)[best_ids]
+    return best_ids, np.sqrt(np.maximum(best_distances, 0.0))
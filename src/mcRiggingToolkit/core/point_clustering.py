@@ -0,0 +1,227 @@
+import numpy as np
+
+# points per block when measuring point to center distances, keeps the
+# (block, k) distance table around 32 MB for k = 500
+ASSIGN_BLOCK_SIZE = 8192
+# k-means++ seeding looks at a random sample this many times k
+SEED_SAMPLE_FACTOR = 20
+MIN_SEED_SAMPLE = 10_000
+
+
+def assign_clusters(
+    points: np.ndarray,
+    centers: np.ndarray,
+    point_norms: np.ndarray = None,
+    block_size: int = ASSIGN_BLOCK_SIZE,
+) -> tuple:
+    """
+    This will find the closest center of every point, a block of points
+    at a time so the full (N, K) distance table never exists
+
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        centers (np.ndarray): (K, 3) array of cluster centers
+        point_norms (np.ndarray): optional (N,) squared lengths of the
+                                  points when they are reused across calls
+        block_size (int): the most points to measure at once
+
+    Returns:
+        labels, distances (tuple): (N,) closest center of each point and
+                                   the squared distance to it
+    """
+    if point_norms is None:
+        point_norms = np.einsum("ij,ij->i", points, points)
+    center_norms = np.einsum("ij,ij->i", centers, centers)
+
+    labels = np.empty(len(points), dtype=np.int64)
+    distances = np.empty(len(points), dtype=np.float64)
+    for start in range(0, len(points), block_size):
+        block = points[start:start + block_size]
+        # |p|^2 is the same for every center so it only matters for the distance
+        table = block @ centers.T
+        table *= -2.0
+        table += center_norms
+
+        block_labels = table.argmin(axis=1)
+        labels[start:start + block_size] = block_labels
+        distances[start:start + block_size] = (
+            table[np.arange(len(block)), block_labels] + point_norms[start:start + block_size]
+        )
+
+    np.maximum(distances, 0.0, out=distances)
+    return labels, distances
+
+
+def kmeans_plus_plus(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    This will pick k starting centers spread out over the points, each
+    new center is drawn with a chance growing with the squared distance
+    to the closest center picked so far
+
+    Large inputs are seeded from a random sample of the points
+
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        k (int): how many centers to pick
+        rng (np.random.Generator): the random source
+
+    Returns:
+        centers (np.ndarray): (k, 3) array of starting centers
+    """
+    sample_size = max(SEED_SAMPLE_FACTOR * k, MIN_SEED_SAMPLE)
+    if len(points) > sample_size:
+        points = points[rng.choice(len(points), sample_size, replace=False)]
+
+    centers = np.empty((k, 3), dtype=np.float64)
+    centers[0] = points[rng.integers(len(points))]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+
+    for index in range(1, k):
+        total = closest.sum()
+        if total <= 0.0:
+            # fewer distinct points than centers, repeat some
+            centers[index:] = points[rng.integers(len(points), size=k - index)]
+            break
+
+        chosen = np.searchsorted(np.cumsum(closest), rng.random() * total)
+        centers[index] = points[min(chosen, len(points) - 1)]
+        np.minimum(closest, ((points - centers[index]) ** 2).sum(axis=1), out=closest)
+
+    return centers
+
+
+def cluster_sums(points: np.ndarray, labels: np.ndarray, k: int) -> tuple:
+    """
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        labels (np.ndarray): (N,) cluster number 0..k-1 of each point
+        k (int): the number of clusters
+
+    Returns:
+        sums, counts (tuple): (k, 3) sum of the points and (k,) point
+                              count of every cluster
+    """
+    counts = np.bincount(labels, minlength=k).astype(np.float64)
+    sums = np.stack([np.bincount(labels, points[:, axis], k) for axis in range(3)], axis=1)
+    return sums, counts
+
+
+def fill_empty_clusters(
+    points: np.ndarray, centers: np.ndarray, labels: np.ndarray, distances: np.ndarray
+) -> int:
+    """
+    This will move every center that lost all its points onto the point
+    furthest from its own center, changing the arrays in place
+
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        centers (np.ndarray): (K, 3) cluster centers
+        labels (np.ndarray): (N,) closest center of each point
+        distances (np.ndarray): (N,) squared distance to that center
+
+    Returns:
+        moved (int): how many centers were moved
+    """
+    empty = np.flatnonzero(np.bincount(labels, minlength=len(centers)) == 0)
+    if not empty.size:
+        return 0
+
+    furthest = np.argpartition(distances, -empty.size)[-empty.size:]
+    centers[empty] = points[furthest]
+    labels[furthest] = empty
+    distances[furthest] = 0.0
+    return empty.size
+
+
+def kmeans(
+    points: np.ndarray,
+    k: int,
+    max_iterations: int = 100,
+    tolerance: float = 1e-4,
+    batch_size: int = None,
+    seed: int = 0,
+) -> tuple:
+    """
+    This will split points into k clusters of nearby points
+
+    Lloyd's algorithm runs over every point each iteration. With a
+    batch_size it runs mini-batch k-means instead, each iteration moves
+    the centers toward a random batch of points, and one full pass at
+    the end labels every point
+
+    Args:
+        points (np.ndarray): (N, 3) array of points
+        k (int): how many clusters
+        max_iterations (int): the most iterations (batches for mini-batch)
+        tolerance (float): stop once no squared center shift is larger
+                           than this times the average variance of the
+                           points
+        batch_size (int): points per mini-batch, plain Lloyd when None
+        seed (int): the random seed, the same seed gives the same clusters
+
+    Returns:
+        centers, labels (tuple): (k, 3) cluster centers and the (N,)
+                                 cluster number 0..k-1 of each point
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if not 1 <= k <= len(points):
+        raise ValueError(f"k must be between 1 and the {len(points)} points, got {k}.")
+
+    rng = np.random.default_rng(seed)
+    centers = kmeans_plus_plus(points, k, rng)
+    # squared shifts are compared to the variance so the limit follows
+    # the units of the points
+    limit = tolerance * points.var(axis=0).mean()
+
+    if batch_size is not None and batch_size < len(points):
+        centers = _mini_batch(points, centers, max_iterations, limit, batch_size, rng)
+        max_iterations = 1
+
+    point_norms = np.einsum("ij,ij->i", points, points)
+    for _iteration in range(max_iterations):
+        labels, distances = assign_clusters(points, centers, point_norms)
+        fill_empty_clusters(points, centers, labels, distances)
+
+        sums, counts = cluster_sums(points, labels, k)
+        new_centers = sums / counts[:, None]
+        shift = ((new_centers - centers) ** 2).sum(axis=1).max()
+        centers = new_centers
+        if shift <= limit:
+            break
+
+    labels, distances = assign_clusters(points, centers, point_norms)
+    if fill_empty_clusters(points, centers, labels, distances):
+        sums, counts = cluster_sums(points, labels, k)
+        centers = sums / counts[:, None]
+    return centers, labels
+
+
+def _mini_batch(
+    points: np.ndarray,
+    centers: np.ndarray,
+    max_iterations: int,
+    limit: float,
+    batch_size: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Move each center toward the mean of its batch points with a step of
+    one over how many points it has seen, a batch at a time
+    """
+    k = len(centers)
+    seen = np.zeros(k, dtype=np.float64)
+
+    for _iteration in range(max_iterations):
+        batch = points[rng.integers(len(points), size=batch_size)]
+        labels, _distances = assign_clusters(batch, centers)
+
+        sums, counts = cluster_sums(batch, labels, k)
+        seen += counts
+        hit = counts > 0
+        step = (sums[hit] - counts[hit, None] * centers[hit]) / seen[hit, None]
+        centers[hit] += step
+
+        if hit.any() and (step ** 2).sum(axis=1).max() <= limit:
+            break
+
+    return centers
@@ -0,0 +1,91 @@
+"""
+Build rig group hierarchies from JSON templates
+
+A template is a tree of nodes, each with a name, an optional node
+type (transform by default) and optional children. Names can use
+{rig} to pull in the rig name. A template is parsed and flattened
+once, every build after that is a single scene transaction
+"""
+import json
+import os
+from functools import lru_cache
+
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+DEFAULT_TEMPLATE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "recources", "default_rig_template.json"
+)
+
+
+def compile_template(node: dict, parent: int = -1, compiled: list = None) -> tuple:
+    """
+    This will flatten a template tree into build steps, parents
+    always come before their children
+
+    Args:
+        node (dict): the template node with name, type and children
+        parent (int): the step index of the parent, -1 for the world
+        compiled (list): the steps gathered so far
+
+    Returns:
+        steps (tuple): (name, node_type, parent_index) for every node
+    """
+    compiled = [] if compiled is None else compiled
+
+    if not isinstance(node, dict) or not node.get("name"):
+        raise ValueError(f"Every template node needs a name, got: {node}")
+
+    unknown = set(node) - {"name", "type", "children"}
+    if unknown:
+        raise ValueError(f"Unknown template keys {sorted(unknown)} on '{node['name']}'.")
+
+    index = len(compiled)
+    compiled.append((node["name"], node.get("type", "transform"), parent))
+    for child in node.get("children", []):
+        compile_template(child, index, compiled)
+
+    return tuple(compiled)
+
+
+@lru_cache(maxsize=32)
+def _load_template(path: str, modified_time: float) -> tuple:
+    with open(path, "r", encoding="utf-8") as template_file:
+        return compile_template(json.load(template_file))
+
+
+def load_template(path: str = DEFAULT_TEMPLATE) -> tuple:
+    """
+    This will parse and compile a template file, the result is
+    cached until the file changes on disk
+
+    Args:
+        path (str): the path to the JSON template
+
+    Returns:
+        steps (tuple): the compiled build steps
+    """
+    path = os.path.abspath(path)
+    return _load_template(path, os.path.getmtime(path))
+
+
+@profiler.profiled
+def build_rig_template(rig_name: str, template_path: str = DEFAULT_TEMPLATE) -> list:
+    """
+    Create the groups for a rig template
+
+    Nodes are created and parented in one scene transaction without
+    looking anything up by name, so names already used by another
+    character never get in the way and the hierarchy is one undo step
+
+    Args:
+        rig_name (str): the name of the rig, fills in {rig}
+        template_path (str): the path to the JSON template
+
+    Returns:
+        nodes (list): the names of the nodes created, root first
+    """
+    steps = load_template(template_path)
+    steps = tuple(
+        (name.format(rig=rig_name), node_type, parent) for name, node_type, parent in steps
+    )
+    return scene_backend.get_scene().create_nodes(steps)
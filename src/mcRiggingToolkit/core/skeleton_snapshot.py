@@ -0,0 +1,283 @@
+"""
+Save and restore whole skeletons as one compact binary file
+
+The file is an 8 byte magic, the length of a JSON header, the header
+and then every array back to back, each one starting on a 64 byte
+boundary. The header holds the joint names and the dtype, shape and
+offset of every array, so reading is one small JSON parse plus an
+np.memmap (or one read) per array, no per joint work at all.
+
+Joints are stored parents first with the parent index of each joint,
+values are the local attributes in internal units (radians) next to
+the world matrices, which place the roots again and serve tools that
+only need positions
+"""
+import json
+from typing import NamedTuple
+
+import numpy as np
+
+from mcRiggingToolkit.core import joint_orientation
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+MAGIC = b"MCSKEL01"
+ALIGNMENT = 64
+
+# array name -> (dtype, shape per joint)
+SKELETON_ARRAYS = {
+    "parents": ("<i4", ()),
+    "world_matrices": ("<f8", (4, 4)),
+    "translate": ("<f8", (3,)),
+    "rotate": ("<f8", (3,)),
+    "joint_orient": ("<f8", (3,)),
+    "rotate_order": ("<i1", ()),
+}
+
+VECTOR_ATTRS = {
+    "translate": ("translateX", "translateY", "translateZ"),
+    "rotate": ("rotateX", "rotateY", "rotateZ"),
+    "joint_orient": ("jointOrientX", "jointOrientY", "jointOrientZ"),
+}
+SCALE_ATTRS = ("scaleX", "scaleY", "scaleZ")
+
+
+class Skeleton(NamedTuple):
+    """
+    Joints stored parents first, parents[i] is the index of the parent
+    of joint i or -1 for a root
+    """
+    names: list
+    parents: np.ndarray
+    world_matrices: np.ndarray
+    translate: np.ndarray
+    rotate: np.ndarray
+    joint_orient: np.ndarray
+    rotate_order: np.ndarray
+
+
+@profiler.profiled
+def capture_skeleton(joints: list) -> Skeleton:
+    """
+    This will read joints from the scene in bulk, a joint whose parent
+    is not in joints becomes a root, its world matrix places it again
+    when the skeleton is built
+
+    Args:
+        joints (list): the joints to capture as names or scene handles
+
+    Returns:
+        skeleton (Skeleton): the joints parents first
+    """
+    scene = scene_backend.get_scene()
+
+    long_names = [scene.node_name(joint, long=True) for joint in joints]
+    # a parent always has a shorter path than its children
+    order = sorted(range(len(joints)), key=lambda index: long_names[index].count("|"))
+    joints = [joints[index] for index in order]
+    long_names = [long_names[index] for index in order]
+
+    position = {name: index for index, name in enumerate(long_names)}
+    parents = np.array(
+        [position.get(name.rpartition("|")[0], -1) for name in long_names], dtype=np.int32
+    )
+
+    values = {
+        key: np.stack([scene.get_attributes(joints, attr) for attr in attrs], axis=1)
+        for key, attrs in VECTOR_ATTRS.items()
+    }
+    return Skeleton(
+        names=[name.rpartition("|")[2] for name in long_names],
+        parents=parents,
+        world_matrices=scene.world_matrices(joints),
+        rotate_order=scene.get_attributes(joints, "rotateOrder").astype(np.int8),
+        **values,
+    )
+
+
+def write_skeleton(path: str, skeleton: Skeleton) -> None:
+    """
+    Args:
+        path (str): the file to write
+        skeleton (Skeleton): the skeleton to store
+    """
+    count = len(skeleton.names)
+
+    arrays = {}
+    for key, (dtype, shape) in SKELETON_ARRAYS.items():
+        array = np.ascontiguousarray(getattr(skeleton, key), dtype=dtype)
+        if array.shape != (count, *shape):
+            raise ValueError(f"{key} has shape {array.shape}, expected {(count, *shape)}.")
+        arrays[key] = array
+
+    # offsets are relative to the end of the header so the header can be
+    # laid out first, then moved to absolute once its own size is known
+    layout = {}
+    offset = 0
+    for key, array in arrays.items():
+        layout[key] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    header = {"count": count, "names": list(skeleton.names), "arrays": layout}
+    data_start = _align(len(MAGIC) + 8 + len(json.dumps(header).encode("utf-8")) + 64)
+    for entry in layout.values():
+        entry["offset"] += data_start
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for key, array in arrays.items():
+            f.seek(layout[key]["offset"])
+            f.write(array.tobytes())
+
+
+def read_skeleton(path: str, mmap: bool = True) -> Skeleton:
+    """
+    Args:
+        path (str): the file to read
+        mmap (bool): map the arrays from the file instead of reading
+                     them, only the pages that are used get loaded
+
+    Returns:
+        skeleton (Skeleton): the stored skeleton, read only when mapped
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a skeleton snapshot.")
+        header = json.loads(f.read(int.from_bytes(f.read(8), "little")))
+
+        arrays = {}
+        for key, entry in header["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            shape = tuple(entry["shape"])
+            if mmap:
+                arrays[key] = np.memmap(path, dtype=dtype, mode="r", offset=entry["offset"], shape=shape)
+            else:
+                f.seek(entry["offset"])
+                arrays[key] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+    return Skeleton(names=header["names"], **{key: arrays[key] for key in SKELETON_ARRAYS})
+
+
+@profiler.profiled
+def export_skeleton(path: str, joints: list) -> Skeleton:
+    """
+    This will capture joints and write them to path
+
+    Args:
+        path (str): the file to write
+        joints (list): the joints to save as names or scene handles
+
+    Returns:
+        skeleton (Skeleton): what was written
+    """
+    skeleton = capture_skeleton(joints)
+    write_skeleton(path, skeleton)
+    return skeleton
+
+
+def root_local_values(skeleton: Skeleton) -> tuple:
+    """
+    This will turn the world matrices of the roots into local values for
+    joints that are built without a parent. The captured rotate is kept
+    and the joint orient takes up the rest of the world rotation, a scale
+    the root got from its old parents goes on the root itself
+
+    Args:
+        skeleton (Skeleton): the skeleton to build
+
+    Returns:
+        values, scale (tuple): translate, rotate and joint_orient arrays
+                               by VECTOR_ATTRS key with the roots replaced,
+                               and the (N, 3) scale of every joint
+    """
+    values = {key: np.array(getattr(skeleton, key), dtype=np.float64) for key in VECTOR_ATTRS}
+    scale = np.ones((len(skeleton.names), 3), dtype=np.float64)
+
+    roots = np.flatnonzero(np.asarray(skeleton.parents) < 0)
+    if not roots.size:
+        return values, scale
+
+    world = np.asarray(skeleton.world_matrices, dtype=np.float64)[roots]
+    axes = world[:, :3, :3]
+    root_scale = np.linalg.norm(axes, axis=2)
+    root_scale[np.isclose(root_scale, 1.0)] = 1.0
+    # a mirrored root keeps a right handed rotation with a negative scaleX
+    root_scale[np.linalg.det(axes) < 0.0, 0] *= -1.0
+    rotation = axes / root_scale[:, :, None]
+
+    orders = np.asarray(skeleton.rotate_order, dtype=np.int64)[roots]
+    rotate = np.degrees(values["rotate"][roots])
+    orient = np.empty_like(rotate)
+    for order in np.unique(orders):
+        matching = orders == order
+        # world = rotate @ joint orient, rotate is orthonormal
+        rotate_matrices = joint_orientation.euler_to_matrices(
+            rotate[matching], joint_orientation.ROTATE_ORDERS[order]
+        )
+        orient[matching] = joint_orientation.matrices_to_euler(
+            rotate_matrices.transpose(0, 2, 1) @ rotation[matching]
+        )
+
+    values["translate"][roots] = world[:, 3, :3]
+    values["joint_orient"][roots] = np.radians(orient)
+    scale[roots] = root_scale
+    return values, scale
+
+
+@profiler.profiled
+def build_skeleton(skeleton: Skeleton) -> list:
+    """
+    This will create the joints of a skeleton with their hierarchy and
+    local values, one transaction for the nodes and one for the values.
+    Roots are built at world level where their world matrix puts them
+
+    Args:
+        skeleton (Skeleton): the skeleton to build
+
+    Returns:
+        joints (list): the names of the joints created, names that are
+                       taken in the scene get numbered up
+    """
+    scene = scene_backend.get_scene()
+
+    steps = tuple(
+        (name, "joint", int(parent))
+        for name, parent in zip(skeleton.names, np.asarray(skeleton.parents).tolist())
+    )
+    joints = scene.create_nodes(steps)
+
+    local_values, scale = root_local_values(skeleton)
+    values = []
+    for key, attrs in VECTOR_ATTRS.items():
+        columns = local_values[key].T.tolist()
+        for attr, column in zip(attrs, columns):
+            values.extend((joint, attr, value) for joint, value in zip(joints, column) if value)
+    for attr, column in zip(SCALE_ATTRS, scale.T.tolist()):
+        values.extend((joint, attr, value) for joint, value in zip(joints, column) if value != 1.0)
+    values.extend(
+        (joint, "rotateOrder", order)
+        for joint, order in zip(joints, np.asarray(skeleton.rotate_order).tolist())
+        if order
+    )
+    scene.set_attributes(values)
+    return joints
+
+
+@profiler.profiled
+def import_skeleton(path: str) -> list:
+    """
+    This will read a skeleton file and build it in the scene
+
+    Args:
+        path (str): the skeleton file
+
+    Returns:
+        joints (list): the names of the joints created
+    """
+    return build_skeleton(read_skeleton(path))
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,246 @@
+import hashlib
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+from mcRiggingToolkit.core import mesh_topology
+from mcRiggingToolkit.shared import profiler, scene_backend
+
+LOG = logging.getLogger(__name__)
+
+# 512 MB of adjacency arrays before the least recently used get dropped
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+
+def topology_hash(counts: np.ndarray, connects: np.ndarray, num_vertices: int) -> str:
+    """
+    This will hash the polygon layout of a mesh
+
+    Only the face counts, face vertex ids and vertex count go in, so
+    moving points around (deformers, sculpting) keeps the same hash
+
+    Args:
+        counts (np.ndarray): vertex count per polygon
+        connects (np.ndarray): flat polygon vertex ids
+        num_vertices (int): the number of vertices on the mesh, loose
+                            vertices change the adjacency arrays
+
+    Returns:
+        digest (str): the hex digest of the topology
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{num_vertices}:".encode())
+    hasher.update(np.ascontiguousarray(counts, dtype=np.int64).tobytes())
+    hasher.update(np.ascontiguousarray(connects, dtype=np.int64).tobytes())
+    return hasher.hexdigest()
+
+
+class MeshTopology:
+    """
+    Adjacency arrays for one mesh topology in CSR layout
+
+    Args:
+        counts (np.ndarray): vertex count per polygon
+        connects (np.ndarray): flat polygon vertex ids
+        num_vertices (int): the number of vertices on the mesh
+    """
+
+    def __init__(self, counts: np.ndarray, connects: np.ndarray, num_vertices: int) -> None:
+        self.num_vertices = num_vertices
+        self.counts = counts
+        self.connects = connects
+        self.edges = mesh_topology.polygon_edges(counts, connects)
+        self.vertex_offsets, self.vertex_indices = mesh_topology.csr_adjacency(
+            self.edges, num_vertices
+        )
+        self.face_offsets, self.face_indices = mesh_topology.csr_vertex_faces(
+            counts, connects, num_vertices
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            nbytes (int): memory held by the arrays
+        """
+        return sum(
+            array.nbytes
+            for array in (
+                self.counts,
+                self.connects,
+                self.edges,
+                self.vertex_offsets,
+                self.vertex_indices,
+                self.face_offsets,
+                self.face_indices,
+            )
+        )
+
+    def vertex_neighbours(self, vtx_id: int) -> np.ndarray:
+        """
+        Args:
+            vtx_id (int): the vertex to look up
+
+        Returns:
+            neighbours (np.ndarray): the vertex ids sharing an edge with vtx_id
+        """
+        return self.vertex_indices[self.vertex_offsets[vtx_id]:self.vertex_offsets[vtx_id + 1]]
+
+    def vertex_faces(self, vtx_id: int) -> np.ndarray:
+        """
+        Args:
+            vtx_id (int): the vertex to look up
+
+        Returns:
+            faces (np.ndarray): the face ids using vtx_id
+        """
+        return self.face_indices[self.face_offsets[vtx_id]:self.face_offsets[vtx_id + 1]]
+
+
+class TopologyCache:
+    """
+    Least recently used cache of MeshTopology keyed by topology hash
+
+    Meshes that share a layout (duplicates, instances, the same mesh
+    after it deforms) all hit the same entry. Entries are evicted
+    oldest first once their arrays go over memory_budget
+
+    A mesh keeps its entry until the scene reports a topology change,
+    rename or delete through SceneBackend.add_mesh_changed_callback, only
+    then are its polygons read and hashed again
+
+    Args:
+        memory_budget (int): the most bytes of arrays to keep
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> None:
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()
+        self._nbytes = 0
+
+        self._mesh_keys = {}
+        # meshes whose key is current, dropped by their change callback
+        self._clean = set()
+        self._callbacks = {}
+        self._scene = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            nbytes (int): memory held by every cached topology
+        """
+        return self._nbytes
+
+    def get(self, mesh: str) -> MeshTopology:
+        """
+        Get the topology of a mesh, building it on a cache miss
+
+        Args:
+            mesh (str): the name of the mesh
+
+        Returns:
+            topology (MeshTopology): the adjacency arrays of the mesh
+        """
+        scene = scene_backend.get_scene()
+        if scene is not self._scene:
+            self.clear()
+            self._scene = scene
+
+        if mesh in self._clean:
+            key = self._mesh_keys[mesh]
+            topology = self._entries.get(key)
+            if topology is not None:
+                self._entries.move_to_end(key)
+                return topology
+
+        # watch again before reading, the name may now be another node
+        self._watch(scene, mesh)
+        counts, connects = scene.mesh_polygons(mesh)
+        num_vertices = scene.mesh_vertex_count(mesh)
+        key = topology_hash(counts, connects, num_vertices)
+        self._mesh_keys[mesh] = key
+        if mesh in self._callbacks:
+            self._clean.add(mesh)
+
+        topology = self._entries.get(key)
+        if topology is not None:
+            self._entries.move_to_end(key)
+            return topology
+
+        topology = MeshTopology(counts, connects, num_vertices)
+        self._entries[key] = topology
+        self._nbytes += topology.nbytes
+        self._evict()
+        return topology
+
+    def invalidate(self, mesh: str) -> None:
+        """
+        Read the polygons of a mesh again on the next request
+
+        Args:
+            mesh (str): the name of the mesh
+        """
+        self._clean.discard(mesh)
+
+    def clear(self) -> None:
+        """
+        Drop every cached topology and stop listening to the scene
+        """
+        for handle in self._callbacks.values():
+            self._scene.remove_callbacks(handle)
+        self._callbacks.clear()
+        self._clean.clear()
+        self._mesh_keys.clear()
+
+        self._entries.clear()
+        self._nbytes = 0
+
+    def _watch(self, scene: scene_backend.SceneBackend, mesh: str) -> None:
+        """
+        Listen to topology changes of a mesh, without callbacks in the
+        backend the mesh is read and hashed on every request
+        """
+        handle = self._callbacks.pop(mesh, None)
+        if handle is not None:
+            scene.remove_callbacks(handle)
+        try:
+            self._callbacks[mesh] = scene.add_mesh_changed_callback(
+                mesh, _ignore, lambda: self.invalidate(mesh)
+            )
+        except NotImplementedError:
+            LOG.debug(f"No change callbacks for {mesh}, it is hashed on every request.")
+
+    def _evict(self) -> None:
+        """
+        Drop the least recently used entries until under budget,
+        the newest entry is always kept
+        """
+        while self._nbytes > self.memory_budget and len(self._entries) > 1:
+            _key, topology = self._entries.popitem(last=False)
+            self._nbytes -= topology.nbytes
+
+
+def _ignore() -> None:
+    pass
+
+
+TOPOLOGY_CACHE = TopologyCache()
+
+
+@profiler.profiled
+def get_mesh_topology(mesh: str) -> MeshTopology:
+    """
+    Get the topology of a mesh from the shared toolkit cache
+
+    Args:
+        mesh (str): the name of the mesh
+
+    Returns:
+        topology (MeshTopology): the adjacency arrays of the mesh
+    """
+    return TOPOLOGY_CACHE.get(mesh)
@@ -1,7 +1,11 @@
-from mcRiggingToolkit.src.mcRiggingToolkit.ui.ui_main import show_ui
-
 def run() -> None:
     """
     Launches the mcRiggingToolkit main window
+
+    The UI is imported here rather than at the top so that importing the
+    launcher from a shelf button or userSetup costs nothing, the tools
+    themselves load on first use
     """
-    show_ui()
\ No newline at end of file
+    from mcRiggingToolkit.ui.ui_main import show_ui
+
+    show_ui()
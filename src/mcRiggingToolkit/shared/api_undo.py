@@ -0,0 +1,117 @@
+"""
+Put OpenMaya modifiers on the Maya undo queue
+
+Changes made through an om.MDGModifier or om.MDagModifier outside of
+a command never reach the undo queue. This file doubles as a tiny
+plugin that registers one command, commit() runs a modifier and then
+calls that command so the whole modifier becomes a single undo step
+"""
+import maya.api.OpenMaya as om
+from maya import cmds
+
+COMMAND_NAME = "mcApiUndo"
+
+# modifiers waiting for the undo command to pick them up
+_pending = []
+
+
+def maya_useNewAPI() -> None:
+    """
+    Tell Maya this plugin uses the python API 2.0
+    """
+
+
+class ApiUndoCommand(om.MPxCommand):
+    """
+    Holds one modifier and undoes or redoes it with the queue
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.modifier = None
+
+    @staticmethod
+    def creator() -> "ApiUndoCommand":
+        return ApiUndoCommand()
+
+    def doIt(self, args: om.MArgList) -> None:
+        # the plugin is loaded as its own module so read the
+        # pending modifiers from the package module
+        from mcRiggingToolkit.shared import api_undo
+
+        self.modifier = api_undo._pending.pop()
+
+    def undoIt(self) -> None:
+        self.modifier.undoIt()
+
+    def redoIt(self) -> None:
+        self.modifier.doIt()
+
+    def isUndoable(self) -> bool:
+        return True
+
+
+def initializePlugin(plugin: om.MObject) -> None:
+    om.MFnPlugin(plugin).registerCommand(COMMAND_NAME, ApiUndoCommand.creator)
+
+
+def uninitializePlugin(plugin: om.MObject) -> None:
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
+
+
+class InvertedModifier:
+    """
+    Swap the doIt and undoIt of a modifier, a modifier that deletes
+    nodes which already exist becomes the undo for making them
+
+    Args:
+        modifier (om.MDGModifier): the modifier to invert
+    """
+
+    def __init__(self, modifier: om.MDGModifier) -> None:
+        self.modifier = modifier
+
+    def doIt(self) -> None:
+        self.modifier.undoIt()
+
+    def undoIt(self) -> None:
+        self.modifier.doIt()
+
+
+def record(modifier: om.MDGModifier) -> None:
+    """
+    Put a modifier that has already run on the undo queue
+
+    Args:
+        modifier (om.MDGModifier): anything with doIt and undoIt
+    """
+    if not hasattr(cmds, COMMAND_NAME):
+        cmds.loadPlugin(__file__, quiet=True)
+
+    _pending.append(modifier)
+    getattr(cmds, COMMAND_NAME)()
+
+
+def commit(modifier: om.MDGModifier) -> None:
+    """
+    Run a modifier and record it as one undo step
+
+    Args:
+        modifier (om.MDGModifier): the modifier to run, a dag modifier works too
+    """
+    modifier.doIt()
+    record(modifier)
+
+
+def record_created(nodes: list) -> None:
+    """
+    Record nodes made outside of a modifier, for example with
+    om.MFnNurbsCurve.create, as one undo step
+
+    Args:
+        nodes (list): the om.MObject dag nodes that were created
+    """
+    deleter = om.MDagModifier()
+    for node in nodes:
+        deleter.deleteNode(node)
+    record(InvertedModifier(deleter))
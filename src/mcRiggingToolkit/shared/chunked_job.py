@@ -0,0 +1,192 @@
+"""
+Split a tool's work over many items into small slices
+
+A ChunkedJob hands its items to the work function a slice at a time so
+whoever drives it (the Qt event loop in ui.job_runner, a plain loop
+headless) can update progress and react to cancel between slices. The
+slice size adapts so each slice takes about slice_time seconds.
+
+Nodes created inside a slice are tracked through a node added callback
+that is only installed while the work function runs, so nodes made
+between slices are left alone. They are kept by scene handle, which
+follows renames and reparenting and never mixes up nodes sharing a
+short name. Cancelling or failing deletes the ones still there and puts
+the selection back the way it was before the job started
+"""
+import logging
+import time
+
+from mcRiggingToolkit.shared import scene_backend
+
+LOG = logging.getLogger(__name__)
+
+# a slice this long keeps the UI responsive without much scheduling cost
+DEFAULT_SLICE_TIME = 0.05
+
+PENDING = "pending"
+RUNNING = "running"
+FINISHED = "finished"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class ChunkedJob:
+    """
+    Work over a list of items that can be cancelled and rolled back
+
+    Args:
+        items (list): the items to work on
+        work (callable): called with a slice of items, returns a list of results
+        label (str): what the job does, for progress and logs
+        slice_time (float): the seconds each slice should take
+    """
+
+    def __init__(
+        self,
+        items: list,
+        work,
+        label: str = "",
+        slice_time: float = DEFAULT_SLICE_TIME,
+    ) -> None:
+        self.items = list(items)
+        self.work = work
+        self.label = label
+        self.slice_time = slice_time
+
+        self.state = PENDING
+        self.done = 0
+        self.results = []
+        self.error = None
+
+        self._slice_size = 1
+        # handles of the nodes made inside slices, oldest first
+        self._created = []
+        self._callbacks = None
+        self._selection = None
+        self._scene = None
+
+    @property
+    def total(self) -> int:
+        return len(self.items)
+
+    @property
+    def created(self) -> list:
+        """
+        Returns:
+            nodes (list): the full paths of the nodes created by the job
+                          so far, oldest first
+        """
+        return [
+            self._scene.node_name(node, long=True)
+            for node in self._created
+            if self._scene.exists(node)
+        ]
+
+    def start(self) -> None:
+        """
+        Remember the selection and listen for a new scene, which leaves
+        nothing to roll back
+        """
+        if self.state != PENDING:
+            raise RuntimeError(f"Job '{self.label}' was already started.")
+
+        self._scene = scene_backend.get_scene()
+        self._selection = self._scene.selection_snapshot()
+        self._callbacks = self._scene.add_callbacks(
+            _ignore, _ignore, _ignore, self._scene_reset
+        )
+        self.state = RUNNING
+
+    def step(self) -> bool:
+        """
+        Work on the next slice of items
+
+        Returns:
+            more (bool): True while there are items left
+        """
+        if self.state != RUNNING:
+            return False
+
+        chunk = self.items[self.done:self.done + self._slice_size]
+        start = time.perf_counter()
+        try:
+            self.results.extend(self._tracked_work(chunk))
+        except Exception as error:
+            self.error = error
+            self._stop(FAILED)
+            raise
+
+        self.done += len(chunk)
+        self._resize_slice(time.perf_counter() - start)
+
+        if self.done >= self.total:
+            self._stop(FINISHED)
+            return False
+        return True
+
+    def cancel(self) -> None:
+        """
+        Stop the job and undo the nodes it created
+        """
+        if self.state in (PENDING, RUNNING):
+            self._stop(CANCELLED)
+
+    def run(self) -> list:
+        """
+        Run every slice right away, for use without an event loop
+
+        Returns:
+            results (list): the results of every slice
+        """
+        self.start()
+        while self.step():
+            pass
+        return self.results
+
+    def _tracked_work(self, chunk: list) -> list:
+        """
+        Run the work on a slice and keep a handle to every node it made
+        """
+        callbacks = self._scene.add_node_added_callback(self._created.append)
+        try:
+            return self.work(chunk)
+        finally:
+            self._scene.remove_callbacks(callbacks)
+
+    def _resize_slice(self, elapsed: float) -> None:
+        """
+        Aim the next slice at slice_time, growing at most double each time
+        """
+        if elapsed <= 0.0:
+            self._slice_size *= 2
+            return
+        wanted = int(self._slice_size * self.slice_time / elapsed)
+        self._slice_size = max(1, min(wanted, self._slice_size * 2))
+
+    def _stop(self, state: str) -> None:
+        if self._callbacks is not None:
+            self._scene.remove_callbacks(self._callbacks)
+            self._callbacks = None
+
+        if state in (CANCELLED, FAILED) and self._scene is not None:
+            self._rollback()
+
+        self.state = state
+        LOG.debug(f"Job '{self.label}' {state} after {self.done}/{self.total} items.")
+
+    def _rollback(self) -> None:
+        # children first, nodes deleted along with a parent are skipped
+        created = [node for node in reversed(self._created) if self._scene.exists(node)]
+        if created:
+            self._scene.delete_nodes(created)
+            LOG.info(f"Rolled back {len(created)} nodes from job '{self.label}'.")
+        self._created.clear()
+        self._scene.restore_selection(self._selection)
+
+    def _scene_reset(self) -> None:
+        # nothing left to roll back in a new scene
+        self._created.clear()
+
+
+def _ignore(*args) -> None:
+    pass
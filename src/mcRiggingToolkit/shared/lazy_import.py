@@ -0,0 +1,39 @@
+"""
+Import modules on first use so the toolkit window can open before
+numpy and the tool code are loaded
+"""
+import importlib.util
+import sys
+import types
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """
+    Get a module that is only executed the first time one of its
+    attributes is read, a module that is already imported is returned as is
+
+    Args:
+        name (str): the full module name, like mcRiggingToolkit.core.rig_template
+
+    Returns:
+        module (types.ModuleType): the module, loaded or waiting to load
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # let `from package import name` find it like a normal import would
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+
+    return module
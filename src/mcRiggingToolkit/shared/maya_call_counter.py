@@ -0,0 +1,323 @@
+"""
+Diagnostic mode that counts the maya.cmds and OpenMaya calls the
+toolkit makes
+
+While installed, the cmds functions and OpenMaya function set methods
+listed below are wrapped. Every call is put under the toolkit function
+that led to it, the closest caller outside the scene backend modules,
+with its call count, the number of items passed in and the time spent.
+A call that shows up thousands of times under one toolkit function is
+an O(N) command storm, like a setAttr per shape or a getPoint per vertex.
+
+OpenMaya types can not take new attributes so each listed class is
+swapped on the om module for a subclass with counting methods. Only
+code that reaches the classes through the module (om.MFnMesh(...)) is
+counted, objects Maya hands back (an MDagPath from a selection list)
+keep their own type.
+
+    with maya_call_counter.counting():
+        controller_creation.create_blank_controllers(targets, "circle")
+"""
+import contextlib
+import functools
+import logging
+import sys
+import time
+import types
+
+from maya import cmds
+import maya.api.OpenMaya as om
+
+LOG = logging.getLogger(__name__)
+
+CMDS_FUNCTIONS = (
+    "createNode",
+    "curve",
+    "getAttr",
+    "group",
+    "joint",
+    "listRelatives",
+    "loadPlugin",
+    "ls",
+    "nodeType",
+    "objExists",
+    "parent",
+    "rename",
+    "select",
+    "setAttr",
+    "xform",
+)
+
+OPENMAYA_METHODS = {
+    "MDGModifier": (
+        "createNode",
+        "doIt",
+        "newPlugValueBool",
+        "newPlugValueDouble",
+        "newPlugValueInt",
+        "renameNode",
+        "undoIt",
+    ),
+    "MDagModifier": (
+        "createNode",
+        "doIt",
+        "newPlugValueBool",
+        "newPlugValueDouble",
+        "newPlugValueInt",
+        "renameNode",
+        "reparentNode",
+        "undoIt",
+    ),
+    "MFnDagNode": ("child", "childCount", "fullPathName", "getPath", "parent", "partialPathName"),
+    "MFnDependencyNode": ("findPlug", "name", "setName", "typeName"),
+    "MFnMesh": ("getPoint", "getPoints", "getVertices", "setPoint", "setPoints"),
+    "MFnNurbsCurve": ("create",),
+    "MFnSingleIndexedComponent": ("getElements",),
+    "MGlobal": ("getActiveSelectionList", "getRichSelection", "setActiveSelectionList"),
+    "MSelectionList": ("add", "getComponent", "getDagPath", "getDependNode", "length"),
+}
+
+# modules that only pass calls through, the call site is above them
+PASS_THROUGH_MODULES = {
+    __name__,
+    "mcRiggingToolkit.shared.api_undo",
+    "mcRiggingToolkit.shared.maya_scene",
+    "mcRiggingToolkit.shared.profiler",
+    "mcRiggingToolkit.shared.scene_backend",
+}
+
+# (toolkit function, maya call) -> [calls, items passed, seconds]
+_STATS = {}
+_ORIGINALS = None
+
+
+def install() -> None:
+    """
+    Start counting, wraps the cmds functions and swaps the OpenMaya classes
+    """
+    global _ORIGINALS
+
+    if _ORIGINALS is not None:
+        return
+
+    originals = {"cmds": {}, "om": {}}
+    for name in CMDS_FUNCTIONS:
+        func = getattr(cmds, name, None)
+        if func is None:
+            continue
+        originals["cmds"][name] = func
+        setattr(cmds, name, _counted(f"cmds.{name}", func))
+
+    for class_name, methods in OPENMAYA_METHODS.items():
+        cls = getattr(om, class_name, None)
+        if cls is None:
+            continue
+        try:
+            counting_cls = _counting_class(cls, methods)
+        except TypeError:
+            LOG.debug(f"Can not subclass om.{class_name}, its calls will not be counted.")
+            continue
+        originals["om"][class_name] = cls
+        setattr(om, class_name, counting_cls)
+
+    _ORIGINALS = originals
+
+
+def uninstall() -> None:
+    """
+    Put the original cmds functions and OpenMaya classes back, the
+    counts are kept
+    """
+    global _ORIGINALS
+
+    if _ORIGINALS is None:
+        return
+
+    for name, func in _ORIGINALS["cmds"].items():
+        setattr(cmds, name, func)
+    for class_name, cls in _ORIGINALS["om"].items():
+        setattr(om, class_name, cls)
+    _ORIGINALS = None
+
+
+def is_installed() -> bool:
+    return _ORIGINALS is not None
+
+
+def reset() -> None:
+    """
+    Forget every count
+    """
+    _STATS.clear()
+
+
+@contextlib.contextmanager
+def counting(sort: str = "seconds"):
+    """
+    Count the calls made in a block of code from a clean slate and
+    log the report
+
+    Args:
+        sort (str): the report column to sort by, calls, items or seconds
+    """
+    reset()
+    install()
+    try:
+        yield
+    finally:
+        uninstall()
+        LOG.info("\n" + report(sort))
+
+
+def rows(sort: str = "seconds") -> list:
+    """
+    Args:
+        sort (str): calls, items or seconds
+
+    Returns:
+        rows (list): (toolkit function, maya call, calls, items, seconds)
+                     grouped by toolkit function, the function with the
+                     highest total first and its calls sorted the same way
+    """
+    column = ("calls", "items", "seconds").index(sort)
+
+    groups = {}
+    for (function, call), stats in _STATS.items():
+        groups.setdefault(function, []).append((function, call, *stats))
+
+    for group in groups.values():
+        group.sort(key=lambda row: row[2 + column], reverse=True)
+
+    ordered = sorted(
+        groups.values(),
+        key=lambda group: sum(row[2 + column] for row in group),
+        reverse=True,
+    )
+    return [row for group in ordered for row in group]
+
+
+def report(sort: str = "seconds") -> str:
+    """
+    Args:
+        sort (str): calls, items or seconds
+
+    Returns:
+        table (str): the rows as a text table
+    """
+    lines = [
+        f"{'toolkit function':<52} {'maya call':<42} {'calls':>8} "
+        f"{'items':>9} {'total ms':>10} {'mean us':>9}"
+    ]
+    previous = None
+    for function, call, calls, items, seconds in rows(sort):
+        label = function if function != previous else ""
+        previous = function
+        lines.append(
+            f"{label:<52} {call:<42} {calls:>8} {items:>9} "
+            f"{seconds * 1e3:>10.3f} {seconds / calls * 1e6:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def storms(min_calls: int = 100) -> list:
+    """
+    Args:
+        min_calls (int): how many calls of one maya call from one toolkit
+                         function count as a storm
+
+    Returns:
+        storms (list): (toolkit function, maya call, calls) most calls first
+    """
+    found = [
+        (function, call, stats[0])
+        for (function, call), stats in _STATS.items()
+        if stats[0] >= min_calls
+    ]
+    return sorted(found, key=lambda row: row[2], reverse=True)
+
+
+def _counted(call: str, func, method: bool = False):
+    """
+    Wrap func so every call is added to _STATS under its call site,
+    with method on self is not counted as an item passed in
+    """
+    skip = 1 if method else 0
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            stats = _STATS.setdefault((_call_site(), call), [0, 0, 0.0])
+            stats[0] += 1
+            stats[1] += _items(args[skip:]) + _items(kwargs.values())
+            stats[2] += seconds
+
+    return wrapper
+
+
+def _counting_class(cls: type, methods: tuple) -> type:
+    """
+    Subclass cls with counting versions of methods
+    """
+    namespace = {}
+    for name in methods:
+        raw = None
+        for base in cls.__mro__:
+            if name in base.__dict__:
+                raw = base.__dict__[name]
+                break
+        if raw is None:
+            continue
+
+        call = f"om.{cls.__name__}.{name}"
+        if isinstance(raw, staticmethod):
+            namespace[name] = staticmethod(_counted(call, raw.__func__))
+        elif isinstance(raw, (types.BuiltinFunctionType, classmethod)):
+            # static methods of the compiled API types
+            namespace[name] = staticmethod(_counted(call, getattr(cls, name)))
+        elif callable(raw):
+            namespace[name] = _counted(call, raw, method=True)
+
+    return type(cls.__name__, (cls,), namespace)
+
+
+def _call_site() -> str:
+    """
+    Returns:
+        name (str): module.function of the closest toolkit caller outside
+                    the pass through modules
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        code = frame.f_code
+        # comprehensions and generator expressions belong to their function
+        if (
+            module.startswith("mcRiggingToolkit")
+            and module not in PASS_THROUGH_MODULES
+            and not code.co_name.startswith("<")
+        ):
+            name = getattr(code, "co_qualname", code.co_name)
+            return f"{module.rsplit('.', 1)[-1]}.{name}"
+        frame = frame.f_back
+    return "<outside toolkit>"
+
+
+def _items(values) -> int:
+    """
+    Returns:
+        items (int): a value counts one, a list or array counts its length
+    """
+    total = 0
+    for value in values:
+        if isinstance(value, (str, bytes)):
+            total += 1
+            continue
+        try:
+            total += len(value)
+        except TypeError:
+            total += 1
+    return total
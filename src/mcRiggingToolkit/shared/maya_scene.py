@@ -0,0 +1,476 @@
+"""
+SceneBackend that works on the live Maya scene
+
+Bulk reads go through OpenMaya function sets and every write is a
+single modifier recorded as one undo step with api_undo
+"""
+from functools import lru_cache
+from operator import attrgetter
+
+import maya.api.OpenMaya as om
+import numpy as np
+from maya import cmds
+
+from mcRiggingToolkit.shared import api_undo
+from mcRiggingToolkit.shared.scene_backend import SceneBackend
+
+CURVE_FORMS = {
+    "open": om.MFnNurbsCurve.kOpen,
+    "closed": om.MFnNurbsCurve.kClosed,
+    "periodic": om.MFnNurbsCurve.kPeriodic,
+}
+TRANSLATE_ATTRS = ("translateX", "translateY", "translateZ")
+JOINT_ORIENT_ATTRS = ("jointOrientX", "jointOrientY", "jointOrientZ")
+INFLUENCE = attrgetter("influence")
+
+
+class DagHandle:
+    """
+    Reference to a dag node that survives renames and reparenting
+
+    The MObjectHandle tells if the node is still alive, the MDagPath is
+    kept for cheap access and looked up again when it goes stale
+
+    Args:
+        dag_path (om.MDagPath): the path to the node
+    """
+
+    __slots__ = ("handle", "_dag_path")
+
+    def __init__(self, dag_path: om.MDagPath) -> None:
+        self.handle = om.MObjectHandle(dag_path.node())
+        self._dag_path = om.MDagPath(dag_path)
+
+    @classmethod
+    def from_node(cls, node: om.MObject) -> "DagHandle":
+        """
+        Args:
+            node (om.MObject): a dag node, it may not be parented yet
+
+        Returns:
+            handle (DagHandle): a handle that finds its path on first use
+        """
+        handle = cls.__new__(cls)
+        handle.handle = om.MObjectHandle(node)
+        handle._dag_path = om.MDagPath()
+        return handle
+
+    def is_valid(self) -> bool:
+        return self.handle.isValid()
+
+    def dag_path(self) -> om.MDagPath:
+        """
+        Returns:
+            dag_path (om.MDagPath): a current path to the node
+        """
+        if not self._dag_path.isValid():
+            self._dag_path = om.MDagPath.getAPathTo(self.handle.object())
+        return self._dag_path
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DagHandle) and self.handle == other.handle
+
+    def __hash__(self) -> int:
+        return self.handle.hashCode()
+
+    def __repr__(self) -> str:
+        return f"DagHandle({self.dag_path().fullPathName()!r})"
+
+
+def get_dag_path(node: object) -> om.MDagPath:
+    """
+    Args:
+        node (object): the name or DagHandle of a dag node
+
+    Returns:
+        dag_path (om.MDagPath): the dag path of the node
+    """
+    if isinstance(node, DagHandle):
+        return node.dag_path()
+    return om.MSelectionList().add(node).getDagPath(0)
+
+
+def get_node(node: object) -> om.MObject:
+    """
+    Args:
+        node (object): the name or DagHandle of a node
+
+    Returns:
+        node (om.MObject): the node
+    """
+    if isinstance(node, DagHandle):
+        return node.handle.object()
+    return om.MSelectionList().add(node).getDependNode(0)
+
+
+def node_path(node: object) -> str:
+    """
+    Args:
+        node (object): the name or DagHandle of a node
+
+    Returns:
+        name (str): a name cmds can take, the full path for a handle
+    """
+    if isinstance(node, DagHandle):
+        return node.dag_path().fullPathName()
+    return node
+
+
+def component_weights(comp_fn: om.MFnSingleIndexedComponent, count: int) -> np.ndarray:
+    """
+    This will read the soft selection influence of every element
+    of a component, elements without weights count fully
+
+    API 2.0 only hands out component weights one MWeight at a time, so
+    this stays one weight call per element. The calls are mapped
+    straight into the array, no Python frame runs per element
+
+    Args:
+        comp_fn (om.MFnSingleIndexedComponent): the component function set
+        count (int): the number of elements on the component
+
+    Returns:
+        weights (np.ndarray): (count,) float64 array of influences
+    """
+    if not comp_fn.hasWeights:
+        return np.ones(count, dtype=np.float64)
+
+    return np.fromiter(
+        map(INFLUENCE, map(comp_fn.weight, range(count))),
+        dtype=np.float64,
+        count=count,
+    )
+
+
+@lru_cache(maxsize=256)
+def curve_arrays(cvs: tuple, knots: tuple) -> tuple:
+    """
+    This will build the Maya arrays for a curve once and hand back
+    the cached copy after that
+
+    Args:
+        cvs (tuple): (x, y, z) tuple for each cv
+        knots (tuple): the knot values
+
+    Returns:
+        points, knots (tuple): om.MPointArray and om.MDoubleArray
+    """
+    return om.MPointArray([om.MPoint(*cv) for cv in cvs]), om.MDoubleArray(knots)
+
+
+class MayaScene(SceneBackend):
+    """
+    The live Maya scene
+    """
+
+    def selected_nodes(self) -> list:
+        sel = om.MGlobal.getActiveSelectionList()
+
+        nodes = []
+        for i in range(sel.length()):
+            try:
+                nodes.append(sel.getDagPath(i).fullPathName())
+            except RuntimeError:  # Non-DAG items (shaders, etc.)
+                continue
+        return nodes
+
+    def selected_handles(self) -> list:
+        sel = om.MGlobal.getActiveSelectionList()
+
+        handles = []
+        for i in range(sel.length()):
+            try:
+                handles.append(DagHandle(sel.getDagPath(i)))
+            except RuntimeError:  # Non-DAG items (shaders, etc.)
+                continue
+        return handles
+
+    def selected_vertex_components(self, soft: bool = False) -> list:
+        if soft:
+            rich_sel = om.MGlobal.getRichSelection(defaultToActiveSelection=True)
+            sel = rich_sel.getSelection()
+        else:
+            sel = om.MGlobal.getActiveSelectionList()
+
+        components = []
+        for i in range(sel.length()):
+            try:
+                dag_path, component = sel.getComponent(i)
+            except RuntimeError:  # Non-DAG items (shaders, etc.)
+                continue
+
+            # We only care about mesh vertices
+            if component.apiType() != om.MFn.kMeshVertComponent:
+                continue
+
+            comp_fn = om.MFnSingleIndexedComponent(component)
+            vtx_ids = np.array(comp_fn.getElements(), dtype=np.int64)
+            weights = component_weights(comp_fn, vtx_ids.size) if soft else None
+            components.append((dag_path.fullPathName(), vtx_ids, weights))
+
+        return components
+
+    def selected_face_components(self) -> list:
+        sel = om.MGlobal.getActiveSelectionList()
+
+        components = []
+        for i in range(sel.length()):
+            try:
+                dag_path, component = sel.getComponent(i)
+            except RuntimeError:  # Non-DAG items (shaders, etc.)
+                continue
+
+            if component.apiType() != om.MFn.kMeshPolygonComponent:
+                continue
+
+            face_ids = np.array(om.MFnSingleIndexedComponent(component).getElements(), dtype=np.int64)
+            components.append((dag_path.fullPathName(), face_ids))
+
+        return components
+
+    def selection_snapshot(self) -> om.MSelectionList:
+        return om.MGlobal.getActiveSelectionList()
+
+    def restore_selection(self, snapshot: om.MSelectionList) -> None:
+        om.MGlobal.setActiveSelectionList(snapshot)
+
+    def mesh_points(self, mesh: str) -> np.ndarray:
+        mesh_fn = om.MFnMesh(get_dag_path(mesh))
+        # a full copy, API 2.0 has no ranged read of the world points
+        points = np.array(mesh_fn.getPoints(om.MSpace.kWorld), dtype=np.float64)
+        return np.ascontiguousarray(points[:, :3])
+
+    def mesh_polygons(self, mesh: str) -> tuple:
+        counts, connects = om.MFnMesh(get_dag_path(mesh)).getVertices()
+        return (
+            np.array(counts, dtype=np.int64),
+            np.array(connects, dtype=np.int64),
+        )
+
+    def mesh_vertex_count(self, mesh: str) -> int:
+        return om.MFnMesh(get_dag_path(mesh)).numVertices
+
+    def point(self, position: np.ndarray) -> om.MPoint:
+        return om.MPoint(*np.asarray(position, dtype=np.float64).tolist())
+
+    def node_name(self, node: object, long: bool = False) -> str:
+        if long:
+            if not get_node(node).hasFn(om.MFn.kDagNode):
+                # dependency nodes have unique names and no path
+                return node_path(node)
+            return get_dag_path(node).fullPathName()
+        if isinstance(node, DagHandle):
+            return om.MFnDependencyNode(node.handle.object()).name()
+        return node.split("|")[-1]
+
+    def node_names(self) -> list:
+        return [name.split("|")[-1] for name in cmds.ls()]
+
+    def exists(self, name: str) -> bool:
+        if isinstance(name, DagHandle):
+            return name.is_valid()
+        return cmds.objExists(name)
+
+    def node_type(self, name: str) -> str:
+        return cmds.nodeType(node_path(name))
+
+    def create_nodes(self, steps: tuple) -> list:
+        modifier = om.MDagModifier()
+        nodes = []
+        for name, node_type, parent in steps:
+            parent_node = om.MObject.kNullObj if parent < 0 else nodes[parent]
+            node = modifier.createNode(node_type, parent_node)
+            modifier.renameNode(node, name)
+            nodes.append(node)
+
+        api_undo.commit(modifier)
+
+        return [om.MFnDagNode(node).partialPathName() for node in nodes]
+
+    def group(self, nodes: list, name: str) -> str:
+        return cmds.group([node_path(node) for node in nodes], name=name)
+
+    def create_joints(
+        self, names: list, positions: np.ndarray, orientations: np.ndarray
+    ) -> list:
+        orientations = np.radians(orientations)
+
+        modifier = om.MDagModifier()
+        nodes = []
+        for name, position, orientation in zip(names, positions.tolist(), orientations.tolist()):
+            node = modifier.createNode("joint")
+            modifier.renameNode(node, name)
+
+            node_fn = om.MFnDependencyNode(node)
+            for attr, value in zip(TRANSLATE_ATTRS, position):
+                modifier.newPlugValueDouble(node_fn.findPlug(attr, False), value)
+            for attr, value in zip(JOINT_ORIENT_ATTRS, orientation):
+                if value:
+                    modifier.newPlugValueDouble(node_fn.findPlug(attr, False), value)
+
+            nodes.append(node)
+
+        api_undo.commit(modifier)
+
+        return [om.MFnDagNode(node).partialPathName() for node in nodes]
+
+    def create_curves(self, names: list, curves: tuple, parents: list = None) -> list:
+        arrays = [
+            curve_arrays(cvs, knots) + (degree, CURVE_FORMS[form])
+            for cvs, knots, degree, form in curves
+        ]
+
+        curve_fn = om.MFnNurbsCurve()
+        transforms = []
+        for name in names:
+            transform = om.MObject.kNullObj
+            for points, knots, degree, form in arrays:
+                created = curve_fn.create(points, knots, degree, form, False, False, transform)
+                if transform.isNull():
+                    # the first curve makes the transform, the rest go under it
+                    transform = created
+
+            transform_fn = om.MFnDagNode(transform)
+            transform_fn.setName(name)
+            for index in range(transform_fn.childCount()):
+                om.MFnDependencyNode(transform_fn.child(index)).setName(
+                    f"{name}Shape{index or ''}"
+                )
+            transforms.append(transform)
+
+        if parents is not None:
+            # parented before the undo step is recorded, so a redo brings
+            # the curves back under their parents
+            modifier = om.MDagModifier()
+            for transform, parent in zip(transforms, parents):
+                modifier.reparentNode(transform, get_node(parent))
+            modifier.doIt()
+
+        api_undo.record_created(transforms)
+
+        return [om.MFnDagNode(transform).partialPathName() for transform in transforms]
+
+    def curve_shapes(self, node: str) -> list:
+        dag_path = get_dag_path(node)
+
+        shapes = []
+        for index in range(dag_path.childCount()):
+            child = dag_path.child(index)
+            if child.hasFn(om.MFn.kNurbsCurve):
+                shapes.append(om.MFnDagNode(child).fullPathName())
+        return shapes
+
+    def delete_nodes(self, nodes: list) -> None:
+        existing = cmds.ls([node_path(node) for node in nodes if self.exists(node)])
+        if existing:
+            cmds.delete(existing)
+
+    def get_attributes(self, nodes: list, attr: str) -> np.ndarray:
+        return np.array(
+            [om.MFnDependencyNode(get_node(node)).findPlug(attr, False).asDouble() for node in nodes],
+            dtype=np.float64,
+        )
+
+    def set_attributes(self, values: list) -> None:
+        modifier = om.MDGModifier()
+        node_fns = {}
+        for node, attr, value in values:
+            node_fn = node_fns.get(node)
+            if node_fn is None:
+                node_fn = node_fns[node] = om.MFnDependencyNode(get_node(node))
+
+            plug = node_fn.findPlug(attr, False)
+            if isinstance(value, bool):
+                modifier.newPlugValueBool(plug, value)
+            elif isinstance(value, int):
+                modifier.newPlugValueInt(plug, value)
+            else:
+                modifier.newPlugValueDouble(plug, value)
+
+        api_undo.commit(modifier)
+
+    def world_matrices(self, nodes: list) -> np.ndarray:
+        matrices = [tuple(get_dag_path(node).inclusiveMatrix()) for node in nodes]
+        return np.array(matrices, dtype=np.float64).reshape(-1, 4, 4)
+
+    def parent_inverse_matrices(self, nodes: list) -> np.ndarray:
+        matrices = [tuple(get_dag_path(node).exclusiveMatrixInverse()) for node in nodes]
+        return np.array(matrices, dtype=np.float64).reshape(-1, 4, 4)
+
+    def open_scene(self, path: str) -> None:
+        cmds.file(path, open=True, force=True)
+
+    def save_scene(self, path: str) -> None:
+        file_type = "mayaAscii" if path.lower().endswith(".ma") else "mayaBinary"
+        cmds.file(rename=path)
+        cmds.file(save=True, force=True, type=file_type)
+
+    def add_callbacks(
+        self, node_added, node_removed, name_changed, scene_reset
+    ) -> list:
+        def added(node, client_data=None):
+            node_added(om.MFnDependencyNode(node).name())
+
+        def removed(node, client_data=None):
+            node_removed(om.MFnDependencyNode(node).name())
+
+        def renamed(node, previous_name, client_data=None):
+            name_changed(om.MFnDependencyNode(node).name(), previous_name)
+
+        def reset(client_data=None):
+            scene_reset()
+
+        return [
+            om.MDGMessage.addNodeAddedCallback(added, "dependNode"),
+            om.MDGMessage.addNodeRemovedCallback(removed, "dependNode"),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), renamed),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, reset),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, reset),
+        ]
+
+    def add_node_added_callback(self, node_added) -> list:
+        def added(node, client_data=None):
+            if node.hasFn(om.MFn.kDagNode):
+                node_added(DagHandle.from_node(node))
+            else:
+                # dependency node names are unique
+                node_added(om.MFnDependencyNode(node).name())
+
+        return [om.MDGMessage.addNodeAddedCallback(added, "dependNode")]
+
+    def add_mesh_changed_callback(self, mesh: str, points_changed, topology_changed=None) -> list:
+        dag_path = get_dag_path(mesh)
+        dag_path.extendToShape()
+        shape = dag_path.node()
+
+        def moved(*args):
+            points_changed()
+
+        def rebuilt(*args):
+            if topology_changed is not None:
+                topology_changed()
+
+        def gone(*args):
+            points_changed()
+            rebuilt()
+
+        return [
+            # deformers, edits and history all dirty the mesh plugs
+            om.MNodeMessage.addNodeDirtyPlugCallback(shape, moved),
+            # the points are read in world space
+            om.MDagMessage.addWorldMatrixModifiedCallback(dag_path, moved),
+            om.MPolyMessage.addPolyTopologyChangedCallback(shape, gone),
+            om.MNodeMessage.addNameChangedCallback(shape, gone),
+            om.MNodeMessage.addNodePreRemovalCallback(shape, gone),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeNew, gone),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeOpen, gone),
+        ]
+
+    def add_selection_callback(self, selection_changed) -> list:
+        def changed(client_data=None):
+            selection_changed()
+
+        return [om.MEventMessage.addEventCallback("SelectionChanged", changed)]
+
+    def remove_callbacks(self, handle: list) -> None:
+        om.MMessage.removeCallbacks(handle)
@@ -0,0 +1,558 @@
+"""
+SceneBackend held entirely in memory with numpy
+
+Used to test and benchmark the toolkit without a Maya license. Node
+data is kept in flat arrays, a parent index per node and one float64
+column per attribute, so thousands of nodes cost a few arrays rather
+than thousands of objects. Meshes keep their points in one (N, 3)
+buffer in world space.
+
+Short names are unique across the whole scene, a clashing name is
+numbered up the way Maya does it, foo becomes foo1
+
+Scenes save to and open from a pickle of that storage
+"""
+import itertools
+import pickle
+
+import numpy as np
+
+from mcRiggingToolkit.core import joint_orientation
+from mcRiggingToolkit.shared.scene_backend import SceneBackend
+
+# the storage written by save_scene
+SCENE_STATE = (
+    "_names",
+    "_index",
+    "_types",
+    "_children",
+    "_parents",
+    "_attrs",
+    "_meshes",
+    "_curves",
+    "_selection",
+)
+
+ATTRIBUTE_DEFAULTS = {
+    "scaleX": 1.0,
+    "scaleY": 1.0,
+    "scaleZ": 1.0,
+    "visibility": 1.0,
+}
+
+
+class MemoryScene(SceneBackend):
+    """
+    In-memory scene
+
+    Args:
+        capacity (int): how many nodes to make room for up front
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._capacity = capacity
+        self._callbacks = {}
+        self._added_callbacks = {}
+        self._selection_callbacks = {}
+        self._mesh_callbacks = {}
+        self._handles = itertools.count(1)
+        self.new_scene()
+
+    #######################################
+    ## Scene building helpers
+    #######################################
+    def new_scene(self) -> None:
+        """
+        Empty the scene
+        """
+        self._names = []
+        self._index = {}
+        self._types = []
+        self._children = {}
+        self._parents = np.full(self._capacity, -1, dtype=np.int64)
+        self._attrs = {}
+        self._meshes = {}
+        self._curves = {}
+        self._selection = []
+
+        for callbacks in list(self._callbacks.values()):
+            callbacks[3]()
+        self._mesh_changed(None, topology=True)
+        self._selection_changed()
+
+    def add_mesh(
+        self,
+        name: str,
+        points: np.ndarray,
+        counts: np.ndarray = None,
+        connects: np.ndarray = None,
+    ) -> str:
+        """
+        Add a mesh to the scene
+
+        Args:
+            name (str): the name of the mesh
+            points (np.ndarray): (N, 3) world space points, kept without a copy
+                                 when already float64
+            counts (np.ndarray): vertex count per polygon
+            connects (np.ndarray): flat polygon vertex ids
+
+        Returns:
+            mesh (str): the name the mesh got
+        """
+        index = self._create(name, "mesh", -1)
+        self._meshes[index] = (
+            np.asarray(points, dtype=np.float64),
+            np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64),
+            np.zeros(0, dtype=np.int64) if connects is None else np.asarray(connects, dtype=np.int64),
+        )
+        return self._names[index]
+
+    def set_mesh_points(self, mesh: str, points: np.ndarray) -> None:
+        """
+        Move the points of a mesh, the way a deformer or sculpt would
+
+        Args:
+            mesh (str): the name of the mesh
+            points (np.ndarray): (N, 3) world space points
+        """
+        index = self._resolve(mesh)
+        _points, counts, connects = self._meshes[index]
+        self._meshes[index] = (np.asarray(points, dtype=np.float64), counts, connects)
+        self._mesh_changed(index)
+
+    def set_mesh_polygons(self, mesh: str, counts: np.ndarray, connects: np.ndarray) -> None:
+        """
+        Give a mesh new polygons, the way a topology edit would
+
+        Args:
+            mesh (str): the name of the mesh
+            counts (np.ndarray): vertex count per polygon
+            connects (np.ndarray): flat polygon vertex ids
+        """
+        index = self._resolve(mesh)
+        points = self._meshes[index][0]
+        self._meshes[index] = (
+            points,
+            np.asarray(counts, dtype=np.int64),
+            np.asarray(connects, dtype=np.int64),
+        )
+        self._mesh_changed(index, topology=True)
+
+    def select(self, nodes: list) -> None:
+        """
+        Args:
+            nodes (list): the nodes to select by name or handle, replacing
+                          the selection
+        """
+        self._selection = [("node", self._resolve(name)) for name in nodes]
+        self._selection_changed()
+
+    def select_vertices(self, mesh: str, vertex_ids: np.ndarray, weights: np.ndarray = None) -> None:
+        """
+        Add vertices of a mesh to the selection
+
+        Args:
+            mesh (str): the name of the mesh
+            vertex_ids (np.ndarray): the vertex ids to select
+            weights (np.ndarray): optional soft selection weight per vertex
+        """
+        self._selection.append(
+            (
+                "vertices",
+                self._resolve(mesh),
+                np.asarray(vertex_ids, dtype=np.int64),
+                None if weights is None else np.asarray(weights, dtype=np.float64),
+            )
+        )
+        self._selection_changed()
+
+    def select_faces(self, mesh: str, face_ids: np.ndarray) -> None:
+        """
+        Add faces of a mesh to the selection
+
+        Args:
+            mesh (str): the name of the mesh
+            face_ids (np.ndarray): the face ids to select
+        """
+        self._selection.append(
+            ("faces", self._resolve(mesh), np.asarray(face_ids, dtype=np.int64), None)
+        )
+        self._selection_changed()
+
+    def rename(self, name: str, new_name: str) -> str:
+        """
+        Args:
+            name (str): the node to rename
+            new_name (str): the name to give it
+
+        Returns:
+            name (str): the name the node got
+        """
+        index = self._index.pop(name)
+        new_name = self._unique_name(new_name)
+        self._names[index] = new_name
+        self._index[new_name] = index
+
+        for callbacks in list(self._callbacks.values()):
+            callbacks[2](new_name, name)
+        self._mesh_changed(index, topology=True)
+        return new_name
+
+    #######################################
+    ## Selection
+    #######################################
+    def selected_nodes(self) -> list:
+        return [self._long_name(item[1]) for item in self._selection if item[0] == "node"]
+
+    def selected_handles(self) -> list:
+        return [item[1] for item in self._selection if item[0] == "node"]
+
+    def selected_vertex_components(self, soft: bool = False) -> list:
+        components = []
+        for item in self._selection:
+            if item[0] != "vertices":
+                continue
+
+            _kind, index, vtx_ids, weights = item
+            if soft and weights is None:
+                weights = np.ones(vtx_ids.size, dtype=np.float64)
+            components.append((self._names[index], vtx_ids, weights if soft else None))
+        return components
+
+    def selected_face_components(self) -> list:
+        return [
+            (self._names[item[1]], item[2]) for item in self._selection if item[0] == "faces"
+        ]
+
+    def selection_snapshot(self) -> list:
+        return list(self._selection)
+
+    def restore_selection(self, snapshot: list) -> None:
+        self._selection = list(snapshot)
+        self._selection_changed()
+
+    #######################################
+    ## Meshes
+    #######################################
+    def mesh_points(self, mesh: str) -> np.ndarray:
+        return self._meshes[self._resolve(mesh)][0]
+
+    def mesh_polygons(self, mesh: str) -> tuple:
+        _points, counts, connects = self._meshes[self._resolve(mesh)]
+        return counts, connects
+
+    def mesh_vertex_count(self, mesh: str) -> int:
+        return len(self.mesh_points(mesh))
+
+    #######################################
+    ## Nodes
+    #######################################
+    def node_name(self, node: object, long: bool = False) -> str:
+        index = self._resolve(node)
+        return self._long_name(index) if long else self._names[index]
+
+    def node_names(self) -> list:
+        return list(self._index)
+
+    def exists(self, name: str) -> bool:
+        if isinstance(name, (int, np.integer)):
+            return 0 <= name < len(self._names) and self._names[name] is not None
+        return name.split("|")[-1] in self._index
+
+    def node_type(self, name: str) -> str:
+        return self._types[self._resolve(name)]
+
+    def create_nodes(self, steps: tuple) -> list:
+        indices = []
+        for name, node_type, parent in steps:
+            parent_index = -1 if parent < 0 else indices[parent]
+            indices.append(self._create(name, node_type, parent_index))
+        return [self._names[index] for index in indices]
+
+    def group(self, nodes: list, name: str) -> str:
+        group_index = self._create(name, "transform", -1)
+        for node in nodes:
+            self._reparent(self._resolve(node), group_index)
+        return self._names[group_index]
+
+    def create_joints(
+        self, names: list, positions: np.ndarray, orientations: np.ndarray
+    ) -> list:
+        indices = np.array([self._create(name, "joint", -1) for name in names], dtype=np.int64)
+        orientations = np.radians(orientations)
+
+        for axis, attr in enumerate(("translateX", "translateY", "translateZ")):
+            self._column(attr)[indices] = positions[:, axis]
+        for axis, attr in enumerate(("jointOrientX", "jointOrientY", "jointOrientZ")):
+            self._column(attr)[indices] = orientations[:, axis]
+
+        return [self._names[index] for index in indices]
+
+    def create_curves(self, names: list, curves: tuple, parents: list = None) -> list:
+        if parents is None:
+            parent_indices = [-1] * len(names)
+        else:
+            parent_indices = [self._resolve(parent) for parent in parents]
+
+        transforms = []
+        for name, parent in zip(names, parent_indices):
+            index = self._create(name, "transform", parent)
+            for shape_number, curve in enumerate(curves):
+                shape_name = f"{self._names[index]}Shape{shape_number or ''}"
+                self._curves[self._create(shape_name, "nurbsCurve", index)] = curve
+            transforms.append(self._names[index])
+        return transforms
+
+    def curve_shapes(self, node: str) -> list:
+        index = self._resolve(node)
+        return [
+            self._long_name(child)
+            for child in self._children.get(index, [])
+            if self._types[child] == "nurbsCurve"
+        ]
+
+    def delete_nodes(self, nodes: list) -> None:
+        for node in nodes:
+            if self.exists(node):
+                self._delete(self._resolve(node))
+
+    #######################################
+    ## Attributes and transforms
+    #######################################
+    def get_attributes(self, nodes: list, attr: str) -> np.ndarray:
+        return self._column(attr)[self._indices(nodes)].copy()
+
+    def set_attributes(self, values: list) -> None:
+        for node, attr, value in values:
+            self._column(attr)[self._resolve(node)] = float(value)
+
+    def world_matrices(self, nodes: list) -> np.ndarray:
+        indices = self._indices(nodes)
+        matrices = self._local_matrices(indices)
+
+        # climb one level of the hierarchy at a time for every node at once
+        parents = self._parents[indices]
+        while True:
+            climbing = np.flatnonzero(parents >= 0)
+            if not climbing.size:
+                break
+            matrices[climbing] = matrices[climbing] @ self._local_matrices(parents[climbing])
+            parents[climbing] = self._parents[parents[climbing]]
+
+        return matrices
+
+    def parent_inverse_matrices(self, nodes: list) -> np.ndarray:
+        parents = self._parents[self._indices(nodes)]
+        matrices = np.tile(np.eye(4), (len(parents), 1, 1))
+
+        parented = np.flatnonzero(parents >= 0)
+        if parented.size:
+            parent_names = [self._names[index] for index in parents[parented]]
+            matrices[parented] = np.linalg.inv(self.world_matrices(parent_names))
+        return matrices
+
+    #######################################
+    ## Scene files
+    #######################################
+    def open_scene(self, path: str) -> None:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        for attr in SCENE_STATE:
+            setattr(self, attr, state[attr])
+
+        for callbacks in list(self._callbacks.values()):
+            callbacks[3]()
+        self._mesh_changed(None, topology=True)
+        self._selection_changed()
+
+    def save_scene(self, path: str) -> None:
+        state = {attr: getattr(self, attr) for attr in SCENE_STATE}
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    #######################################
+    ## Callbacks
+    #######################################
+    def add_callbacks(
+        self, node_added, node_removed, name_changed, scene_reset
+    ) -> int:
+        handle = next(self._handles)
+        self._callbacks[handle] = (node_added, node_removed, name_changed, scene_reset)
+        return handle
+
+    def add_node_added_callback(self, node_added) -> int:
+        handle = next(self._handles)
+        self._added_callbacks[handle] = node_added
+        return handle
+
+    def add_mesh_changed_callback(self, mesh: str, points_changed, topology_changed=None) -> int:
+        handle = next(self._handles)
+        self._mesh_callbacks[handle] = (self._resolve(mesh), points_changed, topology_changed)
+        return handle
+
+    def add_selection_callback(self, selection_changed) -> int:
+        handle = next(self._handles)
+        self._selection_callbacks[handle] = selection_changed
+        return handle
+
+    def remove_callbacks(self, handle: int) -> None:
+        self._callbacks.pop(handle, None)
+        self._added_callbacks.pop(handle, None)
+        self._selection_callbacks.pop(handle, None)
+        self._mesh_callbacks.pop(handle, None)
+
+    #######################################
+    ## Storage
+    #######################################
+    def _unique_name(self, name: str) -> str:
+        if name not in self._index:
+            return name
+
+        base = name.rstrip("0123456789")
+        number = 1
+        while f"{base}{number}" in self._index:
+            number += 1
+        return f"{base}{number}"
+
+    def _create(self, name: str, node_type: str, parent: int) -> int:
+        index = len(self._names)
+        if index == len(self._parents):
+            self._grow()
+
+        name = self._unique_name(name)
+        self._names.append(name)
+        self._index[name] = index
+        self._types.append(node_type)
+        self._parents[index] = -1
+        if parent >= 0:
+            self._reparent(index, parent)
+
+        for callbacks in list(self._callbacks.values()):
+            callbacks[0](name)
+        for node_added in list(self._added_callbacks.values()):
+            node_added(index)
+        return index
+
+    def _reparent(self, index: int, parent: int) -> None:
+        old_parent = self._parents[index]
+        if old_parent >= 0:
+            self._children[old_parent].remove(index)
+        self._parents[index] = parent
+        self._children.setdefault(parent, []).append(index)
+
+    def _mesh_changed(self, index: int, topology: bool = False) -> None:
+        """
+        Call the mesh callbacks watching index, every one when index is None
+        """
+        for watched, points_changed, topology_changed in list(self._mesh_callbacks.values()):
+            if index is not None and watched != index:
+                continue
+            points_changed()
+            if topology and topology_changed is not None:
+                topology_changed()
+
+    def _selection_changed(self) -> None:
+        for callback in list(self._selection_callbacks.values()):
+            callback()
+
+    def _resolve(self, node: object) -> int:
+        """
+        Index of a node given by name or by handle
+        """
+        if isinstance(node, (int, np.integer)):
+            if not self.exists(node):
+                raise KeyError(f"Node handle {node} no longer exists")
+            return int(node)
+        return self._index[node.split("|")[-1]]
+
+    def _delete(self, index: int) -> None:
+        """
+        Remove a node and its children, the slot is left empty
+        """
+        for child in self._children.pop(index, []):
+            self._parents[child] = -1
+            self._delete(child)
+
+        parent = self._parents[index]
+        if parent >= 0:
+            self._children[parent].remove(index)
+            self._parents[index] = -1
+
+        name = self._names[index]
+        del self._index[name]
+        self._names[index] = None
+        self._types[index] = None
+        self._meshes.pop(index, None)
+        self._curves.pop(index, None)
+        selection = [item for item in self._selection if item[1] != index]
+        if len(selection) != len(self._selection):
+            self._selection = selection
+            self._selection_changed()
+
+        for callbacks in list(self._callbacks.values()):
+            callbacks[1](name)
+        self._mesh_changed(index, topology=True)
+
+    def _grow(self) -> None:
+        """
+        Double the room in every array
+        """
+        size = len(self._parents)
+        self._parents = np.concatenate([self._parents, np.full(size, -1, dtype=np.int64)])
+        for attr, column in self._attrs.items():
+            extra = np.full(size, ATTRIBUTE_DEFAULTS.get(attr, 0.0))
+            self._attrs[attr] = np.concatenate([column, extra])
+
+    def _column(self, attr: str) -> np.ndarray:
+        column = self._attrs.get(attr)
+        if column is None:
+            column = np.full(len(self._parents), ATTRIBUTE_DEFAULTS.get(attr, 0.0))
+            self._attrs[attr] = column
+        return column
+
+    def _indices(self, nodes: list) -> np.ndarray:
+        return np.array([self._resolve(node) for node in nodes], dtype=np.int64)
+
+    def _long_name(self, index: int) -> str:
+        parts = []
+        while index >= 0:
+            parts.append(self._names[index])
+            index = self._parents[index]
+        return "|" + "|".join(reversed(parts))
+
+    def _local_matrices(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Compose scale, shear, rotate, joint orient and translate
+        for each node, pivots are always at the origin
+        """
+        def columns(*attrs):
+            return np.stack([self._column(attr)[indices] for attr in attrs], axis=1)
+
+        scale = columns("scaleX", "scaleY", "scaleZ")
+        shear = columns("shearXY", "shearXZ", "shearYZ")
+        rotate = np.degrees(columns("rotateX", "rotateY", "rotateZ"))
+        orient = np.degrees(columns("jointOrientX", "jointOrientY", "jointOrientZ"))
+        orders = self._column("rotateOrder")[indices].astype(np.int64)
+
+        rotation = np.empty((len(indices), 3, 3))
+        for order in np.unique(orders):
+            matching = orders == order
+            rotation[matching] = joint_orientation.euler_to_matrices(
+                rotate[matching], joint_orientation.ROTATE_ORDERS[order]
+            )
+
+        shear_matrix = np.tile(np.eye(3), (len(indices), 1, 1))
+        shear_matrix[:, 1, 0] = shear[:, 0]
+        shear_matrix[:, 2, 0] = shear[:, 1]
+        shear_matrix[:, 2, 1] = shear[:, 2]
+
+        matrices = np.tile(np.eye(4), (len(indices), 1, 1))
+        matrices[:, :3, :3] = (
+            scale[:, :, None]
+            * shear_matrix
+            @ rotation
+            @ joint_orientation.euler_to_matrices(orient)
+        )
+        matrices[:, 3, :3] = columns("translateX", "translateY", "translateZ")
+        return matrices
@@ -0,0 +1,145 @@
+"""
+Scene wide registry of node names for cheap unique naming
+
+The scene is read once (a single cmds.ls in Maya), after that the
+registry keeps itself current through node added, removed and
+renamed callbacks so picking a free name never probes the scene
+"""
+from collections import Counter
+
+from mcRiggingToolkit.shared import scene_backend
+
+
+class NameRegistry:
+    """
+    Count of every short name in the scene plus the next free counter
+    for every base name that has been asked for
+
+    Dag nodes under different parents can share a short name, so a name
+    is only free again once every node using it is gone
+
+    Args:
+        scene (SceneBackend): the scene to track, the active one by default
+    """
+
+    def __init__(self, scene: scene_backend.SceneBackend = None) -> None:
+        self.scene = scene_backend.get_scene() if scene is None else scene
+        self.names = Counter()
+        # names handed out by unique_name that are not in the scene yet
+        self._reserved = set()
+        self._counters = {}
+        self._callbacks = None
+
+    def snapshot(self) -> None:
+        """
+        Read every node name in the scene in one go
+        """
+        self.names = Counter(self.scene.node_names())
+        self._reserved = set()
+        self._counters = {}
+
+    def add(self, name: str) -> None:
+        """
+        Args:
+            name (str): a node name that now exists, long names are fine
+        """
+        name = name.split("|")[-1]
+        self._reserved.discard(name)
+        self.names[name] += 1
+
+    def discard(self, name: str) -> None:
+        """
+        Args:
+            name (str): a node name that no longer exists
+        """
+        name = name.split("|")[-1]
+        count = self.names.get(name, 0)
+        if count > 1:
+            self.names[name] = count - 1
+        else:
+            self.names.pop(name, None)
+
+    def is_taken(self, name: str) -> bool:
+        """
+        Args:
+            name (str): a short node name
+
+        Returns:
+            taken (bool): True if a node or an earlier unique_name uses it
+        """
+        return name in self.names or name in self._reserved
+
+    def unique_name(self, base_name: str, suffix: str, padding: int = 2) -> str:
+        """
+        Return a unique name based on base_name and reserve it.
+        Adds _01, _02, ... if the base_name already exists.
+
+        Args:
+            base_name (str): this is the base name
+            suffix (str): the suffix that ends the name, like ctrl or jnt
+            padding (int): how many digits the counter is padded to
+
+        Returns:
+            name (str): new name created
+        """
+        name = f"{base_name}_{suffix}"
+        key = (base_name, suffix, padding)
+
+        if key not in self._counters and not self.is_taken(name):
+            self._reserved.add(name)
+            return name
+
+        index = self._counters.get(key, 1)
+        name = f"{base_name}_{index:0{padding}d}_{suffix}"
+        while self.is_taken(name):
+            index += 1
+            name = f"{base_name}_{index:0{padding}d}_{suffix}"
+
+        self._counters[key] = index + 1
+        self._reserved.add(name)
+        return name
+
+    def install_callbacks(self) -> None:
+        """
+        Keep the registry in sync with the scene
+        """
+        if self._callbacks is None:
+            self._callbacks = self.scene.add_callbacks(
+                self.add, self.discard, self._name_changed, self.snapshot
+            )
+
+    def remove_callbacks(self) -> None:
+        """
+        Stop listening to the scene
+        """
+        if self._callbacks is not None:
+            self.scene.remove_callbacks(self._callbacks)
+        self._callbacks = None
+
+    def _name_changed(self, name: str, previous_name: str) -> None:
+        self.discard(previous_name)
+        self.add(name)
+
+
+_REGISTRY = None
+
+
+def get_registry() -> NameRegistry:
+    """
+    Get the shared registry, the scene is snapshotted the first time
+    and again whenever the toolkit is pointed at another scene
+
+    Returns:
+        registry (NameRegistry): the toolkit name registry
+    """
+    global _REGISTRY
+
+    scene = scene_backend.get_scene()
+    if _REGISTRY is None or _REGISTRY.scene is not scene:
+        if _REGISTRY is not None:
+            _REGISTRY.remove_callbacks()
+        _REGISTRY = NameRegistry(scene)
+        _REGISTRY.snapshot()
+        _REGISTRY.install_callbacks()
+
+    return _REGISTRY
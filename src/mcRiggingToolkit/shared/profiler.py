@@ -0,0 +1,307 @@
+"""
+Record how long toolkit operations take and how much scene work they do
+
+Public operations are decorated with profiled. While the profiler is
+off the decorator costs one flag check per call. While it is on every
+call records its wall time, how many scene backend calls it made and
+how many scene objects it created. Calls nest, a record includes the
+work of the operations it called.
+
+Records export to the Chrome trace event format (open the file in
+chrome://tracing or https://ui.perfetto.dev) or print as a summary
+table per operation.
+
+    with profiler.profiling("controls.json"):
+        controller_creation.create_blank_controllers(targets, "circle")
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from mcRiggingToolkit.shared import scene_backend
+
+LOG = logging.getLogger(__name__)
+
+# scene methods whose return value is the objects they made
+CREATE_METHODS = ("create_nodes", "create_joints", "create_curves", "group")
+
+
+class Record(NamedTuple):
+    """
+    One finished call of a profiled operation, times in seconds
+    """
+    name: str
+    start: float
+    duration: float
+    scene_calls: int
+    objects_created: int
+    depth: int
+    thread: int
+
+
+_ENABLED = False
+_EPOCH = time.perf_counter()
+_RECORDS = []
+_DEPTH = [0]
+# running totals, scene calls and objects created
+_COUNTS = [0, 0]
+_PATCHED = None
+
+
+def profiled(func):
+    """
+    Decorator that records every call of func while the profiler is on,
+    the record is named module.function
+    """
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _ENABLED:
+            return func(*args, **kwargs)
+        with operation(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def operation(name: str):
+    """
+    Record a block of code as an operation
+
+    Args:
+        name (str): the name of the record
+    """
+    if not _ENABLED:
+        yield
+        return
+
+    calls, objects = _COUNTS
+    depth = _DEPTH[0]
+    _DEPTH[0] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _DEPTH[0] = depth
+        _RECORDS.append(
+            Record(
+                name,
+                start - _EPOCH,
+                end - start,
+                _COUNTS[0] - calls,
+                _COUNTS[1] - objects,
+                depth,
+                threading.get_ident(),
+            )
+        )
+
+
+def enable() -> None:
+    """
+    Start recording, the active scene gets its methods wrapped to count
+    scene calls and created objects
+    """
+    global _ENABLED
+
+    if _ENABLED:
+        return
+    _patch_scene(scene_backend.get_scene())
+    _ENABLED = True
+
+
+def disable() -> None:
+    """
+    Stop recording and unwrap the scene, the records are kept
+    """
+    global _ENABLED
+
+    _ENABLED = False
+    _unpatch_scene()
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset() -> None:
+    """
+    Forget every record
+    """
+    _RECORDS.clear()
+    _COUNTS[0] = _COUNTS[1] = 0
+
+
+def records() -> list:
+    """
+    Returns:
+        records (list): the finished Records in the order they ended
+    """
+    return list(_RECORDS)
+
+
+@contextlib.contextmanager
+def profiling(trace_path: str = None):
+    """
+    Profile a block of code from a clean slate, log the summary and
+    optionally write a Chrome trace
+
+    Args:
+        trace_path (str): where to write the trace, no trace when None
+    """
+    reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+        LOG.info("\n" + summary())
+        if trace_path:
+            export_chrome_trace(trace_path)
+
+
+def chrome_trace(recorded: list = None) -> dict:
+    """
+    Build Chrome trace events from the records
+
+    Args:
+        recorded (list): the records to use, all of them by default
+
+    Returns:
+        trace (dict): the trace in the Chrome trace event format
+    """
+    recorded = _RECORDS if recorded is None else recorded
+    pid = os.getpid()
+    events = [
+        {
+            "name": record.name,
+            "cat": record.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": record.start * 1e6,
+            "dur": record.duration * 1e6,
+            "pid": pid,
+            "tid": record.thread,
+            "args": {
+                "scene_calls": record.scene_calls,
+                "objects_created": record.objects_created,
+            },
+        }
+        for record in recorded
+    ]
+    # parents end after their children, sort so viewers nest them
+    events.sort(key=lambda event: (event["ts"], -event["dur"]))
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path: str, recorded: list = None) -> str:
+    """
+    Write the records as a Chrome trace JSON file
+
+    Args:
+        path (str): the file to write
+        recorded (list): the records to use, all of them by default
+
+    Returns:
+        path (str): the file written
+    """
+    with open(path, "w") as f:
+        json.dump(chrome_trace(recorded), f)
+    LOG.info(f"Wrote profiler trace to {path}")
+    return path
+
+
+def summarize(recorded: list = None) -> list:
+    """
+    Add the records up per operation
+
+    Args:
+        recorded (list): the records to use, all of them by default
+
+    Returns:
+        rows (list): (name, calls, total, mean, max, scene calls, objects)
+                     per operation, slowest total first
+    """
+    recorded = _RECORDS if recorded is None else recorded
+    totals = {}
+    for record in recorded:
+        row = totals.setdefault(record.name, [0, 0.0, 0.0, 0, 0])
+        row[0] += 1
+        row[1] += record.duration
+        row[2] = max(row[2], record.duration)
+        row[3] += record.scene_calls
+        row[4] += record.objects_created
+
+    rows = [
+        (name, calls, total, total / calls, longest, scene_calls, objects)
+        for name, (calls, total, longest, scene_calls, objects) in totals.items()
+    ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows
+
+
+def summary(recorded: list = None) -> str:
+    """
+    Args:
+        recorded (list): the records to use, all of them by default
+
+    Returns:
+        table (str): the summarize rows as a text table, times in ms
+    """
+    lines = [
+        f"{'operation':<48} {'calls':>7} {'total ms':>10} {'mean ms':>9} "
+        f"{'max ms':>9} {'scene calls':>12} {'objects':>8}"
+    ]
+    for name, calls, total, mean, longest, scene_calls, objects in summarize(recorded):
+        lines.append(
+            f"{name:<48} {calls:>7} {total * 1e3:>10.3f} {mean * 1e3:>9.3f} "
+            f"{longest * 1e3:>9.3f} {scene_calls:>12} {objects:>8}"
+        )
+    return "\n".join(lines)
+
+
+def _patch_scene(scene: scene_backend.SceneBackend) -> None:
+    """
+    Shadow the public backend methods of scene with counting wrappers
+    on the instance so the scene object itself stays the same
+    """
+    global _PATCHED
+
+    _unpatch_scene()
+    names = [
+        name
+        for name, value in vars(scene_backend.SceneBackend).items()
+        if callable(value) and not name.startswith("_")
+    ]
+    for name in names:
+        setattr(scene, name, _counting(getattr(scene, name), name in CREATE_METHODS))
+    _PATCHED = (scene, names)
+
+
+def _unpatch_scene() -> None:
+    global _PATCHED
+
+    if _PATCHED is None:
+        return
+    scene, names = _PATCHED
+    for name in names:
+        scene.__dict__.pop(name, None)
+    _PATCHED = None
+
+
+def _counting(method, creates: bool):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        _COUNTS[0] += 1
+        result = method(*args, **kwargs)
+        if creates and result:
+            _COUNTS[1] += 1 if isinstance(result, str) else len(result)
+        return result
+
+    return wrapper
@@ -0,0 +1,414 @@
+"""
+Interface between the toolkit and the scene it works on
+
+Core tools only talk to the scene through a SceneBackend so they can
+run inside Maya (maya_scene.MayaScene) or against the in-memory
+memory_scene.MemoryScene for tests and benchmarks.
+
+Data goes in and out as names and numpy arrays. Attribute values are
+in internal units, so angles are radians, the only exception is the
+orientations given to create_joints which are degrees like the rest
+of the toolkit's joint orient values
+
+Wherever a node is asked for, a handle from selected_handles works as
+well as a name. Handles follow their node through renames and
+reparenting and skip the name lookup
+"""
+import numpy as np
+
+CURVE_FORMS = ("open", "closed", "periodic")
+
+
+class SceneBackend:
+    """
+    Everything the toolkit reads from or writes to a scene
+    """
+
+    #######################################
+    ## Selection
+    #######################################
+    def selected_nodes(self) -> list:
+        """
+        Returns:
+            nodes (list): long names of the selected dag nodes
+        """
+        raise NotImplementedError
+
+    def selected_handles(self) -> list:
+        """
+        Returns:
+            handles (list): a handle for each selected dag node
+        """
+        raise NotImplementedError
+
+    def selected_vertex_components(self, soft: bool = False) -> list:
+        """
+        Args:
+            soft (bool): read the soft selection and its falloff weights
+
+        Returns:
+            components (list): (mesh, vertex ids, weights) for each selected
+                               mesh, weights is None unless soft is True
+        """
+        raise NotImplementedError
+
+    def selected_face_components(self) -> list:
+        """
+        Returns:
+            components (list): (mesh, face ids) for each mesh with
+                               selected faces
+        """
+        raise NotImplementedError
+
+    def selection_snapshot(self) -> object:
+        """
+        Returns:
+            snapshot (object): the current selection to hand to restore_selection
+        """
+        raise NotImplementedError
+
+    def restore_selection(self, snapshot: object) -> None:
+        """
+        Args:
+            snapshot (object): a selection from selection_snapshot
+        """
+        raise NotImplementedError
+
+    #######################################
+    ## Meshes
+    #######################################
+    def mesh_points(self, mesh: str) -> np.ndarray:
+        """
+        Args:
+            mesh (str): the name of the mesh
+
+        Returns:
+            points (np.ndarray): (N, 3) float64 world space points
+        """
+        raise NotImplementedError
+
+    def mesh_polygons(self, mesh: str) -> tuple:
+        """
+        Args:
+            mesh (str): the name of the mesh
+
+        Returns:
+            counts, connects (tuple): int64 vertex count per polygon and
+                                      the flat polygon vertex ids
+        """
+        raise NotImplementedError
+
+    def mesh_vertex_count(self, mesh: str) -> int:
+        """
+        Args:
+            mesh (str): the name of the mesh
+
+        Returns:
+            count (int): the number of vertices on the mesh
+        """
+        raise NotImplementedError
+
+    def point(self, position: np.ndarray) -> object:
+        """
+        This will hand a position back the way the scene's own API
+        would, tools that used to return an om.MPoint keep doing so
+
+        Args:
+            position (np.ndarray): (3,) world position
+
+        Returns:
+            point (object): the position as the scene's point type,
+                            the array itself by default
+        """
+        return position
+
+    #######################################
+    ## Nodes
+    #######################################
+    def node_name(self, node: object, long: bool = False) -> str:
+        """
+        Args:
+            node (object): a node name or handle
+            long (bool): give the full dag path instead of the short name,
+                         nodes outside the dag keep their name
+
+        Returns:
+            name (str): the name of the node
+        """
+        raise NotImplementedError
+
+    def node_names(self) -> list:
+        """
+        Returns:
+            names (list): the short name of every node in the scene
+        """
+        raise NotImplementedError
+
+    def exists(self, name: str) -> bool:
+        """
+        Args:
+            name (str): the node name
+
+        Returns:
+            exists (bool): True if the node is in the scene
+        """
+        raise NotImplementedError
+
+    def node_type(self, name: str) -> str:
+        """
+        Args:
+            name (str): the node name
+
+        Returns:
+            node_type (str): the node type, like joint or transform
+        """
+        raise NotImplementedError
+
+    def create_nodes(self, steps: tuple) -> list:
+        """
+        Create a hierarchy of nodes in one transaction
+
+        Args:
+            steps (tuple): (name, node_type, parent_index) for each node,
+                           parent_index points back into steps, -1 is world
+
+        Returns:
+            nodes (list): the names of the nodes created
+        """
+        raise NotImplementedError
+
+    def group(self, nodes: list, name: str) -> str:
+        """
+        Parent nodes under a new transform
+
+        Args:
+            nodes (list): the nodes to group
+            name (str): the name of the group
+
+        Returns:
+            group (str): the name of the group created
+        """
+        raise NotImplementedError
+
+    def create_joints(
+        self, names: list, positions: np.ndarray, orientations: np.ndarray
+    ) -> list:
+        """
+        Create joints at the world in one transaction
+
+        Args:
+            names (list): the name of each joint
+            positions (np.ndarray): (N, 3) world positions
+            orientations (np.ndarray): (N, 3) joint orients in degrees
+
+        Returns:
+            joints (list): the names of the joints created
+        """
+        raise NotImplementedError
+
+    def create_curves(self, names: list, curves: tuple, parents: list = None) -> list:
+        """
+        Create transforms with nurbs curve shapes, without history
+
+        Args:
+            names (list): the name of each transform
+            curves (tuple): (cvs, knots, degree, form) for each curve shape
+                            every transform gets, form is one of CURVE_FORMS
+            parents (list): a node to put each transform under, the
+                            transforms go in the world when None
+
+        Returns:
+            transforms (list): the names of the transforms created
+        """
+        raise NotImplementedError
+
+    def curve_shapes(self, node: str) -> list:
+        """
+        Args:
+            node (str): a transform name
+
+        Returns:
+            shapes (list): the nurbs curve shapes directly under node
+        """
+        raise NotImplementedError
+
+    def delete_nodes(self, nodes: list) -> None:
+        """
+        Delete nodes and everything under them in one transaction,
+        names that no longer exist are skipped
+
+        Args:
+            nodes (list): the nodes to delete
+        """
+        raise NotImplementedError
+
+    #######################################
+    ## Attributes and transforms
+    #######################################
+    def get_attributes(self, nodes: list, attr: str) -> np.ndarray:
+        """
+        Args:
+            nodes (list): the node names
+            attr (str): the attribute to read from every node
+
+        Returns:
+            values (np.ndarray): (N,) float64 values
+        """
+        raise NotImplementedError
+
+    def set_attributes(self, values: list) -> None:
+        """
+        Write many attributes in one transaction
+
+        Args:
+            values (list): (node, attr, value) for each write, bools,
+                           ints and floats are all fine
+        """
+        raise NotImplementedError
+
+    def world_matrices(self, nodes: list) -> np.ndarray:
+        """
+        Args:
+            nodes (list): the node names
+
+        Returns:
+            matrices (np.ndarray): (N, 4, 4) world matrices, row vector layout
+        """
+        raise NotImplementedError
+
+    def parent_inverse_matrices(self, nodes: list) -> np.ndarray:
+        """
+        Args:
+            nodes (list): the node names
+
+        Returns:
+            matrices (np.ndarray): (N, 4, 4) inverse world matrix of each
+                                   node's parent
+        """
+        raise NotImplementedError
+
+    #######################################
+    ## Scene files
+    #######################################
+    def open_scene(self, path: str) -> None:
+        """
+        Replace the scene with the one saved at path
+
+        Args:
+            path (str): the scene file
+        """
+        raise NotImplementedError
+
+    def save_scene(self, path: str) -> None:
+        """
+        Args:
+            path (str): where to save the scene
+        """
+        raise NotImplementedError
+
+    #######################################
+    ## Callbacks
+    #######################################
+    def add_callbacks(
+        self, node_added, node_removed, name_changed, scene_reset
+    ) -> object:
+        """
+        Listen to node changes
+
+        Args:
+            node_added (callable): called with the new node name
+            node_removed (callable): called with the removed node name
+            name_changed (callable): called with the new and previous name
+            scene_reset (callable): called with no arguments after a new
+                                    or opened scene
+
+        Returns:
+            handle (object): pass to remove_callbacks to stop listening
+        """
+        raise NotImplementedError
+
+    def add_node_added_callback(self, node_added) -> object:
+        """
+        Listen to new nodes by handle, the handle keeps pointing at the
+        node through renames and reparenting, unlike its name
+
+        Args:
+            node_added (callable): called with a handle of the new node,
+                                   its name for nodes outside the dag
+
+        Returns:
+            handle (object): pass to remove_callbacks to stop listening
+        """
+        raise NotImplementedError
+
+    def add_mesh_changed_callback(self, mesh: str, points_changed, topology_changed=None) -> object:
+        """
+        Listen to changes of one mesh, both callables are also called
+        when the mesh is renamed, deleted or the scene is replaced so
+        anything cached for it by name gets dropped
+
+        Args:
+            mesh (str): the name of the mesh
+            points_changed (callable): called with no arguments when the
+                                       world space points may have moved
+            topology_changed (callable): called with no arguments when the
+                                         polygons may have changed
+
+        Returns:
+            handle (object): pass to remove_callbacks to stop listening
+        """
+        raise NotImplementedError
+
+    def add_selection_callback(self, selection_changed) -> object:
+        """
+        Listen to selection changes
+
+        Args:
+            selection_changed (callable): called with no arguments every
+                                          time the selection changes
+
+        Returns:
+            handle (object): pass to remove_callbacks to stop listening
+        """
+        raise NotImplementedError
+
+    def remove_callbacks(self, handle: object) -> None:
+        """
+        Args:
+            handle (object): a handle from add_callbacks, add_node_added_callback,
+                             add_mesh_changed_callback or add_selection_callback
+        """
+        raise NotImplementedError
+
+
+_SCENE = None
+
+
+def get_scene() -> SceneBackend:
+    """
+    Get the scene the toolkit works on, Maya unless another
+    backend was set with set_scene
+
+    Returns:
+        scene (SceneBackend): the active scene backend
+    """
+    global _SCENE
+
+    if _SCENE is None:
+        from mcRiggingToolkit.shared.maya_scene import MayaScene
+
+        _SCENE = MayaScene()
+
+    return _SCENE
+
+
+def set_scene(scene: SceneBackend) -> None:
+    """
+    Make the toolkit work on another scene
+
+    Args:
+        scene (SceneBackend): the backend to use, None goes back to Maya
+    """
+    global _SCENE
+
+    _SCENE = scene
@@ -0,0 +1,96 @@
+"""
+Cached handles to the selected dag nodes
+
+The selection is read at most once per selection change, a selection
+changed callback marks the cache stale and the next tool to ask reads
+it again. Tools get node handles (an MDagPath and MObjectHandle in
+Maya) instead of long names so nothing is looked up by name again
+"""
+from mcRiggingToolkit.shared import scene_backend
+
+
+class SelectionCache:
+    """
+    Selected node handles, kept until the selection changes
+
+    Args:
+        scene (SceneBackend): the scene to follow, the active one by default
+    """
+
+    def __init__(self, scene: scene_backend.SceneBackend = None) -> None:
+        self.scene = scene_backend.get_scene() if scene is None else scene
+        self._handles = None
+        self._callback = None
+
+    def handles(self) -> tuple:
+        """
+        Returns:
+            handles (tuple): a handle for each selected dag node
+        """
+        if self._handles is None or self._callback is None:
+            self._handles = tuple(self.scene.selected_handles())
+        return self._handles
+
+    def names(self, long: bool = True) -> list:
+        """
+        Args:
+            long (bool): full dag paths instead of short names
+
+        Returns:
+            names (list): the names of the selected dag nodes
+        """
+        return [self.scene.node_name(handle, long) for handle in self.handles()]
+
+    def invalidate(self) -> None:
+        """
+        Forget the selection, it is read again on the next request
+        """
+        self._handles = None
+
+    def install_callbacks(self) -> None:
+        """
+        Invalidate the cache every time the selection changes, without
+        the callback every request reads the selection
+        """
+        if self._callback is None:
+            self._callback = self.scene.add_selection_callback(self.invalidate)
+            self._handles = None
+
+    def remove_callbacks(self) -> None:
+        """
+        Stop listening to the scene
+        """
+        if self._callback is not None:
+            self.scene.remove_callbacks(self._callback)
+        self._callback = None
+
+
+_CACHE = None
+
+
+def get_selection_cache() -> SelectionCache:
+    """
+    Get the shared selection cache, made again whenever the toolkit is
+    pointed at another scene
+
+    Returns:
+        cache (SelectionCache): the toolkit selection cache
+    """
+    global _CACHE
+
+    scene = scene_backend.get_scene()
+    if _CACHE is None or _CACHE.scene is not scene:
+        if _CACHE is not None:
+            _CACHE.remove_callbacks()
+        _CACHE = SelectionCache(scene)
+        _CACHE.install_callbacks()
+
+    return _CACHE
+
+
+def selected_handles() -> tuple:
+    """
+    Returns:
+        handles (tuple): handles to the selected dag nodes from the shared cache
+    """
+    return get_selection_cache().handles()
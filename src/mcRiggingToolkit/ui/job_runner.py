@@ -0,0 +1,113 @@
+"""
+Drive a ChunkedJob from the Qt event loop
+
+One slice runs per timer tick so Maya keeps redrawing and the cancel
+button keeps working while a long job runs
+"""
+from PySide6 import QtCore, QtWidgets
+import logging
+
+LOG = logging.getLogger(__name__)
+
+
+class JobRunner(QtCore.QObject):
+    """
+    Runs one ChunkedJob at a time in slices on the event loop
+    """
+
+    progressed = QtCore.Signal(int, int)
+    finished = QtCore.Signal(object)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.job = None
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._step)
+
+    def is_running(self) -> bool:
+        return self.job is not None
+
+    def run(self, job) -> bool:
+        """
+        Start a job, one slice per event loop tick
+
+        Args:
+            job (ChunkedJob): the job to run
+
+        Returns:
+            started (bool): False when another job is still running
+        """
+        if self.job is not None:
+            LOG.warning(f"Wait for '{self.job.label}' to finish or cancel it first.")
+            return False
+
+        self.job = job
+        job.start()
+        self.progressed.emit(0, job.total)
+        self._timer.start()
+        return True
+
+    def cancel(self) -> None:
+        """
+        Cancel the running job and roll its work back
+        """
+        if self.job is None:
+            return
+        self.job.cancel()
+        self._finish()
+
+    def _step(self) -> None:
+        try:
+            more = self.job.step()
+        except Exception:
+            LOG.exception(f"Job '{self.job.label}' failed, its work was rolled back.")
+            more = False
+
+        self.progressed.emit(self.job.done, self.job.total)
+        if not more:
+            self._finish()
+
+    def _finish(self) -> None:
+        self._timer.stop()
+        job, self.job = self.job, None
+        self.finished.emit(job)
+
+
+class JobProgressWidget(QtWidgets.QWidget):
+    """
+    Progress bar and cancel button for a JobRunner, hidden while idle
+
+    Args:
+        runner (JobRunner): the runner to follow
+    """
+
+    def __init__(self, runner: JobRunner, parent=None) -> None:
+        super().__init__(parent)
+        self.runner = runner
+
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.cancel_btn = QtWidgets.QPushButton("Cancel")
+
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.cancel_btn)
+
+        self.cancel_btn.clicked.connect(runner.cancel)
+        runner.progressed.connect(self.set_progress)
+        runner.finished.connect(lambda _job: self.hide())
+        self.hide()
+
+    def set_progress(self, done: int, total: int) -> None:
+        """
+        Args:
+            done (int): items finished
+            total (int): items in the job
+        """
+        if self.runner.job is not None:
+            self.progress_bar.setFormat(f"{self.runner.job.label} %v/%m")
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+        self.show()
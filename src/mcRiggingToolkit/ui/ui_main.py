@@ -1,9 +1,19 @@
-from maya import cmds, OpenMayaUI
-import maya.api.OpenMaya as om
+from maya import OpenMayaUI
 from PySide6 import QtWidgets, QtCore, QtGui
 from shiboken6 import wrapInstance
 import logging
 
+from mcRiggingToolkit.shared.lazy_import import lazy_module
+from mcRiggingToolkit.ui.job_runner import JobProgressWidget, JobRunner
+
+# the tools load on first use so the window opens without numpy
+controller_creation = lazy_module("mcRiggingToolkit.core.controller_creation")
+controller_shapes = lazy_module("mcRiggingToolkit.core.controller_shapes")
+match_space = lazy_module("mcRiggingToolkit.core.match_space")
+rig_template = lazy_module("mcRiggingToolkit.core.rig_template")
+chunked_job = lazy_module("mcRiggingToolkit.shared.chunked_job")
+selection_cache = lazy_module("mcRiggingToolkit.shared.selection_cache")
+
 
 LOG = logging.getLogger(__name__)
 LOG.setLevel("DEBUG")
@@ -45,11 +55,16 @@ class RiggingToolsUI(QtWidgets.QDialog):
         self.setWindowTitle("mc Rigging Toolkit")
         self.setMinimumWidth(300)
 
+        self.job_runner = JobRunner(self)
+
         self.build_ui()
         self.create_connections()
 
         self.ctrl_color = None
 
+        # fill in the shapes once the window is up
+        QtCore.QTimer.singleShot(0, self.load_shape_names)
+
     def build_ui(self) -> None:
         """
         UI fields and layout
@@ -62,6 +77,8 @@ class RiggingToolsUI(QtWidgets.QDialog):
         self.ctrl_name_field = QtWidgets.QLineEdit()
         self.ctrl_name_field.setPlaceholderText("Enter Controle name")
         self.ctrl_name_field.hide()
+        self.ctrl_shape_label = QtWidgets.QLabel("Controller Shape:")
+        self.ctrl_shape_combo = QtWidgets.QComboBox()
         self.color_label = QtWidgets.QLabel("Set Controller Color:")
         # set color buttons
         self.red_btn = QtWidgets.QPushButton()
@@ -71,6 +88,7 @@ class RiggingToolsUI(QtWidgets.QDialog):
         self.yellow_btn = QtWidgets.QPushButton()
         self.yellow_btn.setStyleSheet("background-color: yellow;")
         self.ctrl_color_btn = QtWidgets.QPushButton("Custom")
+        self.ctrl_side_color_checkbox = QtWidgets.QCheckBox("Color By Side Prefix (L/R/C)")
         self.ctrl_create_btn = QtWidgets.QPushButton("Create Animation Control")
         self.color_picked_btn = QtWidgets.QPushButton()
         self.color_picked_btn.setFixedSize(140, 30)
@@ -97,6 +115,10 @@ class RiggingToolsUI(QtWidgets.QDialog):
         main_layout.addWidget(self.ctrl_name_label)
         main_layout.addWidget(self.ctrl_custom_name_checkbox)
         main_layout.addWidget(self.ctrl_name_field)
+        shape_layout = QtWidgets.QHBoxLayout()
+        shape_layout.addWidget(self.ctrl_shape_label)
+        shape_layout.addWidget(self.ctrl_shape_combo)
+        main_layout.addLayout(shape_layout)
         color_picked_layout = QtWidgets.QHBoxLayout()
         color_picked_layout.addWidget(self.color_label)
         color_picked_layout.addWidget(
@@ -111,6 +133,7 @@ class RiggingToolsUI(QtWidgets.QDialog):
         palette_layout.addWidget(self.yellow_btn)
         palette_layout.addWidget(self.ctrl_color_btn)
         main_layout.addLayout(palette_layout)
+        main_layout.addWidget(self.ctrl_side_color_checkbox)
         main_layout.addWidget(self.ctrl_create_btn)
 
         # rig template group layout
@@ -118,6 +141,10 @@ class RiggingToolsUI(QtWidgets.QDialog):
         main_layout.addWidget(self.rig_temp_name_field)
         main_layout.addWidget(self.rig_temp_create_btn)
 
+        # progress of the running tool
+        self.job_progress = JobProgressWidget(self.job_runner)
+        main_layout.addWidget(self.job_progress)
+
     def create_connections(self) -> None:
         """
         Connect UI button logic
@@ -131,6 +158,38 @@ class RiggingToolsUI(QtWidgets.QDialog):
             lambda checked: self.ctrl_name_field.setVisible(checked)
         )
         self.rig_temp_create_btn.clicked.connect(self.create_rig_template)
+        self.job_runner.finished.connect(self.job_finished)
+
+    def run_job(self, label: str, items: list, work) -> None:
+        """
+        Run a tool over items in slices with progress and cancel
+
+        Args:
+            label (str): what the tool does
+            items (list): the items to work on
+            work (callable): called with a slice of items, returns a list
+        """
+        for button in (self.ctrl_create_btn, self.rig_temp_create_btn):
+            button.setEnabled(False)
+        self.job_runner.run(chunked_job.ChunkedJob(items, work, label))
+
+    def job_finished(self, job) -> None:
+        """
+        Log how the job ended and give the tool buttons back
+
+        Args:
+            job (ChunkedJob): the job that ended
+        """
+        for button in (self.ctrl_create_btn, self.rig_temp_create_btn):
+            button.setEnabled(True)
+        LOG.info(f"{job.label} {job.state}: {job.done}/{job.total}")
+
+    def load_shape_names(self) -> None:
+        """
+        Fill the shape combo box, this is the first use of the shape library
+        """
+        if self.ctrl_shape_combo.count() == 0:
+            self.ctrl_shape_combo.addItems(controller_shapes.SHAPE_NAMES)
 
     def create_rig_template(self) -> None:
         """
@@ -141,14 +200,11 @@ class RiggingToolsUI(QtWidgets.QDialog):
             LOG.warning("No rig name has been specified.")
             return
 
-        prx_group = cmds.group(empty=True, name="prx_grp", world=True)
-        rnd_group = cmds.group(empty=True, name="render_grp", world=True)
-        geo_group = cmds.group([prx_group, rnd_group], name="geo_grp", world=True)
-        anim_group = cmds.group(empty=True, name="anim_grp", world=True)
-        export_group = cmds.group(empty=True, name="export_grp", world=True)
-        joint_group = cmds.group([anim_group, export_group], name="jnt_grp", world=True)
-        ctrl_group = cmds.group(empty=True, name="ctrl_grp", world=True)
-        cmds.group([geo_group, joint_group, ctrl_group], name=rig_name)
+        self.run_job(
+            "Create rig template",
+            [rig_name],
+            lambda names: [rig_template.build_rig_template(name) for name in names],
+        )
 
     def set_color(self, color: QtGui.QColor) -> None:
         """
@@ -170,6 +226,12 @@ class RiggingToolsUI(QtWidgets.QDialog):
         if color.isValid():
             self.set_color(color)
 
+    def get_selected_objects(self) -> tuple:
+        """
+        Handles to the selected DAG objects, cached until the selection changes
+        """
+        return selection_cache.selected_handles()
+
     def match_objects_space(self, target_object: str, move_object: str) -> None:
         """
         Match world space of move_object to target_object
@@ -179,32 +241,7 @@ class RiggingToolsUI(QtWidgets.QDialog):
                                  in world space
             move_object (str): this is the object you will be moving
         """
-        # get target_object position
-        sel = om.MGlobal.getSelectionListByName(target_object)
-        dag_path = sel.getDagPath(0)
-        fn_transform = om.MFnTransform(dag_path)
-        pos = fn_transform.translation(om.MSpace.kWorld)
-
-        # get target_object DAG path
-        target_sel = om.MGlobal.getSelectionListByName(move_object)
-        target_dag = target_sel.getDagPath(0)
-        fn_target = om.MFnTransform(target_dag)
-
-        # Move move_object to target_object
-        fn_target.setTranslation(pos, om.MSpace.kWorld)
-
-    def get_selected_object_name(self) -> None:
-        """
-        Lazily iterate selected DAG objects and yield long names
-        """
-        sel = om.MGlobal.getActiveSelectionList()
-
-        for i in range(sel.length()):
-            try:
-                dag = sel.getDagPath(i)
-                yield dag.fullPathName()
-            except RuntimeError:  # Non-DAG items (shaders, etc.)
-                continue
+        match_space.match_objects_space([(target_object, move_object)])
 
     def unique_ctrl_name(self, base_name: str) -> str:
         """
@@ -217,64 +254,60 @@ class RiggingToolsUI(QtWidgets.QDialog):
         Returns:
             name (str): new name created
         """
-        name = f"{base_name}_ctrl"
-        if not cmds.objExists(name):
-            return name
-
-        i = 1
-        while True:
-            name = f"{base_name}_{i:02d}_ctrl"  # 2-digit suffix like _01, _02
-            if not cmds.objExists(name):
-                return name
-            i += 1
-
-    def create_curve_offset_group(self, controller_name: str) -> None:
+        return controller_creation.unique_ctrl_name(base_name)
+
+    def create_curve_offset_group(self, controller_name: str) -> str:
         """
-        Build the curve and offset group for the controller
+        Build the curve and offset group for the controller with the
+        shape picked in the UI
 
         Args:
             controller_name (str): the name of the controller
-        """
-        short_controller_name = controller_name.split("|")[-1]
-        short_controller_name = self.unique_ctrl_name(short_controller_name)
-        controller = cmds.circle(name=short_controller_name)
-        offset_group = cmds.group(controller, name=f"{short_controller_name}_offset")
 
-        if self.ctrl_custom_name_checkbox.isChecked() is False:
-            self.match_objects_space(controller_name, offset_group)
-
-        self.set_controller_color(controller)
+        Returns:
+            controller (str): the name of the controller curve
+        """
+        self.load_shape_names()
+        return controller_creation.create_curve_offset_group(
+            controller_name,
+            self.ctrl_shape_combo.currentText(),
+            match=not self.ctrl_custom_name_checkbox.isChecked(),
+        )
 
-    def set_controller_color(self, controller: str) -> None:
+    def set_controller_color(self, controllers: list) -> None:
         """
-        Set the controller color
+        Set the controller color on every controller in one go
 
         Args:
-            ctronller (str): this is the name of the controller
+            controllers (list): this is the names of the controllers
         """
-        r, g, b = self.color_picked_btn
-        for shape in cmds.listRelatives(controller, type="nurbsCurve", fullPath=True):
-            cmds.setAttr(shape + ".overrideEnabled", 1)
-            cmds.setAttr(shape + ".overrideRGBColors", 1)
-            cmds.setAttr(shape + ".overrideColorRGB", r, g, b, type="double3")
+        controller_creation.color_controllers(
+            controllers, self.ctrl_color, by_side=self.ctrl_side_color_checkbox.isChecked()
+        )
 
     def create_blank_controller(self) -> None:
         """
         Create a animation controller
         """
-        orig_sel = om.MGlobal.getActiveSelectionList()  # get origional selection
+        self.load_shape_names()
+        shape = self.ctrl_shape_combo.currentText()
         if self.ctrl_custom_name_checkbox.isChecked():
             button_name = self.ctrl_name_field.text().strip()
             if not button_name:
                 LOG.warning("Button Controler name cannot be empty.")
                 return
 
-            self.create_curve_offset_group(button_name)
+            targets = [button_name]
         else:
-
-            for obj in self.get_selected_object_name():
-                self.create_curve_offset_group(obj)
-
-        om.MGlobal.setActiveSelectionList(orig_sel) # restore selection
-
-        LOG.info("Finished creating ctrls")
\ No newline at end of file
+            targets = list(self.get_selected_objects())
+
+        color = self.ctrl_color
+        by_side = self.ctrl_side_color_checkbox.isChecked()
+        match = not self.ctrl_custom_name_checkbox.isChecked()
+        self.run_job(
+            "Create ctrls",
+            targets,
+            lambda chunk: controller_creation.create_blank_controllers(
+                chunk, shape, color=color, by_side=by_side, match=match
+            ),
+        )